@@ -0,0 +1,54 @@
+"""Compares walking the graph for the attributes of every concept with materializing them in a single sweep.
+
+Usage::
+
+    python -m benchmarks.attrs
+"""
+
+from .utils import fresh, report, setup, timeit
+
+setup()
+
+from rdflib.namespace import RDF, SKOS  # noqa: E402
+
+from example.vocabularies import ISC2020, SimpleLithology  # noqa: E402
+from research_vocabs.core import ConceptAttrs  # noqa: E402
+
+
+def walk(vocabulary):
+    """The per-concept graph walk performed by Concept.attrs before attributes were materialized."""
+    graph = vocabulary.graph
+    for concept in vocabulary.concepts():
+        attrs = ConceptAttrs(graph, vocabulary.ns)
+        for p, o in graph.predicate_objects(concept.URI):
+            if (o, RDF.type, SKOS.Concept) in graph:
+                o = vocabulary.get_concept(o)
+            attrs.setdefault(p, []).append(o)
+
+
+def main(repeat=5):
+    rows = []
+    for vocabulary in [ISC2020, SimpleLithology]:
+        instance = vocabulary()
+        instance.concepts()
+        walked = timeit(lambda v=instance: walk(v), repeat)
+        swept = timeit(lambda v=instance: v.materialize(), repeat)
+        tree = timeit(lambda v=vocabulary: fresh(v)().tree(), repeat)
+        rows.append([
+            vocabulary.__name__,
+            len(instance.concepts()),
+            f"{walked * 1000:.1f}",
+            f"{swept * 1000:.1f}",
+            f"{walked / swept:.1f}x",
+            f"{tree * 1000:.1f}",
+        ])
+
+    report(
+        "Attributes of every concept (median ms)",
+        rows,
+        ["vocabulary", "concepts", "graph walk", "materialize", "speedup", "cold tree()"],
+    )
+
+
+if __name__ == "__main__":
+    main()
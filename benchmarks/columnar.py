@@ -0,0 +1,101 @@
+"""Compares the memory held by a loaded vocabulary that keeps its graph with one served from a columnar index, for a
+generated vocabulary of 100,000 concepts and the example vocabularies, and the speed of lookups in both.
+
+Usage::
+
+    python -m benchmarks.columnar
+"""
+
+import tempfile
+from pathlib import Path
+
+from .utils import report, resident, setup, timeit, variant
+
+setup(VOCABULARY_SNAPSHOTS=False)
+
+from example.vocabularies import ISC2020, SimpleLithology  # noqa: E402
+from research_vocabs import LocalVocabulary  # noqa: E402
+
+NAMESPACE = "http://example.com/generated/"
+SKOS = "http://www.w3.org/2004/02/skos/core#"
+
+
+def generate(path: Path, size: int):
+    """Writes an N-Triples vocabulary of ``size`` concepts, each with labels in two languages, an altLabel and a
+    broader concept, and a collection of every hundredth concept."""
+    a = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+    with path.open("w") as f:
+        f.write(f"<{NAMESPACE}scheme> {a} <{SKOS}ConceptScheme> .\n")
+        f.write(f'<{NAMESPACE}scheme> <{SKOS}prefLabel> "Generated"@en .\n')
+        f.write(f"<{NAMESPACE}members> {a} <{SKOS}Collection> .\n")
+        for i in range(size):
+            concept = f"<{NAMESPACE}c{i}>"
+            f.write(f"{concept} {a} <{SKOS}Concept> .\n")
+            f.write(f"{concept} <{SKOS}inScheme> <{NAMESPACE}scheme> .\n")
+            f.write(f'{concept} <{SKOS}prefLabel> "concept {i}"@en .\n')
+            f.write(f'{concept} <{SKOS}prefLabel> "Begriff {i}"@de .\n')
+            f.write(f'{concept} <{SKOS}altLabel> "term {i}"@en .\n')
+            if i:
+                f.write(f"{concept} <{SKOS}broader> <{NAMESPACE}c{(i - 1) // 10}> .\n")
+                f.write(f"<{NAMESPACE}c{(i - 1) // 10}> <{SKOS}narrower> {concept} .\n")
+            if i % 100 == 0:
+                f.write(f"<{NAMESPACE}members> <{SKOS}member> {concept} .\n")
+
+
+def loaded(cls):
+    """Loads a vocabulary along with its search index."""
+    vocabulary = cls()
+    vocabulary.search("a")
+    return vocabulary
+
+
+def main(size=100_000, repeat=5):
+    tmp = Path(tempfile.mkdtemp(prefix="research-vocabs-columnar-"))
+    source = tmp / "generated.nt"
+    generate(source, size)
+
+    class Generated(LocalVocabulary):
+        class Meta:
+            name = "generated"
+            prefix = "gen"
+            namespace = NAMESPACE
+
+    Generated._meta.source = str(source)
+
+    rows, lookups = [], []
+    for vocabulary in [Generated, ISC2020, SimpleLithology]:
+        graph, graph_bytes = resident(lambda v=vocabulary: loaded(variant(v)))
+        compact, compact_bytes = resident(lambda v=vocabulary: loaded(variant(v, columnar=True)))
+        rows.append([
+            vocabulary.__name__,
+            len(compact.index),
+            f"{graph_bytes / 2**20:.1f}",
+            f"{compact_bytes / 2**20:.1f}",
+            f"{compact.index.nbytes() / 2**20:.1f}",
+            f"{graph_bytes / compact_bytes:.1f}x",
+        ])
+
+        names = [graph.index.name(i) for i in graph.index.concepts][:1000]
+        entries = range(len(names))
+        for title, v in [("graph", graph), ("columnar", compact)]:
+            index = v.index
+            find = timeit(lambda i=index, names=names: [i.find(n) for n in names], repeat)
+            labels = timeit(lambda i=index, entries=entries: [i.labels(e) for e in entries], repeat)
+            label = timeit(lambda i=index, entries=entries: [i.label(e) for e in entries], repeat)
+            lookups.append([
+                vocabulary.__name__,
+                title,
+                f"{find * 1e6 / len(names):.2f}",
+                f"{labels * 1e6 / len(names):.2f}",
+                f"{label * 1e6 / len(names):.2f}",
+                f"{timeit(lambda v=v: v.search('conc'), repeat) * 1000:.2f}",
+            ])
+
+    report(
+        "Memory held after loading (MiB)", rows, ["vocabulary", "concepts", "graph", "columnar", "arrays", "saving"]
+    )
+    report("Lookups", lookups, ["vocabulary", "store", "find (us)", "labels (us)", "label (us)", "search (ms)"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compares decoding database rows of a concept field into concepts with decoding them into lazy concepts.
+
+Usage::
+
+    python -m benchmarks.decode
+"""
+
+import random
+
+from .utils import report, setup, timeit
+
+setup()
+
+from django.db import models  # noqa: E402
+
+from example.vocabularies import SimpleLithology  # noqa: E402
+from research_vocabs.fields import ConceptField  # noqa: E402
+
+
+def main(rows=50_000, repeat=5):
+    vocabulary = SimpleLithology()
+    values = random.choices(vocabulary.values, k=rows)  # noqa: S311
+
+    plain = models.CharField(max_length=255)
+    eager = ConceptField(vocabulary=SimpleLithology)
+    lazy = ConceptField(vocabulary=SimpleLithology, lazy_concepts=True)
+
+    def decode(field):
+        # what a template or an export does with every row
+        if not hasattr(field, "from_db_value"):
+            return [str(v) for v in values]
+        return [str(field.from_db_value(v, None, None)) for v in values]
+
+    def decode_labels(field):
+        return [field.from_db_value(v, None, None).label() for v in values]
+
+    results = []
+    for label, field in [("CharField", plain), ("ConceptField", eager), ("ConceptField(lazy_concepts)", lazy)]:
+        str_time = timeit(lambda f=field: decode(f), repeat)
+        label_time = timeit(lambda f=field: decode_labels(f), repeat) if field is not plain else None
+        results.append([
+            label,
+            f"{str_time * 1000:.1f}",
+            f"{label_time * 1000:.1f}" if label_time is not None else "-",
+        ])
+
+    report(f"Decoding {rows} rows (median ms)", results, ["field", "str()", "label()"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compares comparing a misspelled term with every label of a vocabulary with the trigram fuzzy index.
+
+Usage::
+
+    python -m benchmarks.fuzzy
+"""
+
+from .utils import fresh, report, setup, timeit
+
+setup()
+
+from example.vocabularies import ISC2020, SimpleLithology  # noqa: E402
+from research_vocabs.search import default_distance, edit_distance, fold  # noqa: E402
+
+TERMS = {
+    ISC2020: ["Albain", "Cretacous", "Juraissc", "Lower Cretacous", "Messinain"],
+    SimpleLithology: ["sandstne", "grnaite", "Granit", "mudstne", "foid bearing syenit"],
+}
+
+
+def scan(index, term):
+    """Computes the distance to every text of the vocabulary."""
+    term = fold(term)
+    k = default_distance(term)
+    return [i for i, text in enumerate(index.texts) if edit_distance(term, text, k) <= k]
+
+
+def main(repeat=5):
+    rows = []
+    for vocabulary, terms in TERMS.items():
+        instance = vocabulary()
+        build = timeit(lambda v=vocabulary: fresh(v)().get_fuzzy_index(), repeat)
+        index = instance.get_fuzzy_index()
+        scanned = timeit(lambda i=index, t=terms: [scan(i, term) for term in t], repeat)
+        indexed = timeit(lambda i=index, t=terms: [i.match(term) for term in t], repeat)
+        rows.append([
+            vocabulary.__name__,
+            len(index),
+            f"{build * 1000:.1f}",
+            f"{scanned / len(terms) * 1000:.2f}",
+            f"{indexed / len(terms) * 1000:.2f}",
+            f"{scanned / indexed:.0f}x",
+        ])
+
+    report(
+        "Fuzzy matching of misspelled terms (median ms)",
+        rows,
+        ["vocabulary", "texts", "cold load + build", "scan / term", "index / term", "speedup"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compares building a Concept per database row with resolving rows to interned concepts.
+
+Usage::
+
+    python -m benchmarks.interning
+"""
+
+import random
+import tracemalloc
+
+from .utils import report, setup, timeit
+
+setup()
+
+from example.vocabularies import SimpleLithology  # noqa: E402
+from research_vocabs.core import Concept  # noqa: E402
+
+
+def allocated(func):
+    """Returns the number of bytes still allocated by the result of func."""
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(rows=5000, distinct=30, repeat=5):
+    vocabulary = SimpleLithology()
+    values = random.choices(vocabulary.values[:distinct], k=rows)  # noqa: S311
+
+    def separate():
+        return [Concept(v, vocabulary) for v in values]
+
+    def interned():
+        return [vocabulary.get_concept(v) for v in values]
+
+    results = []
+    for label, func in [("Concept()", separate), ("get_concept()", interned)]:
+        concepts = func()
+        results.append([
+            label,
+            f"{timeit(func, repeat) * 1000:.1f}",
+            allocated(func) // 1024,
+            len({id(c) for c in concepts}),
+            len(set(concepts)),
+        ])
+
+    report(
+        f"{rows} rows, {distinct} distinct values",
+        results,
+        ["constructor", "median ms", "KB", "instances", "len(set())"],
+    )
+
+
+if __name__ == "__main__":
+    main()
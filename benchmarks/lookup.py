@@ -0,0 +1,58 @@
+"""Compares resolving concepts through the graph with resolving them through the vocabulary index.
+
+Usage::
+
+    python -m benchmarks.lookup
+"""
+
+import random
+
+from .utils import report, setup, timeit
+
+setup()
+
+from rdflib.namespace import RDF  # noqa: E402
+
+from example.vocabularies import ISC2020  # noqa: E402
+from research_vocabs.utils import get_URIRef  # noqa: E402
+
+
+def graph_lookup(vocabulary, key):
+    """The lookup performed by Concept.__init__ before the index existed."""
+    uri = get_URIRef(key, vocabulary.graph, vocabulary.ns)
+    name = vocabulary.graph.namespace_manager.compute_qname(uri)[2]
+    if (uri, RDF.type, None) not in vocabulary.graph:
+        raise ValueError(name)
+    return uri, name
+
+
+def main(lookups=100_000, repeat=3):
+    vocabulary = ISC2020()
+    index = vocabulary.index
+    names = vocabulary.values
+    uris = [index.uri(i) for i in index.concepts]
+    curies = [f"{vocabulary._meta.prefix}:{name}" for name in names]
+
+    rows = []
+    for kind, population in [("name", names), ("curie", curies), ("uri", uris)]:
+        keys = random.choices(population, k=lookups)  # noqa: S311
+        graph = timeit(lambda keys=keys: [graph_lookup(vocabulary, k) for k in keys], repeat)
+        indexed = timeit(lambda keys=keys: [index.get(k) for k in keys], repeat)
+        concepts = timeit(lambda keys=keys: [vocabulary.get_concept(k) for k in keys], repeat)
+        rows.append([
+            kind,
+            f"{graph * 1000:.0f}",
+            f"{indexed * 1000:.0f}",
+            f"{concepts * 1000:.0f}",
+            f"{graph / indexed:.0f}x",
+        ])
+
+    report(
+        f"{lookups} ISC2020 lookups (median ms)",
+        rows,
+        ["key", "graph", "index.get", "get_concept", "speedup"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compares pickling a list of 1,000 concepts with the default pickling of their state and with their reduction to
+(vocabulary, name).
+
+Usage::
+
+    python -m benchmarks.pickling
+"""
+
+import copy
+import copyreg
+import io
+import pickle
+
+from .utils import report, setup, timeit
+
+setup()
+
+from example.vocabularies import SimpleLithology  # noqa: E402
+from research_vocabs.core import Concept, VocabularyBase  # noqa: E402
+
+
+class StatePickler(pickle.Pickler):
+    """Pickles concepts and vocabularies the way they were pickled before they defined ``__reduce__``."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, Concept | VocabularyBase):
+            return copyreg.__newobj__, (type(obj),), obj.__dict__
+        return NotImplemented
+
+
+def dumps_state(obj):
+    f = io.BytesIO()
+    StatePickler(f, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return f.getvalue()
+
+
+def dumps(obj):
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def main(repeat=5, size=1000):
+    vocabulary = SimpleLithology()
+    concepts = [vocabulary.get_concept(vocabulary.values[i % len(vocabulary.values)]) for i in range(size)]
+    rows = []
+    for title, touch in [("fresh concepts", False), ("after reading attrs", True)]:
+        if touch:
+            for concept in concepts:
+                concept.attrs  # noqa: B018
+        old, new = dumps_state(concepts), dumps(concepts)
+        rows.append(
+            [
+                title,
+                f"{len(old) / 1024:.0f}",
+                f"{timeit(lambda: dumps_state(concepts), repeat) * 1000:.1f}",
+                f"{timeit(lambda o=old: pickle.loads(o), repeat) * 1000:.1f}",  # noqa: S301
+                f"{len(new) / 1024:.1f}",
+                f"{timeit(lambda: dumps(concepts), repeat) * 1000:.1f}",
+                f"{timeit(lambda n=new: pickle.loads(n), repeat) * 1000:.1f}",  # noqa: S301
+            ]
+        )
+
+    report(
+        f"Pickling {size} concepts (KiB, median ms)",
+        rows,
+        ["state", "state KiB", "dumps", "loads", "reduced KiB", "dumps", "loads"],
+    )
+    deepcopy = timeit(lambda: copy.deepcopy(concepts), repeat)
+    print(f"\ndeepcopy of {size} concepts: {deepcopy * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
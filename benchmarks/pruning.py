@@ -0,0 +1,43 @@
+"""Reports the memory held by the example vocabularies before and after pruning them to the predicates and languages a
+site actually serves.
+
+Usage::
+
+    python -m benchmarks.pruning
+"""
+
+from .utils import report, resident, setup, timeit, variant
+
+setup(VOCABULARY_SNAPSHOTS=False)
+
+from example.vocabularies import ISC2020, FeatureType, SampleStatus, SimpleLithology  # noqa: E402
+
+PRUNING = {"keep_predicates": ["skos:definition"], "languages": ["en", "es"]}
+
+
+def main(repeat=3):
+    rows = []
+    for vocabulary in [ISC2020, SimpleLithology, SampleStatus, FeatureType]:
+        variant(vocabulary)()  # warm up the parser so that its imports are not counted
+        full, full_bytes = resident(variant(vocabulary))
+        pruned, pruned_bytes = resident(variant(vocabulary, **PRUNING))
+        rows.append([
+            vocabulary.__name__,
+            len(full.graph),
+            len(pruned.graph),
+            f"{full_bytes / 1024:.0f}",
+            f"{pruned_bytes / 1024:.0f}",
+            f"{1 - pruned_bytes / full_bytes:.0%}",
+            f"{timeit(lambda v=vocabulary: variant(v)(), repeat) * 1000:.0f}",
+            f"{timeit(lambda v=vocabulary: variant(v, **PRUNING)(), repeat) * 1000:.0f}",
+        ])
+
+    report(
+        f"Memory held after loading, pruned to {PRUNING}",
+        rows,
+        ["vocabulary", "triples", "pruned", "KiB", "pruned KiB", "saved", "load ms", "pruned ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compares resolving a column of mixed identifiers and labels cell by cell with resolve_many().
+
+Usage::
+
+    python -m benchmarks.resolve
+"""
+
+import random
+
+from .utils import report, setup, timeit
+
+setup()
+
+from example.vocabularies import SimpleLithology  # noqa: E402
+
+
+def column(vocabulary, rows):
+    """Returns a column mixing names, CURIEs, URIs, labels in two languages and a few unknown values."""
+    cells = []
+    for concept in vocabulary.concepts():
+        cells += [concept.name, f"lith:{concept.name}", str(concept.URI), concept.label("en").upper(), concept.label("es")]
+    cells += ["unknown", "n/a"]
+    return random.choices(cells, k=rows)  # noqa: S311
+
+
+def per_cell(vocabulary, values):
+    """Calls get_concept on every cell and catches the failures, which cannot resolve labels."""
+    concepts = []
+    for value in values:
+        try:
+            concepts.append(vocabulary.get_concept(value))
+        except ValueError:
+            concepts.append(None)
+    return concepts
+
+
+def main(repeat=3):
+    vocabulary = SimpleLithology()
+    vocabulary.get_label_index()
+    rows = []
+    for size in [10_000, 100_000, 1_000_000]:
+        values = column(vocabulary, size)
+        cells = timeit(lambda v=values: per_cell(vocabulary, v), repeat)
+        batch = timeit(lambda v=values: vocabulary.resolve_many(v), repeat)
+        resolved = sum(c is not None for c in vocabulary.resolve_many(values).concepts)
+        found = sum(c is not None for c in per_cell(vocabulary, values))
+        rows.append([size, f"{cells * 1000:.0f}", found, f"{batch * 1000:.0f}", resolved, f"{cells / batch:.1f}x"])
+
+    report(
+        "Resolving a mixed column (median ms)",
+        rows,
+        ["rows", "get_concept per cell", "resolved", "resolve_many", "resolved", "speedup"],
+    )
+
+
+if __name__ == "__main__":
+    main()
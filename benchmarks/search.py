@@ -0,0 +1,56 @@
+"""Compares scanning every label of a vocabulary for a prefix with the prefix search index.
+
+Usage::
+
+    python -m benchmarks.search
+"""
+
+from .utils import fresh, report, setup, timeit
+
+setup()
+
+from example.vocabularies import ISC2020, SimpleLithology  # noqa: E402
+from research_vocabs.search import fold  # noqa: E402
+
+QUERIES = ["a", "gra", "granite", "lower cret", "felsfar", "xyz"]
+
+
+def scan(vocabulary, q, limit=10):
+    """Folds every label of every concept and tests the start of each word on each query."""
+    q = fold(q)
+    index, tables = vocabulary.index, vocabulary.tables
+    found = []
+    for entry in index.concepts:
+        uri = index.uri(entry)
+        texts = [*index.labels(entry).values(), *(label for _, label in tables.alt_labels.get(uri, ()))]
+        if any(word.startswith(q) for text in texts for word in fold(text).split(" ")):
+            found.append(entry)
+    return found[:limit]
+
+
+def main(repeat=5):
+    rows = []
+    for vocabulary in [ISC2020, SimpleLithology]:
+        instance = vocabulary()
+        build = timeit(lambda v=vocabulary: fresh(v)().get_search_index(), repeat)
+        search = instance.get_search_index()
+        scanned = timeit(lambda v=instance: [scan(v, q) for q in QUERIES], repeat)
+        indexed = timeit(lambda s=search: [s.search(q, "en") for q in QUERIES], repeat)
+        rows.append([
+            vocabulary.__name__,
+            len(search),
+            f"{build * 1000:.1f}",
+            f"{scanned / len(QUERIES) * 1000:.2f}",
+            f"{indexed / len(QUERIES) * 1000:.3f}",
+            f"{scanned / indexed:.0f}x",
+        ])
+
+    report(
+        "Prefix search (median ms)",
+        rows,
+        ["vocabulary", "keys", "cold load + build", "scan / query", "index / query", "speedup"],
+    )
+
+
+if __name__ == "__main__":
+    main()
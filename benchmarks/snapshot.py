@@ -0,0 +1,41 @@
+"""Compares the cold start time of the example vocabularies with and without compiled snapshots.
+
+Usage::
+
+    python -m benchmarks.snapshot
+"""
+
+from .utils import fresh, report, setup, timeit
+
+setup()
+
+from django.test import override_settings  # noqa: E402
+
+from example.vocabularies import ISC2020, SampleStatus, SimpleLithology  # noqa: E402
+from research_vocabs.snapshot import snapshot_path  # noqa: E402
+
+
+def main(repeat=5):
+    rows = []
+    for vocabulary in [ISC2020, SimpleLithology, SampleStatus]:
+        with override_settings(VOCABULARY_SNAPSHOTS=False):
+            parsed = timeit(lambda v=vocabulary: fresh(v)(), repeat)
+
+        # the first load compiles the snapshot, every following load reads it
+        fresh(vocabulary)()
+        compiled = timeit(lambda v=vocabulary: fresh(v)(), repeat)
+
+        size = snapshot_path(vocabulary().get_source_path()).stat().st_size // 1024
+        rows.append([
+            vocabulary.__name__,
+            f"{parsed * 1000:.1f}",
+            f"{compiled * 1000:.1f}",
+            f"{parsed / compiled:.1f}x",
+            size,
+        ])
+
+    report("Cold start (median ms)", rows, ["vocabulary", "parse", "snapshot", "speedup", "snapshot KB"])
+
+
+if __name__ == "__main__":
+    main()
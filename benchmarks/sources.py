@@ -0,0 +1,89 @@
+"""Compares the load time of a generated vocabulary of 100,000 concepts read from a single N-Triples file, a gzipped
+copy of it and four gzipped parts, parsed one after another and in a process pool, into a graph and streamed into a
+columnar index. Every load runs in a fresh process. The load time of every part is reported as well.
+
+Usage::
+
+    python -m benchmarks.sources
+"""
+
+import gzip
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .columnar import NAMESPACE, generate
+from .utils import report, setup
+
+setup(VOCABULARY_SNAPSHOTS=False)
+
+from django.test import override_settings  # noqa: E402
+
+from research_vocabs import LocalVocabulary  # noqa: E402
+from research_vocabs.sources import parse_part, parse_parts  # noqa: E402
+
+
+def split(source: Path, count: int) -> list[Path]:
+    """Splits an N-Triples file into ``count`` gzipped parts of about the same number of lines."""
+    lines = source.read_text().splitlines(keepends=True)
+    size = -(-len(lines) // count)
+    parts = []
+    for i in range(count):
+        parts.append(source.with_name(f"{source.stem}-{i}.nt.gz"))
+        with gzip.open(parts[-1], "wt") as f:
+            f.writelines(lines[i * size : (i + 1) * size])
+    return parts
+
+
+def load(source, streaming: bool, workers: int) -> float:
+    """Returns the time it takes to load the generated vocabulary from ``source``. Meant to run in a fresh process."""
+
+    class Generated(LocalVocabulary):
+        class Meta:
+            prefix = "gen"
+            namespace = NAMESPACE
+            columnar = True
+
+    Generated._meta.source = source
+    Generated._meta.streaming = streaming
+    with override_settings(VOCABULARY_PARSE_WORKERS=workers):
+        start = time.perf_counter()
+        Generated()
+        return time.perf_counter() - start
+
+
+def main(size=100_000, count=4):
+    tmp = Path(tempfile.mkdtemp(prefix="research-vocabs-sources-"))
+    source = tmp / "generated.nt"
+    generate(source, size)
+    compressed = tmp / "generated.nt.gz"
+    compressed.write_bytes(gzip.compress(source.read_bytes()))
+    parts = split(source, count)
+
+    rows = []
+    for part in parse_parts(parse_part, [{"source": part} for part in parts]):
+        path = Path(part.source)
+        rows.append([path.name, f"{path.stat().st_size / 2**20:.1f}", part.triples, f"{part.elapsed:.2f}"])
+    report(f"Parsing the parts of a source of {size:,} concepts in a pool", rows, ["part", "MiB", "triples", "s"])
+
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    for name, sources, workers in [
+        ("nt", str(source), 1),
+        ("nt.gz", str(compressed), 1),
+        (f"{count} parts, sequential", [str(part) for part in parts], 1),
+        (f"{count} parts, pool", [str(part) for part in parts], count),
+    ]:
+        timings = []
+        for streaming in (False, True):
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                timings.append(f"{pool.submit(load, sources, streaming, workers).result():.1f}")
+        rows.append([name, *timings])
+
+    report(f"Loading {size:,} concepts", rows, ["source", "graph s", "stream s"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compares the peak memory and load time of building a columnar index from a graph with streaming the source straight
+into it, for a generated vocabulary of 100,000 concepts in N-Triples, Turtle and RDF/XML. Every load runs in a fresh
+process, peaks are those of the memory allocated by Python while loading.
+
+Usage::
+
+    python -m benchmarks.streaming
+"""
+
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .columnar import NAMESPACE, generate
+from .utils import report, setup
+
+setup(VOCABULARY_SNAPSHOTS=False)
+
+from rdflib import Graph  # noqa: E402
+
+from research_vocabs import LocalVocabulary  # noqa: E402
+
+
+def load(source: str, streaming: bool, trace: bool):
+    """Loads the generated vocabulary and returns its load time, the peak of the memory allocated while loading it if
+    ``trace`` is set, and the number of concepts. Tracing slows loading down, the time of a traced load is not
+    representative."""
+
+    class Generated(LocalVocabulary):
+        class Meta:
+            prefix = "gen"
+            namespace = NAMESPACE
+            columnar = True
+
+    Generated._meta.source = source
+    Generated._meta.streaming = streaming
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    vocabulary = Generated()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    return elapsed, peak, len(vocabulary.index)
+
+
+def main(size=100_000):
+    tmp = Path(tempfile.mkdtemp(prefix="research-vocabs-streaming-"))
+    sources = {"nt": tmp / "generated.nt"}
+    generate(sources["nt"], size)
+    graph = Graph().parse(sources["nt"])
+    triples = len(graph)
+    for name, fmt in [("ttl", "turtle"), ("rdf", "xml")]:
+        sources[name] = tmp / f"generated.{name}"
+        graph.serialize(sources[name], format=fmt)
+    del graph
+
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    for name, source in sources.items():
+        results = []
+        for streaming in (False, True):
+            for trace in (False, True):
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    results.append(pool.submit(load, str(source), streaming, trace).result())
+        (graph_time, _, concepts), (_, graph_peak, _), (stream_time, _, _), (_, stream_peak, _) = results
+        rows.append([
+            name,
+            f"{source.stat().st_size / 2**20:.0f}",
+            concepts,
+            f"{graph_time:.1f}",
+            f"{graph_peak / 2**20:.0f}",
+            f"{stream_time:.1f}",
+            f"{stream_peak / 2**20:.0f}",
+            f"{triples / stream_time:,.0f}",
+            f"{graph_peak / stream_peak:.1f}x",
+        ])
+
+    report(
+        f"Loading {triples:,} triples into a columnar index",
+        rows,
+        ["format", "MiB", "concepts", "graph s", "peak MiB", "stream s", "peak MiB", "triples/s", "less memory"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compares writing the concepts of a vocabulary to the database one row at a time with sync_vocabulary().
+
+Usage::
+
+    python -m benchmarks.sync
+"""
+
+from .utils import report, setup, timeit
+
+setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, reset_queries, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from example.vocabularies import SimpleLithology  # noqa: E402
+from research_vocabs.models import Concept, Vocabulary  # noqa: E402
+from research_vocabs.sync import sync_vocabulary  # noqa: E402
+
+
+def per_row(vocabulary):
+    """The previous implementation of Concept.preload."""
+    with transaction.atomic():
+        scheme = vocabulary.scheme()
+        row, _ = Vocabulary.objects.update_or_create(
+            name=scheme.name, defaults={"label": scheme.label(), "uri": scheme.URI}
+        )
+        for concept in vocabulary.concepts():
+            Concept.objects.update_or_create(
+                vocabulary=row, name=concept.name, defaults={"uri": concept.URI, "label": concept.label()}
+            )
+
+
+def measure(func, repeat, before=None):
+    """Returns the median time of func and the number of queries of its last call. ``before`` runs ahead of every
+    call, outside of the measurement."""
+    timings, queries = [], 0
+    for _ in range(repeat):
+        if before:
+            before()
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            timings.append(timeit(func, 1))
+        queries = len(ctx)
+    return sorted(timings)[len(timings) // 2], queries
+
+
+def main(repeat=5):
+    call_command("migrate", verbosity=0)
+    vocabulary = SimpleLithology()
+    vocabulary.index  # noqa: B018
+
+    def clear():
+        Vocabulary.objects.all().delete()
+
+    def touch():
+        Concept.objects.update(label="")
+
+    cases = [
+        ("empty table", clear),
+        ("every label changed", touch),
+        ("nothing changed", None),
+    ]
+    rows = []
+    for title, before in cases:
+        old, old_queries = measure(lambda: per_row(vocabulary), repeat, before)
+        new, new_queries = measure(lambda b=before: sync_vocabulary(vocabulary, force=b is touch), repeat, before)
+        rows.append([title, f"{old * 1000:.1f}", old_queries, f"{new * 1000:.1f}", new_queries, f"{old / new:.1f}x"])
+
+    report(
+        f"Synchronizing {len(vocabulary.index)} concepts (median ms)",
+        rows,
+        ["state", "update_or_create", "queries", "sync_vocabulary", "queries", "speedup"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Shared helpers for the benchmark scripts.
+
+The benchmarks are plain scripts that are run from the repository root, e.g. ``python -m benchmarks.snapshot``. They
+configure a minimal Django environment themselves so that they do not depend on the example project settings.
+"""
+
+import gc
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup(**overrides):
+    """Configures Django with just enough settings to load the example vocabularies."""
+    if settings.configured:
+        return
+    tmp = Path(tempfile.mkdtemp(prefix="research-vocabs-bench-"))
+    settings.configure(
+        BASE_DIR=tmp,
+        USE_I18N=True,
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "research_vocabs",
+        ],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            "vocabularies": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        },
+        VOCABULARY_SNAPSHOT_DIR=tmp / "snapshots",
+        **overrides,
+    )
+    django.setup()
+
+
+def fresh(vocabulary):
+    """Returns an unloaded copy of a vocabulary class so that every call starts from a cold state."""
+    attrs = {"__module__": vocabulary.__module__, "_graph": None, "tables": None, "index": None, "_concepts": None}
+    return type(vocabulary.__name__, (vocabulary,), attrs)
+
+
+def variant(vocabulary, **options):
+    """Returns an unloaded copy of a local vocabulary with additional Meta options."""
+    from research_vocabs import LocalVocabulary
+
+    # the source path is resolved without loading the vocabulary
+    meta = {k: v for k, v in vars(vocabulary._meta).items() if not k.startswith("_")}
+    meta["source"] = str(vocabulary.__new__(vocabulary).get_source_path())
+    meta.update(options)
+    attrs = {"Meta": type("Meta", (), meta), "__module__": vocabulary.__module__}
+    return fresh(type(vocabulary.__name__, (LocalVocabulary,), attrs))
+
+
+def resident(func):
+    """Calls func and returns its result together with the number of bytes that are still allocated afterwards."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timeit(func, repeat=5):
+    """Calls func ``repeat`` times and returns the median wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def report(title, rows, headers):
+    """Prints a simple fixed width table."""
+    print(f"\n{title}")
+    widths = [max(len(str(x)) for x in col) for col in zip(headers, *rows)]
+    for row in [headers, ["-" * w for w in widths], *rows]:
+        print("  ".join(str(x).ljust(w) for x, w in zip(row, widths)))
@@ -0,0 +1,62 @@
+"""Compares validating concept values by scanning the choices with validating them against the vocabulary index.
+
+Usage::
+
+    python -m benchmarks.validation
+"""
+
+import random
+from types import SimpleNamespace
+
+from .utils import report, setup, timeit
+
+setup()
+
+from django import forms  # noqa: E402
+from django.db import models  # noqa: E402
+
+from example.vocabularies import ISC2020  # noqa: E402
+from research_vocabs.fields import ConceptField  # noqa: E402
+from research_vocabs.forms import TypedConceptChoiceField  # noqa: E402
+
+
+def main(rows=10_000, repeat=3):
+    vocabulary = ISC2020()
+    names = random.choices(vocabulary.values, k=rows)  # noqa: S311
+    concepts = [vocabulary.get_concept(name) for name in names]
+    tagged = [SimpleNamespace(name=c.name, uri=str(c.URI)) for c in concepts]
+
+    field = ConceptField(vocabulary=ISC2020)
+    field.name = "age"
+    formfield = TypedConceptChoiceField(vocabulary=vocabulary, choices=vocabulary.choices)
+
+    def scan_model():
+        # what BaseConceptField.validate did: Django's scan over the choices
+        for concept in concepts:
+            models.Field.validate(field, concept.name, None)
+
+    def scan_form():
+        for name in names:
+            forms.ChoiceField.valid_value(formfield, name)
+
+    def scan_populate():
+        return [c.name for c in tagged if c.name in vocabulary.values]
+
+    results = []
+    for label, scanned, indexed in [
+        ("BaseConceptField.validate", scan_model, lambda: [field.validate(c, None) for c in concepts]),
+        ("form field valid_value", scan_form, lambda: [formfield.valid_value(n) for n in names]),
+        ("populate_concept_fields", scan_populate, lambda: [c.name for c in tagged if c.uri in vocabulary]),
+    ]:
+        before, after = timeit(scanned, repeat), timeit(indexed, repeat)
+        results.append([label, f"{before * 1000:.1f}", f"{after * 1000:.1f}", f"{before / after:.0f}x"])
+
+    report(
+        f"Validating {rows} rows against {len(vocabulary.choices)} choices (median ms)",
+        results,
+        ["check", "scan", "index", "speedup"],
+    )
+
+
+if __name__ == "__main__":
+    main()
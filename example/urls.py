@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 
 from .views import ExampleCRUDView
 
@@ -11,6 +11,7 @@ User = settings.AUTH_USER_MODEL
 urlpatterns = [
     *ExampleCRUDView.get_urls(),
     path("admin/", admin.site.urls),
+    path("", include("research_vocabs.urls")),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,293 @@
+"""A compact in-memory concept index that keeps the SKOS core of a vocabulary in typed arrays instead of an rdflib graph
+and dicts of Python objects, see :class:`ColumnarIndex`.
+
+Layout (all integers are unsigned 32 bit unless stated otherwise)::
+
+    strings           utf-8 arena holding every distinct string of the index once
+    string_offsets    start of every string in the arena, plus the end of the last one
+    names             string id of the local name of every entry
+    uris              string id of the URI of every entry
+    kinds             one of the KIND_* constants of research_vocabs.index per entry (unsigned 8 bit)
+    labels            a column of skos:prefLabel string ids per language, MISSING where an entry has no label in it
+    broader           CSR offsets and entry ids of the skos:broader concepts of every entry
+    narrower          CSR offsets and entry ids of the skos:narrower concepts of every entry
+    members           the skos:member entry ids of every collection in their declared order
+    member_bitmaps    a bitmap over the entries per collection, bit n is set when entry n is a skos:member
+    alt_labels        CSR offsets and (language, text) string id pairs of the skos:altLabels of every entry
+    hidden_labels     CSR offsets and (language, text) string id pairs of the skos:hiddenLabels of every entry
+    notations         CSR offsets and string ids of the skos:notations of every entry
+    slot_keys         open addressing hash table over names and URIs: string id + 1, 0 marks an empty slot
+    slot_entries      entry id belonging to each slot
+"""
+
+import zlib
+from array import array
+
+from .index import KIND_COLLECTION, BaseIndex, ConceptTables, VocabularyIndex, language_chain
+
+UINT = "I"
+
+if array(UINT).itemsize != 4:  # pragma: no cover
+    UINT = "L"
+
+MISSING = 0xFFFFFFFF
+"""Marks an entry without a label in the label column of a language."""
+
+
+def key_hash(key: str) -> int:
+    """Hashes a key of the slot table. Python's hash() is salted per process, this hash is stable so that tables can be
+    stored in files that are shared by several processes."""
+    return zlib.crc32(key.encode())
+
+
+class StringArena:
+    """Accumulates distinct strings into a utf-8 arena and the offsets of every string."""
+
+    def __init__(self):
+        self.ids = {}
+        self.data = bytearray()
+        self.offsets = array(UINT, [0])
+
+    def add(self, value: str) -> int:
+        if (sid := self.ids.get(value)) is None:
+            sid = self.ids[value] = len(self.offsets) - 1
+            self.data += value.encode()
+            self.offsets.append(len(self.data))
+        return sid
+
+    def append(self, value: str) -> int:
+        """Adds a string without looking for an earlier copy of it. Cheaper than :meth:`add` for strings that are
+        rarely repeated, such as labels, since they are not kept in the lookup dict."""
+        self.data += value.encode()
+        self.offsets.append(len(self.data))
+        return len(self.offsets) - 2
+
+    def get(self, sid: int) -> str:
+        return str(self.data[self.offsets[sid] : self.offsets[sid + 1]], "utf-8")
+
+
+class CSR:
+    """Accumulates variable length rows into an offsets/values pair of arrays."""
+
+    def __init__(self):
+        self.offsets = array(UINT, [0])
+        self.values = array(UINT)
+
+    def add_row(self, values):
+        self.values.extend(values)
+        self.offsets.append(len(self.values))
+
+
+def slot_table(keys: dict, strings: StringArena) -> tuple[array, array]:
+    """Builds an open addressing hash table over ``{key: entry}``, adding the keys to the string arena. The table is
+    kept at most half full so that probe sequences stay short."""
+    size = 1
+    while size < 2 * len(keys):
+        size <<= 1
+    slot_keys, slot_entries = array(UINT, bytes(4 * size)), array(UINT, bytes(4 * size))
+    for key, entry in keys.items():
+        slot = key_hash(key) & (size - 1)
+        while slot_keys[slot]:
+            slot = (slot + 1) & (size - 1)
+        slot_keys[slot] = strings.add(key) + 1
+        slot_entries[slot] = entry
+    return slot_keys, slot_entries
+
+
+class StringColumn:
+    """A column of :class:`ColumnarTables` keyed by URI like the dicts of :class:`~research_vocabs.index.ConceptTables`,
+    decoding the rows of a CSR of string ids on access."""
+
+    def __init__(self, index, offsets, values, pairs):
+        self.index = index
+        self.offsets = offsets
+        self.values = values
+        self.pairs = pairs
+
+    def get(self, uri, default=None):
+        entry = self.index._find(str(uri))
+        if entry is None or self.offsets[entry] == self.offsets[entry + 1]:
+            return default
+        ids = self.values[self.offsets[entry] : self.offsets[entry + 1]]
+        string = self.index.string
+        if self.pairs:
+            return [(string(ids[i]) or None, string(ids[i + 1])) for i in range(0, len(ids), 2)]
+        return [string(sid) for sid in ids]
+
+
+class ColumnarTables(ConceptTables):
+    """The tables of a vocabulary served from a :class:`ColumnarIndex`. Only the labels that the search structures read
+    are available: altLabels, hiddenLabels and notations come from the columns of the index, the prefLabels, types and
+    hierarchy are read from the index itself."""
+
+    def __init__(self, index, alt_labels, hidden_labels, notations):
+        super().__init__()
+        self.index = index
+        self.alt_labels = StringColumn(index, *alt_labels, pairs=True)
+        self.hidden_labels = StringColumn(index, *hidden_labels, pairs=True)
+        self.notations = StringColumn(index, *notations, pairs=False)
+
+    def __len__(self):
+        return self.index.size
+
+    def label(self, uri, lang="en"):
+        entry = self.index._find(str(uri))
+        return "" if entry is None else self.index.label(entry, lang)
+
+
+class ColumnarIndex(BaseIndex):
+    """In-memory index that stores the SKOS core of a vocabulary, its concepts, labels, hierarchy and collections, in
+    typed arrays over a single string arena (see the module documentation for the layout). It costs a few dozen bytes
+    per concept instead of the kilobytes of a graph, which makes vocabularies with hundreds of thousands of concepts
+    affordable in every worker. Strings are decoded when they are accessed.
+
+    Decoding is the price of the compact layout: :meth:`labels` decodes a string per language, which for vocabularies
+    with many languages costs tens of microseconds per call where the python index returns a stored dict. Prefer
+    :meth:`label`, which only decodes the label it returns. The choices of every language are decoded once and cached,
+    see :meth:`~research_vocabs.index.BaseIndex.choices`.
+
+    Attributes:
+        size (int): The number of entries.
+        concepts (range): Entry ids of the vocabulary concepts in choice order.
+        scheme (int): Entry id of the concept scheme.
+        namespaces (dict): Namespace bindings of the graph used to expand CURIEs.
+        tables (ColumnarTables): The label tables read by the search structures.
+    """
+
+    def __init__(self, strings, string_offsets, names, uris, kinds, labels, edges, members, slots, concepts, **kwargs):
+        self.strings = strings
+        self.string_offsets = string_offsets
+        self.names = names
+        self.size = len(names)
+        self.uris = uris
+        self.kinds = kinds
+        self.label_columns = labels
+        self.broader_offsets, self.broader_entries, self.narrower_offsets, self.narrower_entries = edges
+        self.member_entries = members
+        self.member_bitmaps = {}
+        for collection, entries in members.items():
+            bitmap = self.member_bitmaps[collection] = bytearray((self.size + 7) // 8)
+            for member in entries:
+                bitmap[member >> 3] |= 1 << (member & 7)
+        self.slot_keys, self.slot_entries = slots
+        self.concepts = range(concepts)
+        self.scheme = kwargs["scheme"]
+        self.namespaces = kwargs["namespaces"]
+        self.tables = ColumnarTables(self, kwargs["alt_labels"], kwargs["hidden_labels"], kwargs["notations"])
+
+    @classmethod
+    def build(cls, index: VocabularyIndex, tables: ConceptTables):
+        """Compacts the index of a vocabulary and the labels of its tables that the search structures read."""
+        strings = StringArena()
+        size = len(index.records)
+        names, uris, kinds = array(UINT), array(UINT), array("B")
+        labels, members = {}, {}
+        broader, narrower, alt_labels, hidden_labels, notations = CSR(), CSR(), CSR(), CSR(), CSR()
+
+        for entry in range(size):
+            uri = index.uri(entry)
+            names.append(strings.add(index.name(entry)))
+            uris.append(strings.add(uri))
+            kinds.append(index.kind(entry))
+            for lang, label in index.labels(entry).items():
+                if (column := labels.get(lang)) is None:
+                    column = labels[lang] = array(UINT, [MISSING]) * size
+                column[entry] = strings.add(label)
+            broader.add_row(index.broader(entry))
+            narrower.add_row(index.narrower(entry))
+            if index.kind(entry) == KIND_COLLECTION:
+                members[entry] = array(UINT, index.members(entry))
+            for table, csr in ((tables.alt_labels, alt_labels), (tables.hidden_labels, hidden_labels)):
+                pairs = table.get(uri, ())
+                csr.add_row([sid for lang, text in pairs for sid in (strings.add(lang or ""), strings.add(text))])
+            notations.add_row([strings.add(notation) for notation in tables.notations.get(uri, ())])
+
+        # CURIEs are expanded through the namespaces by BaseIndex.find, only names and URIs need a slot
+        keys = {index.uri(entry): entry for entry in range(size)}
+        for entry in range(size):
+            keys.setdefault(index.name(entry), entry)
+        slots = slot_table(keys, strings)
+
+        return cls(
+            strings=bytes(strings.data),
+            string_offsets=strings.offsets,
+            names=names,
+            uris=uris,
+            kinds=kinds,
+            labels=labels,
+            edges=(broader.offsets, broader.values, narrower.offsets, narrower.values),
+            members=members,
+            slots=slots,
+            concepts=len(index.concepts),
+            scheme=index.scheme,
+            namespaces=dict(index.namespaces),
+            alt_labels=(alt_labels.offsets, alt_labels.values),
+            hidden_labels=(hidden_labels.offsets, hidden_labels.values),
+            notations=(notations.offsets, notations.values),
+        )
+
+    def string(self, sid: int) -> str:
+        return str(self.strings[self.string_offsets[sid] : self.string_offsets[sid + 1]], "utf-8")
+
+    def _find(self, key: str) -> int | None:
+        encoded = key.encode()
+        mask = len(self.slot_keys) - 1
+        slot = zlib.crc32(encoded) & mask
+        strings, offsets = self.strings, self.string_offsets
+        while sid := self.slot_keys[slot]:
+            if strings[offsets[sid - 1] : offsets[sid]] == encoded:
+                return self.slot_entries[slot]
+            slot = (slot + 1) & mask
+        return None
+
+    def name(self, entry: int) -> str:
+        return self.string(self.names[entry])
+
+    def uri(self, entry: int) -> str:
+        return self.string(self.uris[entry])
+
+    def kind(self, entry: int) -> int:
+        return self.kinds[entry]
+
+    def labels(self, entry: int) -> dict:
+        """Returns all skos:prefLabels of an entry as ``{language: label}``. Untagged labels are keyed by None."""
+        return {
+            lang: self.string(sid) for lang, column in self.label_columns.items() if (sid := column[entry]) != MISSING
+        }
+
+    def broader(self, entry: int) -> list[int]:
+        return self.broader_entries[self.broader_offsets[entry] : self.broader_offsets[entry + 1]].tolist()
+
+    def narrower(self, entry: int) -> list[int]:
+        return self.narrower_entries[self.narrower_offsets[entry] : self.narrower_offsets[entry + 1]].tolist()
+
+    def label(self, entry: int, lang="en") -> str:
+        """Returns the label of an entry in the requested language, see :func:`language_chain`. Only the returned label
+        is decoded."""
+        columns = self.label_columns
+        for code in language_chain(lang):
+            if (column := columns.get(code)) is not None and (sid := column[entry]) != MISSING:
+                return self.string(sid)
+        # like resolve_label, any available label is better than none
+        return next((self.string(sid) for column in columns.values() if (sid := column[entry]) != MISSING), "")
+
+    def members(self, entry: int) -> list[int]:
+        if (entries := self.member_entries.get(entry)) is None:
+            return []
+        return entries.tolist()
+
+    def is_member(self, entry: int, collection: int) -> bool:
+        """Returns whether an entry is a member of a collection without decoding the members."""
+        bitmap = self.member_bitmaps.get(collection)
+        return bitmap is not None and bool(bitmap[entry >> 3] >> (entry & 7) & 1)
+
+    def nbytes(self) -> int:
+        """Returns the number of bytes held by the arrays of the index, excluding the small Python objects around
+        them."""
+        arrays = [self.strings, self.string_offsets, self.names, self.uris, self.kinds, self.slot_keys]
+        arrays += [self.slot_entries, self.broader_offsets, self.broader_entries, self.narrower_offsets]
+        arrays += [self.narrower_entries, *self.label_columns.values(), *self.member_bitmaps.values()]
+        arrays += self.member_entries.values()
+        for column in (self.tables.alt_labels, self.tables.hidden_labels, self.tables.notations):
+            arrays += [column.offsets, column.values]
+        return sum(len(a) * getattr(a, "itemsize", 1) for a in arrays)
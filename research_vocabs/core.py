@@ -1,16 +1,33 @@
+import hashlib
+import json
 import logging
+import sys
+import threading
 from copy import deepcopy
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple
+from weakref import WeakValueDictionary
 
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import translation
 from django.utils.encoding import force_str
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext as _
 from rdflib import Graph, Literal, Namespace, URIRef
 from rdflib.namespace import RDF, SKOS
 
+from .columnar import ColumnarIndex
+from .index import BaseIndex, ConceptTables, VocabularyIndex
+from .mapped import MappedIndex
 from .options import VocabMeta
-from .utils import get_translations, get_URIRef
+from .search import FuzzyIndex, LabelIndex, SearchIndex
+from .utils import get_setting, get_translations, get_URIRef
 
 logger = logging.getLogger(__name__)
 
+_build_locks_lock = threading.Lock()
+
 # TODO:
 # - grouped choices (e.g. by collection or tree structure)
 # - include or exclude concepts using list of values (can use a filter method, can use collections)
@@ -19,6 +36,45 @@ LABEL_PREDICATES = ["skos:prefLabel", "dcterms:title", "rdfs:label", "sdo:name"]
 DESCRIPTION_PREDICATES = ["skos:definition", "dcterms:description", "purl:definition", "sdo:description"]
 
 
+class Resolution(NamedTuple):
+    """The result of :meth:`VocabularyBase.resolve_many`.
+
+    Attributes:
+        concepts (list): The resolved concept of every value, None where the value could not be resolved.
+        unresolved (dict): Maps every value that could not be resolved to its positions in the input.
+        ambiguous (dict): Maps every unresolved value that is the label of several concepts to those concepts.
+    """
+
+    concepts: list
+    unresolved: dict
+    ambiguous: dict
+
+
+def restore_concept(vocabulary, name, rdf_type=None):
+    """Unpickles a :class:`Concept` from its vocabulary and name. Plain concepts come back as the interned instance."""
+    if rdf_type is not None:
+        return Concept(name, vocabulary, rdf_type=rdf_type)
+    return vocabulary.get_concept(name)
+
+
+def restore_vocabulary(name, include_only=None):
+    """Unpickles a vocabulary whose class cannot be imported, e.g. one made by :meth:`VocabularyBase.from_collection`,
+    from the vocabulary registered under the name of its concept scheme."""
+    from .registry import load_pending, vocab_registry
+
+    load_pending()
+    try:
+        vocabulary = vocab_registry[name]
+    except KeyError:
+        msg = f"Cannot unpickle vocabulary '{name}', it is not registered in this process."
+        raise ValueError(msg) from None
+    return vocabulary.__class__(include_only=include_only)
+
+
+def restore_lazy_vocabulary(vocabulary, kwargs):
+    return LazyVocabulary(vocabulary, **kwargs)
+
+
 class ConceptAttrs(dict):
     def __init__(self, graph, namespace, **kwargs):
         self.graph = graph
@@ -35,7 +91,12 @@ class ConceptAttrs(dict):
 
 
 class Concept:
-    """A class representing a SKOS Concept in a given RDF graph. This class is used to extract metadata from a Concept and provide a more user-friendly interface for accessing metadata."""
+    """A class representing a SKOS Concept in a given RDF graph. This class is used to extract metadata from a Concept and provide a more user-friendly interface for accessing metadata.
+
+    Concepts compare and hash by their URI. Instances returned by :meth:`VocabularyBase.get_concept` are interned and
+    shared by every caller, so they should be treated as immutable. For the same reason copies return the concept
+    itself, and a pickled concept only holds its vocabulary and name, see :func:`restore_concept`.
+    """
 
     rdf_type = SKOS.Concept
     definition_types = [
@@ -55,22 +116,29 @@ class Concept:
             self.rdf_type = rdf_type
         self.vocabulary = vocabulary
         self.namespace = self.vocabulary.ns
-        self.graph = vocabulary.graph
-        self.nm = self.graph.namespace_manager
-        self.URI = get_URIRef(URI, self.graph, self.namespace)
-        pre, ns, name = self.nm.compute_qname(self.URI)
-        self.name = name
-        self._attrs = ConceptAttrs(self.graph, self.namespace)
-        if (self.URI, RDF.type, None) not in self.graph:
-            msg = f"'{self.name}' not found in {self.vocabulary.scheme().name}."
+        self._attrs = None
+
+        record = vocabulary.index.get(URI)
+        if record is None:
+            msg = f"'{URI}' not found in {self.vocabulary.scheme().name}."
             raise ValueError(msg)
+        self.entry, self.URI, self.name = record
+
+    @property
+    def graph(self):
+        return self.vocabulary.graph
+
+    @property
+    def nm(self):
+        return self.graph.namespace_manager
 
     def __str__(self):
         return self.name
         # return self.nm.normalizeUri(self.URI)
 
     def __html__(self):
-        curie = self.nm.normalizeUri(self.URI)
+        # the CURIE comes from the index, vocabularies that released their graph must not rebuild it to be rendered
+        curie = self.vocabulary.index.curie(self.entry)
         return f'<a href="{self.get_absolute_url()}">{curie}</a>'
 
     def __repr__(self):
@@ -79,30 +147,30 @@ class Concept:
     def __len__(self):
         return len(self.name)
 
-    @property
-    def attrs(self):
-        """Returns a dictionary containing metadata associated with a given skos:Concept. Metadata is returned as a dict of predicate: object pairs. Multi-valued predicates are returned as lists."""
+    def __eq__(self, other):
+        if not isinstance(other, Concept):
+            return NotImplemented
+        return self.URI == other.URI
 
-        if self._attrs:
-            return self._attrs
+    def __hash__(self):
+        return hash(self.URI)
 
-        for p, o in self.graph.predicate_objects(self.URI):
-            # if isinstance(o, URIRef):
-            #     o = self.nm.normalizeUri(o)
-            # p = self.nm.normalizeUri(p)
+    def __reduce__(self):
+        if "rdf_type" in self.__dict__:
+            return restore_concept, (self.vocabulary, self.name, self.rdf_type)
+        return restore_concept, (self.vocabulary, self.name)
 
-            # if the object is a URI, convert it to a Concept object
-            if (o, RDF.type, SKOS.Concept) in self.graph:
-                o = Concept(o, self.vocabulary)
+    def __copy__(self):
+        return self
 
-            if p not in self._attrs:
-                self._attrs[p] = o
-            else:
-                # if the predicate already exists, turn it into a list and append any new values
-                if not isinstance(self._attrs[p], list):
-                    self._attrs[p] = [self._attrs[p]]
-                self._attrs[p].append(o)
+    def __deepcopy__(self, memo):
+        return self
 
+    @property
+    def attrs(self):
+        """Returns a dictionary containing metadata associated with a given skos:Concept. Metadata is returned as a dict of predicate: object pairs. Multi-valued predicates are returned as lists."""
+        if self._attrs is None:
+            self._attrs = self.vocabulary.get_attrs(self.URI)
         return self._attrs
 
     def definition(self):
@@ -115,10 +183,7 @@ class Concept:
 
     # def label(self, lang=settings.LANGUAGE_CODE):
     def label(self, lang="en"):
-        labels = {}
-        for obj in self.graph.objects(self.URI, SKOS.prefLabel):
-            labels[obj.language] = obj.value
-        return labels.get(lang, labels.get(None, ""))
+        return self.vocabulary.index.label(self.entry, lang)
 
     def get_absolute_url(self):
         return reverse_lazy(
@@ -127,28 +192,139 @@ class Concept:
         )
 
 
+class LazyConcept(Concept):
+    """A Concept that is only resolved against its vocabulary when it is used, as returned by concept fields with
+    ``lazy_concepts=True``. Until then it only holds the stored value and ``str()`` returns that value without
+    touching the vocabulary. Reading ``URI``, ``name`` or ``entry``, which ``label()``, ``attrs`` and comparisons do,
+    resolves it once. A value that is not part of the vocabulary raises a ValueError at that point.
+    """
+
+    _resolved = ("namespace", "entry", "URI", "name")
+
+    def __init__(self, value: str, vocabulary):
+        self.value = value
+        self.vocabulary = vocabulary
+        self._attrs = None
+
+    def __getattr__(self, attr):
+        # only called for attributes that are not set yet
+        if attr in self._resolved:
+            self.resolve()
+            return self.__dict__[attr]
+        raise AttributeError(attr)
+
+    @property
+    def is_resolved(self) -> bool:
+        return "URI" in self.__dict__
+
+    def resolve(self) -> Concept:
+        """Looks up the value in the vocabulary and copies the identity of the concept. Returns the interned Concept."""
+        concept = self.vocabulary.get_concept(self.value)
+        for attr in self._resolved:
+            self.__dict__[attr] = concept.__dict__[attr]
+        return concept
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return f"<LazyConcept: {self.value}>"
+
+    def __reduce__(self):
+        return LazyConcept, (self.value, self.vocabulary)
+
+    def __len__(self):
+        return len(self.value)
+
+
+class ClassGraph:
+    """Stores the graph of a vocabulary on its class so that it is shared by all instances. The graph is built by the
+    first instance that accesses it.
+
+    While the graph is being built it is only visible to the thread building it, it is published on the class once it
+    is complete so that other threads, even those sharing the building instance, never read a graph that is still being
+    modified. They wait for the build lock instead, see :meth:`VocabularyBase.setup_graph`."""
+
+    def __init__(self):
+        self.building = threading.local()
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return owner._graph
+        if (graph := vars(self.building).get(owner)) is not None:
+            return graph
+        if owner._graph is None:
+            instance.setup_graph()
+        return owner._graph
+
+    def __set__(self, instance, value):
+        vars(self.building)[type(instance)] = value
+
+    def __delete__(self, instance):
+        vars(self.building).pop(type(instance), None)
+
+
+class LazyVocabulary(SimpleLazyObject):
+    """A cheap stand-in for a vocabulary instance. The vocabulary is only instantiated, and its graph built, when an
+    attribute of the proxy is first accessed."""
+
+    def __init__(self, vocabulary, **kwargs):
+        self.__dict__["vocabulary_class"] = vocabulary
+        self.__dict__["init_kwargs"] = kwargs
+        super().__init__(partial(vocabulary, **kwargs))
+
+    @property
+    def is_loaded(self):
+        return self._wrapped is not empty
+
+    def __copy__(self):
+        if self._wrapped is empty:
+            return type(self)(self.vocabulary_class, **self.init_kwargs)
+        return super().__copy__()
+
+    def __deepcopy__(self, memo):
+        if self._wrapped is empty:
+            result = type(self)(self.vocabulary_class, **self.init_kwargs)
+            memo[id(self)] = result
+            return result
+        return super().__deepcopy__(memo)
+
+    def __reduce__(self):
+        if self._wrapped is empty:
+            return restore_lazy_vocabulary, (self.vocabulary_class, self.init_kwargs)
+        return super().__reduce__()
+
+
 class VocabularyBase(metaclass=VocabMeta):
     """
     Base class for vocabulary instances.
     """
 
     term_type = SKOS.Concept
-    graph: Graph | None = None
+    supports_shared_index = False
+    """Whether the vocabulary can be served from a memory-mapped index, see :meth:`load_mapped_index`. The
+    ``shared_index`` option is ignored by vocabularies that do not support it."""
+    graph = ClassGraph()
+    tables: ConceptTables | None = None
+    index: BaseIndex | None = None
+
+    _graph: Graph | None = None
 
     _types = set()
     _scheme: Concept | None = None
     _concepts: list[Concept] | None = None
-    _choices: list[tuple[str, str]] | None = None
+    _interned: WeakValueDictionary | None = None
+    _attributes: dict | None = None
+    _search_index: SearchIndex | None = None
+    _fuzzy_index: FuzzyIndex | None = None
+    _label_index: LabelIndex | None = None
+    _choice_cache: dict | None = None
 
     def __init__(self, include_only: list = None):
-        self.ns = Namespace(self._meta.namespace)
-        if self.graph is None:
-            # assigns graph directly to class so that it is shared across all instances
-            self.__class__.graph = self.build_graph()
-
-        self.graph.bind(self._meta.prefix, self.ns)
-        self.namespaces = dict(self.graph.namespaces())
-        self.build_collections()
+        # the class is loaded by its first instance, every later instance is a cheap view over the shared state
+        if self.__class__.__dict__.get("index") is None:
+            self.load()
+
         self.include_only = include_only
         # register the vocabulary with the registry
         # vocab_registry[self.scheme().name] = self
@@ -156,21 +332,198 @@ class VocabularyBase(metaclass=VocabMeta):
     def __str__(self):
         return force_str(self.scheme().label("en"))
 
+    def __reduce__(self):
+        # the graph and indexes live on the class, so an instance is rebuilt from its class and arguments and the
+        # class is loaded, from a snapshot or shared index where possible, by the first instance of a process
+        cls = self.__class__
+        if getattr(sys.modules.get(cls.__module__), cls.__qualname__, None) is cls:
+            return cls, (self.include_only,)
+        return restore_vocabulary, (self.scheme().name, self.include_only)
+
+    def __copy__(self):
+        return self.__class__(self.include_only)
+
+    def __deepcopy__(self, memo):
+        return self.__class__(deepcopy(self.include_only, memo))
+
+    @classmethod
+    def build_lock(cls):
+        """Returns the lock that serializes building the shared state of the class, so that concurrent first instances
+        build it only once."""
+        if (lock := cls.__dict__.get("_build_lock")) is None:
+            with _build_locks_lock:
+                if (lock := cls.__dict__.get("_build_lock")) is None:
+                    lock = cls._build_lock = threading.RLock()
+        return lock
+
+    def load(self):
+        """Initializes the state that is shared by all instances of the class: the namespace, the concept index and,
+        unless the vocabulary is served from a shared, columnar or streamed index, the graph. Any state inherited from a
+        parent class or left over from a previous load is discarded first.
+
+        Only one thread loads a class, concurrent callers wait for it and then reuse its result. The index is published
+        last and is what instances check to decide whether the class is loaded, so they never see a partial state.
+        """
+        cls = self.__class__
+        with cls.build_lock():
+            if cls.__dict__.get("index") is not None:
+                return
+            cls.ns = Namespace(self._meta.namespace)
+            derived = ["_scheme", "_concepts", "_attributes", "_search_index", "_fuzzy_index", "_label_index"]
+            for attr in ["_graph", "tables", "index", *derived]:
+                setattr(cls, attr, None)
+            cls._interned = WeakValueDictionary()
+            cls._choice_cache = {}
+
+            if self.uses_shared_index() and (index := self.load_mapped_index()) is not None:
+                cls.index = index
+            elif self.uses_streaming() and (index := self.load_streamed_index()) is not None:
+                cls.tables = index.tables
+                cls.index = index
+            else:
+                self.setup_graph()
+                if isinstance(cls.index, ColumnarIndex) and not self._meta.keep_graph:
+                    # the graph is rebuilt by the first access to concept metadata
+                    cls._graph = None
+
+    def setup_graph(self):
+        """Builds the graph and assigns it directly to the class so that it is shared across all instances. The graph
+        and the tables and index derived from it are only published once they are complete."""
+        cls = self.__class__
+        with cls.build_lock():
+            if cls._graph is not None:
+                return
+            self.graph = graph = self.build_graph()
+            try:
+                graph.bind(self._meta.prefix, self.ns)
+                self.build_collections()
+                if self.tables is None:
+                    cls.tables = ConceptTables.from_graph(graph)
+                    self.compile_graph(graph)
+                index = cls.__dict__.get("index") or self.build_index()
+            finally:
+                del self.graph
+            if isinstance(index, ColumnarIndex):
+                # the full tables of a snapshot are not kept, the index holds the labels the search structures need
+                cls.tables = index.tables
+            cls._graph = graph
+            cls.index = index
+
+    def compile_graph(self, graph):
+        """Called once a freshly built graph has its collections and the tables derived from it, before they are
+        published. Vocabularies that compile their sources, see :class:`~research_vocabs.vocabularies.LocalVocabulary`,
+        store them here."""
+
+    def build_index(self) -> BaseIndex:
+        """Builds the concept index from the graph and tables, compacted into a :class:`ColumnarIndex` if the vocabulary
+        uses one."""
+        index = VocabularyIndex.build(self)
+        if self.uses_columnar_index():
+            return ColumnarIndex.build(index, self.tables)
+        return index
+
+    @property
+    def namespaces(self):
+        return self.index.namespaces
+
+    @classmethod
+    def uses_shared_index(cls):
+        return cls.supports_shared_index and (cls._meta.shared_index or get_setting("SHARED_INDEX"))
+
+    @classmethod
+    def uses_columnar_index(cls):
+        # a shared index is written from the python index, it takes precedence
+        return (cls._meta.columnar or get_setting("COLUMNAR")) and not cls.uses_shared_index()
+
+    def load_mapped_index(self) -> MappedIndex | None:
+        """Returns a memory-mapped index of the vocabulary, see :mod:`research_vocabs.mapped`. Vocabularies that cannot
+        tell whether an existing index file is still valid without building the graph return None, which makes them
+        fall back to the graph."""
+        return None
+
+    @classmethod
+    def uses_streaming(cls):
+        return (cls._meta.streaming or get_setting("STREAMING")) and not cls.uses_shared_index()
+
+    def load_streamed_index(self) -> ColumnarIndex | None:
+        """Returns a columnar index streamed from the source of the vocabulary, see :mod:`research_vocabs.streaming`.
+        Vocabularies that cannot stream their source return None, which makes them fall back to the graph."""
+        return None
+
+    @classmethod
+    def is_lazy(cls):
+        return cls._meta.lazy or get_setting("LAZY")
+
+    @classmethod
+    def get_instance(cls, **kwargs):
+        """Returns a new instance of the vocabulary, or a :class:`LazyVocabulary` proxy when lazy loading is enabled."""
+        if cls.is_lazy():
+            return LazyVocabulary(cls, **kwargs)
+        return cls(**kwargs)
+
+    def max_length(self):
+        """Returns the length of the longest value in the vocabulary."""
+        key = ("max_length", tuple(self.include_only) if self.include_only else None)
+        if (length := self._choice_cache.get(key)) is None:
+            length = self._choice_cache[key] = max(len(value) for value, _ in self.choices)
+        return length
+
     def __iter__(self):
         return self.choices
 
-    def _source(self):
-        """Source is always parsed into a dict for consistency."""
-        if isinstance(self._meta.source, str):
-            return {"source": self._meta.source}
-        elif isinstance(self._meta.source, dict):
-            return self._meta.source
+    def __contains__(self, value) -> bool:
+        """Returns whether a Concept, or the name, CURIE or URI of one, is one of the choices of the vocabulary. This is
+        a dict lookup in the index, plus a set lookup for vocabularies restricted by ``include_only`` or
+        ``Meta.from_collection``, so validating a value never scans the choices."""
+        index = self.index
+        entry = index.find(getattr(value, "URI", value))
+        # concepts occupy the first entries of the index, anything after them is not a choice
+        if entry is None or entry >= len(index):
+            return False
+        entries = self.choice_entries()
+        return entries is None or entry in entries
+
+    @classmethod
+    def _source(cls, source=None):
+        """Source is always parsed into a dict for consistency. Normalizes a part of a multi-part source if given,
+        otherwise ``Meta.source``."""
+        source = cls._meta.source if source is None else source
+        if isinstance(source, str):
+            return {"source": source}
+        elif isinstance(source, dict):
+            return dict(source)
         else:
-            msg = (
-                f"source must be a string or a dictionary. You provided {type(self._meta.source)}: {self._meta.source}"
-            )
+            msg = f"source must be a string or a dictionary. You provided {type(source)}: {source}"
             raise TypeError(msg)
 
+    @classmethod
+    def _sources(cls) -> list[dict]:
+        """Returns every part of the source as a dict, see :meth:`_source`."""
+        if isinstance(cls._meta.source, list | tuple):
+            return [cls._source(part) for part in cls._meta.source]
+        return [cls._source()]
+
+    @classmethod
+    def source_files(cls) -> list[Path]:
+        """Returns the local files the content of the vocabulary is built from: the module that defines the class."""
+        module = sys.modules.get(cls.__module__)
+        return [Path(module.__file__)] if getattr(module, "__file__", None) else []
+
+    @classmethod
+    def content_version(cls) -> str:
+        """Returns a digest of the size and modification time of the :meth:`source_files`, which changes whenever one
+        of them is modified. It is computed without loading the vocabulary, to key values that are cached across
+        processes."""
+        stats = []
+        for path in cls.source_files():
+            try:
+                stat = path.stat()
+            except OSError:
+                stats.append([str(path)])
+            else:
+                stats.append([str(path), stat.st_size, stat.st_mtime_ns])
+        return hashlib.sha1(json.dumps(stats).encode(), usedforsecurity=False).hexdigest()[:16]
+
     def label(self, lang="en"):
         return self.scheme().label(lang)
 
@@ -186,87 +539,281 @@ class VocabularyBase(metaclass=VocabMeta):
 
     @property
     def choices(self):
-        """Returns a python list of tuples of (value, label) for all skos:Concepts in the ConceptScheme. This is used to populate Django ChoiceFields in the same way as Django's built-in choices."""
-        if self._choices:
-            return self._choices
+        """Returns a python list of tuples of (value, label) for all skos:Concepts in the ConceptScheme, labelled in the active language. This is used to populate Django ChoiceFields in the same way as Django's built-in choices."""
+        return self.get_choices(translation.get_language())
 
-        choices = self.filter_concepts(self.concepts())
+    def get_choices(self, lang="en"):
+        """Returns the choices labelled in the requested language. Choices are computed once per language and cached.
+
+        Args:
+            lang (str): The language of the labels, see :func:`research_vocabs.index.language_chain` for the fallbacks.
+        """
+        key = (lang, tuple(self.include_only) if self.include_only else None)
+        if (choices := self._choice_cache.get(key)) is not None:
+            return choices
+
+        index = self.index
 
         if self.include_only:
             # only return those concepts specified in the "include" list
-            self._choices = [self.get_choice_tuple(self.get_concept(i)) for i in self.include_only]
-            return self._choices
+            choices = [self.get_choice_tuple(self.get_concept(i), lang) for i in self.include_only]
 
-        if coll := self._meta.from_collection:
+        elif coll := self._meta.from_collection:
             # if "from_collection" is specified as a Meta option, return only the members of that collection
-
             collection = Concept(coll, self, rdf_type=SKOS.Collection)
+            choices = [(index.name(m), index.label(m, lang)) for m in index.members(collection.entry)]
+
+        else:
+            choices = index.choices(lang, sort=self._meta.ordered)
+
+        self._choice_cache[key] = choices
+        return choices
+
+    def _get_label_structure(self, attr, build):
+        """Returns a structure built from the labels of the vocabulary by ``build(index, tables)``. It is built on first
+        use and shared by all instances. A vocabulary that is served from a shared index builds its graph first, since
+        the index file only holds the preferred labels."""
+        if (value := getattr(self, attr)) is None:
+            with self.build_lock():
+                if (value := getattr(self, attr)) is None:
+                    if self.tables is None:
+                        self.setup_graph()
+                    value = build(self.index, self.tables)
+                    setattr(self.__class__, attr, value)
+        return value
+
+    def get_search_index(self) -> SearchIndex:
+        """Returns the prefix search index of the vocabulary, see :meth:`search`."""
+        return self._get_label_structure("_search_index", SearchIndex.build)
+
+    def search(self, q: str, lang=None, limit=10) -> list[Concept]:
+        """Returns the concepts with a label, notation or name starting with ``q`` in any language, best matches first.
+        Matching ignores case and accents, see :class:`~research_vocabs.search.SearchIndex` for the ranking. Only the
+        concepts available as choices are returned.
 
-            self._choices = [self.get_choice_tuple(member) for member in collection.attrs["skos:member"]]
-            return self._choices
+        Args:
+            q (str): The text to search for.
+            lang (str): The preferred language, defaults to the active language.
+            limit (int): The maximum number of concepts to return.
+        """
+        matches = self.get_search_index().search(
+            q, lang or translation.get_language(), limit=limit, entries=self.choice_entries()
+        )
+        return [self.get_concept(self.index.uri(m.entry)) for m in matches]
 
-        self._choices = [self.get_choice_tuple(concept) for concept in self.concepts()]
-        return self._choices
+    def get_fuzzy_index(self) -> FuzzyIndex:
+        """Returns the fuzzy index of the vocabulary, see :meth:`suggest`."""
+        return self._get_label_structure("_fuzzy_index", FuzzyIndex.build)
 
-    def tree(self):
-        """Returns a tree structure of the vocabulary."""
-        # { "id" : "name", "parent" : "#" or SKOS.Broader, "text" : "label" },
+    def get_label_index(self) -> LabelIndex:
+        """Returns the label index of the vocabulary, see :meth:`resolve_many`."""
+        return self._get_label_structure("_label_index", LabelIndex.build)
+
+    def resolve_many(self, values) -> Resolution:
+        """Resolves many values at once to concepts, e.g. a column of an import file. Values may be concepts, local
+        names, CURIEs, URIs or labels in any language. Labels match prefLabels, altLabels, hiddenLabels and notations
+        without regard to case, see :class:`~research_vocabs.search.LabelIndex`. Each distinct value is resolved once,
+        so the cost depends on the number of distinct values rather than on the number of rows.
 
-        def get_parents(concept):
-            broader = concept.attrs.get(SKOS.broader)
-            if isinstance(broader, Concept):
-                return broader.name
+        Only the concepts available as choices are resolved. Empty values (None or "") resolve to None and are not
+        reported.
+
+        Returns:
+            Resolution: The concepts in the order of ``values`` (None where a value could not be resolved), the
+            positions of every unresolved value and the candidates of every value that is an ambiguous label.
+        """
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        index = self.index
+        labels = self.get_label_index()
+        entries = self.choice_entries()
+        concepts = len(index)
+
+        resolved, ambiguous = {}, {}
+        for value in dict.fromkeys(values):
+            if value is None or value == "":
+                resolved[value] = None
+                continue
+            entry = index.find(getattr(value, "URI", value))
+            if entry is not None and entry < concepts and (entries is None or entry in entries):
+                candidates = (entry,)
+            else:
+                candidates = [e for e in labels.get(str(value)) if entries is None or e in entries]
+            if len(candidates) == 1:
+                resolved[value] = self.get_concept(index.uri(candidates[0]))
             else:
-                return "#"
+                resolved[value] = None
+                if candidates:
+                    ambiguous[value] = [self.get_concept(index.uri(e)) for e in candidates]
+
+        results = [resolved[value] for value in values]
+        unresolved = {}
+        if any(concept is None and value is not None and value != "" for value, concept in resolved.items()):
+            for i, (value, concept) in enumerate(zip(values, results)):
+                if concept is None and value is not None and value != "":
+                    unresolved.setdefault(value, []).append(i)
+        return Resolution(results, unresolved, ambiguous)
+
+    def suggest(self, value: str, limit=3, max_distance=None) -> list[Concept]:
+        """Returns the concepts that a misspelled name, label or notation most likely refers to, closest first, e.g.
+        ``"Albain"`` -> ``[Albian]``. A value that is already a concept returns just that concept. Only the concepts
+        available as choices are suggested.
+
+        Args:
+            value (str): The misspelled value.
+            limit (int): The maximum number of concepts to return.
+            max_distance (int): The number of typos tolerated, by default one or two depending on the length of the
+                value, see :func:`~research_vocabs.search.default_distance`.
+        """
+        entries = self.choice_entries()
+        entry = self.index.find(value)
+        # collections and the scheme are part of the index too but are never choices, see __contains__
+        if entry is not None and entry < len(self.index) and (entries is None or entry in entries):
+            return [self.get_concept(self.index.uri(entry))]
+        matches = self.get_fuzzy_index().match(value, max_distance=max_distance, limit=limit, entries=entries)
+        return [self.get_concept(self.index.uri(m.entry)) for m in matches]
+
+    def suggest_many(self, values, limit=3, max_distance=None) -> dict[str, list[Concept]]:
+        """Returns the suggestions for many values at once, e.g. all the values of a column of an import file. Each
+        distinct value is matched once. See :meth:`suggest`.
 
+        Returns:
+            dict: Maps every distinct value to its list of suggested concepts, which is empty when nothing is close.
+        """
+        return {value: self.suggest(value, limit, max_distance) for value in dict.fromkeys(values)}
+
+    def did_you_mean(self, value: str) -> str:
+        """Returns a hint naming the concepts closest to an invalid value, or an empty string if there are none."""
+        names = [f"'{c.name}'" for c in self.suggest(str(value))]
+        if not names:
+            return ""
+        if len(names) == 1:
+            return _("Did you mean %(name)s?") % {"name": names[0]}
+        return _("Did you mean %(names)s or %(name)s?") % {"names": ", ".join(names[:-1]), "name": names[-1]}
+
+    def choice_entries(self) -> frozenset | None:
+        """Returns the index entries of the choices when they are restricted by ``include_only`` or
+        ``Meta.from_collection``, or None when every concept of the vocabulary is a choice."""
+        if not self.include_only and not self._meta.from_collection:
+            return None
+        key = ("entries", tuple(self.include_only) if self.include_only else None)
+        if (entries := self._choice_cache.get(key)) is None:
+            entries = self._choice_cache[key] = frozenset(self.index.find(value) for value, _ in self.choices)
+        return entries
+
+    def tree(self):
+        """Returns a tree structure of the vocabulary as a flat list of jstree nodes. Prefer :meth:`tree_children`, which
+        only returns the part of the tree that is actually displayed."""
+        # { "id" : "name", "parent" : "#" or SKOS.Broader, "text" : "label" },
+        index = self.index
+        hierarchy = index.hierarchy
         tree = []
         for concept in self.concepts():
-            parents = concept.attrs.get(SKOS.broader)
-            if isinstance(parents, list):
-                for parent in parents:
-                    tree.append(
-                        {
-                            "id": concept.name,
-                            "parent": parent.name,
-                            "text": concept.label(),
-                            "a_attr": {"href": concept.get_absolute_url()},
-                        }
-                    )
-            elif isinstance(parents, Concept):
-                tree.append(
-                    {
-                        "id": concept.name,
-                        "parent": parents.name,
-                        "text": concept.label(),
-                        "a_attr": {"href": concept.get_absolute_url()},
-                    }
-                )
-            else:
+            parents = [index.name(p) for p in hierarchy.parents[concept.entry]] or ["#"]
+            for parent in parents:
                 tree.append(
                     {
                         "id": concept.name,
-                        "parent": "#",
+                        "parent": parent,
                         "text": concept.label(),
                         "a_attr": {"href": concept.get_absolute_url()},
                     }
                 )
         return tree
 
+    def tree_children(self, node="#", selected=None, lang="en"):
+        """Returns the children of a node of the hierarchy as jstree nodes, suitable for jstree's AJAX mode.
+
+        Node ids are the path of concept names from the root joined by "/", so concepts with several parents get a
+        unique id for every position in the tree. Children are not included, only whether there are any, so that
+        jstree requests them when the node is opened.
+
+        Args:
+            node (str): The id of the node to expand, or "#" for the top level.
+            selected (str): A concept to reveal when the top level is requested. The nodes on the path from its root
+                are returned opened, with their children included, and the concept itself is marked as selected.
+            lang (str): The language of the node labels.
+        """
+        index = self.index
+        hierarchy = index.hierarchy
+        vocabulary = self.scheme().name
+
+        def build(entry, prefix, path):
+            name = index.name(entry)
+            node_id = f"{prefix}{name}"
+            data = {
+                "id": node_id,
+                "text": index.label(entry, lang),
+                "children": bool(hierarchy.children[entry]),
+                "data": {"name": name},
+                "a_attr": {"href": reverse("vocabularies:term", kwargs={"vocabulary": vocabulary, "term": name})},
+            }
+            if path and path[0] == entry:
+                if len(path) == 1:
+                    data["state"] = {"selected": True}
+                else:
+                    data["state"] = {"opened": True}
+                    data["children"] = [build(c, f"{node_id}/", path[1:]) for c in hierarchy.children[entry]]
+            return data
+
+        if node == "#":
+            entry = index.find(selected) if selected else None
+            path = hierarchy.path_to_root(entry) if entry in hierarchy.parents else []
+            return [build(root, "", path) for root in hierarchy.roots]
+
+        entry = index.find(node.rsplit("/", 1)[-1])
+        if entry not in hierarchy.children:
+            msg = f"'{node}' is not a node of {vocabulary}."
+            raise ValueError(msg)
+        return [build(child, f"{node}/", []) for child in hierarchy.children[entry]]
+
+    def _hierarchy_entry(self, concept) -> int:
+        entry = self.index.find(concept.URI if isinstance(concept, Concept) else concept)
+        if entry not in self.index.hierarchy.parents:
+            msg = f"'{concept}' is not a concept of {self.scheme().name}."
+            raise ValueError(msg)
+        return entry
+
+    def _get_concepts(self, entries) -> list[Concept]:
+        return [self.get_concept(self.index.uri(e)) for e in sorted(entries)]
+
+    def ancestors(self, concept: Concept | str) -> list[Concept]:
+        """Returns all broader concepts of a concept, following skos:broader and skos:narrower transitively. The
+        concepts are returned in the order of the vocabulary.
+
+        Args:
+            concept (Concept, str): A Concept or the name, CURIE or URI of one.
+        """
+        return self._get_concepts(self.index.hierarchy.ancestors[self._hierarchy_entry(concept)])
+
+    def descendants(self, concept: Concept | str) -> list[Concept]:
+        """Returns all narrower concepts of a concept, transitively. See :meth:`ancestors`."""
+        return self._get_concepts(self.index.hierarchy.descendants[self._hierarchy_entry(concept)])
+
+    def is_descendant_of(self, concept: Concept | str, ancestor: Concept | str) -> bool:
+        """Returns whether ``concept`` is a narrower concept of ``ancestor`` at any depth, e.g. whether a lithology is a
+        kind of igneous rock."""
+        return self.index.hierarchy.is_descendant_of(self._hierarchy_entry(concept), self._hierarchy_entry(ancestor))
+
+    def depth(self, concept: Concept | str) -> int:
+        """Returns the number of steps between a concept and the top of the hierarchy, top level concepts have a depth
+        of 0. Concepts with several parents are measured along the shortest path."""
+        return self.index.hierarchy.depths[self._hierarchy_entry(concept)]
+
     def get_absolute_url(self):
         name = self.scheme().name
         return reverse_lazy("vocabularies:detail", kwargs={"vocabulary": name})
 
-    def get_choice_tuple(self, concept: Concept):
-        return concept.name, concept.label()
+    def get_choice_tuple(self, concept: Concept, lang="en"):
+        return concept.name, concept.label(lang)
 
     def build_graph(self):
         """This should be overriden in the subclass to build the graph from a local file or remote URL."""
         raise NotImplementedError("You must implement the build_graph method in your subclass.")
 
     def scheme(self) -> Concept:
-        if not self._scheme:
-            scheme = self.graph.value(predicate=RDF.type, object=SKOS.ConceptScheme)
-            self._scheme = Concept(scheme, self, rdf_type=SKOS.ConceptScheme)
+        if self._scheme is None:
+            scheme = self.index.uri(self.index.scheme)
+            self.__class__._scheme = Concept(scheme, self, rdf_type=SKOS.ConceptScheme)
         return self._scheme
 
     def get_subjects(self):
@@ -292,17 +839,16 @@ class VocabularyBase(metaclass=VocabMeta):
         self._types = types
 
     def get_terms(self):
-        """Builds a list of Concept objects from the generator returned by self.get_subjects. Override this if you want to filter the concepts in a specific way."""
-        return [Concept(s, self) for s in self.get_subjects()]
+        """Builds a list of Concept objects for the concepts in the index, which are collected from the generator returned by self.get_subjects. Override this if you want to filter the concepts in a specific way."""
+        return [self.get_concept(self.index.uri(i)) for i in self.index.concepts]
 
     def concepts(self):
         """"""
         if self._concepts:
             return self._concepts
 
+        # the index already stores the concepts in their final order
         self.__class__._concepts = self.get_terms()
-        if self._meta.ordered:
-            self.__class__._concepts = sorted(self.__class__._concepts, key=lambda x: x.label())
         return self.__class__._concepts
 
     def filter_concepts(self, concept_list):
@@ -310,8 +856,63 @@ class VocabularyBase(metaclass=VocabMeta):
         return concept_list
 
     def get_concept(self, name: str | URIRef) -> Concept:
-        """Returns a Concept object from the Graph based on the name or URI."""
-        return Concept(name, self)
+        """Returns a Concept object from the Graph based on the name or URI.
+
+        Concepts are interned per vocabulary class: as long as a concept is referenced somewhere, every lookup of it
+        returns the same instance instead of building a new one.
+        """
+        record = self.index.get(name)
+        if record is None:
+            # raises a ValueError with the usual message
+            return Concept(name, self)
+
+        concept = self._interned.get(record.uri)
+        if concept is None:
+            concept = self._interned.setdefault(record.uri, Concept(record.uri, self))
+        return concept
+
+    def get_attrs(self, uri: URIRef) -> ConceptAttrs:
+        """Returns the attributes of a subject in the graph. The attributes of all subjects are materialized on first
+        use."""
+        if self._attributes is None:
+            with self.build_lock():
+                if self._attributes is None:
+                    self.materialize()
+        return self._attributes.get(uri) or ConceptAttrs(self.graph, self.ns)
+
+    def materialize(self):
+        """Sweeps the triples of the graph once and groups them into a :class:`ConceptAttrs` per subject. Objects that
+        are themselves skos:Concepts are resolved to interned Concept objects through the index. The attributes are
+        stored on the class and shared by all instances."""
+        graph = self.graph
+        rdf_type, skos_concept = RDF.type, SKOS.Concept
+        grouped, concepts = {}, set()
+        for s, p, o in graph:
+            grouped.setdefault(s, []).append((p, o))
+            if p == rdf_type and o == skos_concept:
+                concepts.add(s)
+
+        attributes = {}
+        for subject, pairs in grouped.items():
+            values = {}
+            for p, o in pairs:
+                # if the object is a URI, convert it to a Concept object
+                if o in concepts:
+                    o = self.get_concept(o)
+
+                if p not in values:
+                    values[p] = o
+                else:
+                    # if the predicate already exists, turn it into a list and append any new values
+                    if not isinstance(values[p], list):
+                        values[p] = [values[p]]
+                    values[p].append(o)
+
+            attrs = attributes[subject] = ConceptAttrs(graph, self.ns)
+            attrs.update(values)
+
+        self.__class__._attributes = attributes
+        return attributes
 
     # BUILDER METHODS
 
@@ -389,10 +990,16 @@ class VocabularyBase(metaclass=VocabMeta):
     def from_collection(cls, collection: str):
         meta = deepcopy(cls._meta)
         meta.from_collection = collection
-        self = type(
-            f"{collection.capitalize()}Vocabulary",
-            (cls,),
-            {**cls.__dict__, "_meta": meta},
-        )()
+        # the view shares the graph and index of the class, but not the concepts, which are bound to their vocabulary
+        namespace = {
+            **cls.__dict__,
+            "_meta": meta,
+            "_scheme": None,
+            "_concepts": None,
+            "_attributes": None,
+            "_interned": WeakValueDictionary(),
+            "_choice_cache": {},
+        }
+        self = type(f"{collection.capitalize()}Vocabulary", (cls,), namespace)()
         self.concepts()
         return self
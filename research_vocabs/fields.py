@@ -1,14 +1,21 @@
+import hashlib
+import json
+from functools import partial
+
 from django.contrib.contenttypes.fields import GenericRelation
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils.functional import lazy
 from django.utils.module_loading import import_string
 from django.utils.translation import gettext as _
 
-from research_vocabs.core import Concept
+from research_vocabs.core import Concept, LazyConcept
 
 from . import registry
-
-# from .registry import vocab_registry
-from .utils import validate_url_safe
+from .forms import TypedConceptChoiceField
+from .lookups import AncestorOf, DescendantOf, WithinCollection
+from .utils import cache, validate_url_safe
+from .widgets import ConceptSelect
 
 
 class MissingConceptSchemeError(Exception):
@@ -40,26 +47,73 @@ class BaseConceptField(models.Field):
 
         Args:
             scheme (ConceptScheme): The concept scheme that this field belongs to.
+            lazy_concepts (bool): Return :class:`~research_vocabs.core.LazyConcept` objects from the database, which
+                are only resolved against the vocabulary when they are used. Useful for large list views and exports
+                that mostly print the stored values.
         """
+        self.lazy_concepts = kwargs.pop("lazy_concepts", False)
         self.vocabulary = kwargs.pop("vocabulary", None)
         if not self.vocabulary:
             raise MissingConceptSchemeError
 
-        self.scheme = self.vocabulary(include_only=include_only)
+        self.lazy = self.vocabulary.is_lazy()
+        self.scheme = self.vocabulary.get_instance(include_only=include_only)
 
-        # vocab_registry.register(self.scheme)
+        # the views behind the autocomplete widget look the vocabulary up in the registry, registration of lazy
+        # vocabularies is deferred until the registry is read
+        registry.register(self.vocabulary.get_instance() if include_only else self.scheme)
+        # choices are a callable so that they are labelled in the active language
+        kwargs["choices"] = self._get_scheme_choices
 
-        kwargs["choices"] = list(self.scheme.choices)
-        kwargs["verbose_name"] = kwargs.get("verbose_name", self.scheme.scheme().label())
-        kwargs["max_length"] = len(max(self.scheme.choices, key=lambda x: len(x[0]))[0])
+        if self.lazy:
+            # nothing here may touch the vocabulary, it is loaded on first use
+            kwargs["verbose_name"] = kwargs.get("verbose_name", lazy(self._get_scheme_label, str)())
+            kwargs["max_length"] = kwargs.get("max_length") or self._get_cached_max_length(include_only)
+        else:
+            kwargs["verbose_name"] = kwargs.get("verbose_name", self.scheme.scheme().label())
+            kwargs["max_length"] = self.scheme.max_length()
 
         super().__init__(*args, **kwargs)
 
+    def _get_scheme_choices(self):
+        return self.scheme.choices
+
+    def _get_scheme_label(self):
+        return self.scheme.scheme().label()
+
+    def _get_cached_max_length(self, include_only=None):
+        """Lazy fields that do not declare max_length fall back to a value cached in the vocabulary cache, so the
+        vocabulary is only loaded at import time while the cache is cold. The value is keyed on the
+        :meth:`~research_vocabs.core.VocabularyBase.content_version` of the vocabulary, editing its source or its
+        class computes it again."""
+        vocabulary = self.vocabulary
+        key = f"max_length:{vocabulary.__module__}.{vocabulary.__qualname__}:{vocabulary.content_version()}"
+        if include_only:
+            key += ":" + hashlib.sha1(json.dumps(list(include_only)).encode(), usedforsecurity=False).hexdigest()[:16]
+        if (max_length := cache.get(key)) is None:
+            max_length = self.scheme.max_length()
+            cache.set(key, max_length, None)
+        return max_length
+
+    def formfield(self, **kwargs):
+        # large vocabularies are rendered as an autocomplete input rather than a select with every concept
+        kwargs.setdefault("widget", ConceptSelect(self.scheme))
+        kwargs.setdefault("choices_form_class", partial(TypedConceptChoiceField, vocabulary=self.scheme))
+        return super().formfield(**kwargs)
+
+    def _check_choices(self):
+        # choices are generated from the vocabulary, evaluating them during system checks would load it
+        if self.lazy:
+            return []
+        return super()._check_choices()
+
     def deconstruct(self):
         """Used to recreate the field."""
         name, path, args, kwargs = super().deconstruct()
         kwargs["vocabulary"] = self.vocabulary
         kwargs.pop("choices", None)
+        if self.lazy_concepts:
+            kwargs["lazy_concepts"] = True
         return name, path, args, kwargs
 
     def get_choice_data(self):
@@ -103,6 +157,10 @@ class BaseConceptField(models.Field):
         if value is None:
             return value
 
+        elif isinstance(value, LazyConcept) and not value.is_resolved:
+            # write back the stored value without resolving it
+            return value.value
+
         elif isinstance(value, Concept):
             return value.name
 
@@ -115,7 +173,10 @@ class BaseConceptField(models.Field):
         if value is None:
             return value
 
-        return Concept(value, self.scheme)
+        if self.lazy_concepts:
+            return LazyConcept(value, self.scheme)
+
+        return self.scheme.get_concept(value)
 
     def to_python(self, value):
         """
@@ -127,7 +188,17 @@ class BaseConceptField(models.Field):
         if value is None or value == "":
             return value
 
-        return Concept(value, self.scheme)
+        try:
+            return self.scheme.get_concept(value)
+        except ValueError:
+            raise self.invalid_choice(value) from None
+
+    def invalid_choice(self, value) -> ValidationError:
+        """Returns the error for a value that is not one of the choices, suggesting the closest concepts."""
+        message = self.error_messages["invalid_choice"]
+        if hint := self.scheme.did_you_mean(value):
+            message = f"{message} {hint.replace('%', '%%')}"
+        return ValidationError(message, code="invalid_choice", params={"value": value})
 
     def validate(self, value, model_instance):
         """
@@ -139,7 +210,9 @@ class BaseConceptField(models.Field):
         if not isinstance(value, Concept):
             raise ValueError(f"{value} is not a Concept object.")
 
-        super().validate(value.name, model_instance)
+        # the membership test goes through the index of the vocabulary instead of scanning the choices
+        if self.editable and value not in self.scheme:
+            raise self.invalid_choice(value.name)
 
 
 class ConceptURIField(BaseConceptField, models.URLField):
@@ -160,6 +233,11 @@ class ConceptField(BaseConceptField, models.CharField):
             validate_url_safe(str(value))
 
 
+BaseConceptField.register_lookup(DescendantOf)
+BaseConceptField.register_lookup(AncestorOf)
+BaseConceptField.register_lookup(WithinCollection)
+
+
 class RelatedConceptMixin:
     """
     A mixin for fields that are related to a concept in a vocabulary.
@@ -167,18 +245,18 @@ class RelatedConceptMixin:
     """
 
     def __init__(self, *args, vocabulary=None, **kwargs):
+        if isinstance(vocabulary, str):
+            vocabulary = import_string(vocabulary)
+
         self.vocabulary = vocabulary
         if not self.vocabulary:
             raise MissingConceptSchemeError
 
-        self.scheme = self.vocabulary()
+        self.scheme = self.vocabulary.get_instance()
         if not kwargs.get("to"):
             # If no 'to' argument is provided, set it to the default Concept model.
             # This allows the field to be used as a foreign key or many-to-many field to a concept.
             kwargs["to"] = "research_vocabs.Concept"
-
-        if isinstance(vocabulary, str):
-            vocabulary = import_string(vocabulary)
         # if not issubclass(vocabulary, VocabularyBase):
         #     raise TypeError(f"Expected a VocabularyBase instance, got {type(vocabulary)} instead.")
 
@@ -1,8 +1,24 @@
 from django import forms
-from django.utils.safestring import mark_safe
+from django.core.exceptions import ValidationError
+from django.utils.functional import lazy
+from django.utils.safestring import SafeString, mark_safe
 
+from research_vocabs import registry
 from research_vocabs.core import Concept as BaseConcept
 from research_vocabs.models import Concept
+from research_vocabs.widgets import ConceptSelect, ConceptSelectMultiple
+
+
+class TypedConceptChoiceField(forms.TypedChoiceField):
+    """The form field of model concept fields. Submitted values are validated against the index of the vocabulary
+    instead of scanning the choices."""
+
+    def __init__(self, *args, vocabulary, **kwargs):
+        self.vocabulary = vocabulary
+        super().__init__(*args, **kwargs)
+
+    def valid_value(self, value):
+        return value in self.vocabulary
 
 
 class TaggableConceptFormMixin:
@@ -36,8 +52,8 @@ class TaggableConceptFormMixin:
         concepts = getattr(self.instance, self.taggable_field_name).all()
         for fname in self.taggable_fields:
             f_vocab = self.fields[fname].vocabulary
-            # this will produce wrong results if multiple vocabularies have a term with the same name
-            self.initial[fname] = [c.name for c in concepts if c.name in f_vocab.values]
+            # matching by URI keeps terms with the same name in other vocabularies out
+            self.initial[fname] = [c.name for c in concepts if c.uri in f_vocab]
 
     def clean(self):
         """Clean all fields."""
@@ -63,37 +79,84 @@ class TaggableConceptFormMixin:
         self.update_taggable_concepts()
 
     def update_taggable_concepts(self):
-        concepts = []
-        for c in self.concepts:
-            obj, created = Concept.add_concept(c)
-            concepts.append(obj)
-        getattr(self.instance, self.taggable_field_name).set(set(concepts))
+        pks = Concept.objects.get_or_create_many(self.concepts)
+        getattr(self.instance, self.taggable_field_name).set(pks.values())
 
 
 class ConceptFieldMixin:
-    def __init__(self, vocabulary, *args, **kwargs):
-        self.vocabulary = vocabulary()
-        kwargs["choices"] = self.vocabulary.choices
-
-        kwargs["label"] = kwargs.get("label", self.vocabulary.label())
-        if not kwargs.get("help_text"):
-            scheme_uri = self.vocabulary.scheme().URI
-            label = self.vocabulary.label()
-            kwargs["help_text"] = mark_safe(  # noqa: S308
-                f"Select terms from the <a href='{scheme_uri}' target='_blank'>{label}</a> controlled vocabulary."  # noqa: S608
-            )
+    """Common behaviour of the concept form fields.
+
+    Args:
+        vocabulary (type[VocabularyBase]): The vocabulary class whose concepts are the choices.
+        autocomplete (bool): Whether to render an autocomplete input instead of a ``<select>`` with every concept. By
+            default the autocomplete input is used once the vocabulary has more than
+            ``VOCABULARY_AUTOCOMPLETE_THRESHOLD`` choices. Ignored when a widget is passed.
+    """
+
+    autocomplete_widget = None
+
+    def __init__(self, vocabulary, *args, autocomplete=None, **kwargs):
+        self.vocabulary = vocabulary.get_instance()
+        # the choices endpoint of the autocomplete widget serves registered vocabularies
+        registry.register(self.vocabulary)
+        # choices are evaluated on every render so that they follow the active language
+        kwargs["choices"] = self._get_vocabulary_choices
+        if autocomplete is not False and "widget" not in kwargs:
+            kwargs["widget"] = self.autocomplete_widget(self.vocabulary, threshold=0 if autocomplete else None)
+
+        if vocabulary.is_lazy():
+            # defer everything that needs the graph until the form is rendered or validated
+            kwargs["label"] = kwargs.get("label", lazy(self._get_vocabulary_label, str)())
+            if not kwargs.get("help_text"):
+                kwargs["help_text"] = lazy(self._get_help_text, SafeString)()
+        else:
+            kwargs["label"] = kwargs.get("label", self._get_vocabulary_label())
+            if not kwargs.get("help_text"):
+                kwargs["help_text"] = self._get_help_text()
         super().__init__(*args, **kwargs)
 
+    def _get_vocabulary_choices(self):
+        return self.vocabulary.choices
+
+    def valid_value(self, value):
+        """Checks a concept against the index of the vocabulary instead of scanning the choices."""
+        return value in self.vocabulary
+
+    def get_concept(self, value):
+        """Returns the concept for a submitted value, raising a validation error that suggests the closest concepts
+        when the value is unknown."""
+        try:
+            return self.vocabulary.get_concept(value)
+        except ValueError:
+            message = self.error_messages["invalid_choice"]
+            if hint := self.vocabulary.did_you_mean(value):
+                message = f"{message} {hint.replace('%', '%%')}"
+            raise ValidationError(message, code="invalid_choice", params={"value": value}) from None
+
+    def _get_vocabulary_label(self):
+        return self.vocabulary.label()
+
+    def _get_help_text(self):
+        scheme_uri = self.vocabulary.scheme().URI
+        label = self.vocabulary.label()
+        return mark_safe(  # noqa: S308
+            f"Select terms from the <a href='{scheme_uri}' target='_blank'>{label}</a> controlled vocabulary."  # noqa: S608
+        )
+
 
 class ConceptField(ConceptFieldMixin, forms.ChoiceField):
+    autocomplete_widget = ConceptSelect
+
     def to_python(self, value):
         if value in self.empty_values:
             return None
-        return self.vocabulary.get_concept(value)
+        return self.get_concept(value)
 
 
 class MultiConceptField(ConceptFieldMixin, forms.MultipleChoiceField):
+    autocomplete_widget = ConceptSelectMultiple
+
     def to_python(self, value):
         if not value:
             return []
-        return [self.vocabulary.get_concept(v) for v in value]
+        return [self.get_concept(v) for v in value]
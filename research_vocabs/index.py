@@ -0,0 +1,451 @@
+import hashlib
+import json
+import logging
+from functools import cached_property, lru_cache
+from typing import NamedTuple
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, SKOS
+
+from .utils import get_setting
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=256)
+def _language_chain(lang, fallback):
+    chain = []
+    if lang:
+        lang = lang.lower()
+        chain += [lang, lang.split("-")[0]]
+    chain += [code.lower() for code in fallback]
+    chain.append(None)
+    return tuple(dict.fromkeys(chain))
+
+
+def language_chain(lang: str | None) -> tuple:
+    """Returns the languages that are tried, in order, when looking up a label in ``lang``: the language itself, its
+    base language (``en-us`` -> ``en``), the languages of the ``VOCABULARY_LABEL_FALLBACK`` setting and finally
+    untagged labels (None)."""
+    return _language_chain(lang, tuple(get_setting("LABEL_FALLBACK")))
+
+
+def resolve_label(labels: dict, chain: tuple) -> str:
+    """Picks a label from a ``{language: label}`` dict following a language chain. If none of the languages in the
+    chain has a label, any available label is returned rather than an empty string."""
+    for lang in chain:
+        if (label := labels.get(lang)) is not None:
+            return label
+    return next(iter(labels.values()), "")
+
+
+class ConceptTables:
+    """Plain python tables derived from a vocabulary graph. All keys and values are stored as strings so that the
+    tables are cheap to pickle and do not depend on the namespace bindings of the graph they were extracted from.
+
+    Attributes:
+        types (dict): Maps each subject URI to a list of its rdf:type URIs.
+        labels (dict): Maps each subject URI to a dict of ``{language: skos:prefLabel}``. Language tags are lower case.
+        broader (dict): Maps each subject URI to a list of its skos:broader URIs.
+        narrower (dict): Maps each subject URI to a list of its skos:narrower URIs.
+        alt_labels (dict): Maps each subject URI to a list of ``(language, skos:altLabel)`` tuples.
+        hidden_labels (dict): Maps each subject URI to a list of ``(language, skos:hiddenLabel)`` tuples.
+        notations (dict): Maps each subject URI to a list of its skos:notation values.
+    """
+
+    def __init__(
+        self, types=None, labels=None, broader=None, narrower=None, alt_labels=None, hidden_labels=None, notations=None
+    ):
+        self.types = types or {}
+        self.labels = labels or {}
+        self.broader = broader or {}
+        self.narrower = narrower or {}
+        self.alt_labels = alt_labels or {}
+        self.hidden_labels = hidden_labels or {}
+        self.notations = notations or {}
+
+    def __len__(self):
+        return len(self.types)
+
+    @classmethod
+    def from_graph(cls, graph: Graph):
+        """Builds the tables in a single sweep over the triples of the graph."""
+        tables = cls()
+        for s, p, o in graph:
+            if p == RDF.type:
+                tables.types.setdefault(str(s), []).append(str(o))
+            elif p == SKOS.prefLabel:
+                lang = getattr(o, "language", None)
+                tables.labels.setdefault(str(s), {})[lang.lower() if lang else None] = str(o)
+            elif p == SKOS.broader:
+                tables.broader.setdefault(str(s), []).append(str(o))
+            elif p == SKOS.narrower:
+                tables.narrower.setdefault(str(s), []).append(str(o))
+            elif p == SKOS.altLabel or p == SKOS.hiddenLabel:
+                lang = getattr(o, "language", None)
+                table = tables.alt_labels if p == SKOS.altLabel else tables.hidden_labels
+                table.setdefault(str(s), []).append((lang.lower() if lang else None, str(o)))
+            elif p == SKOS.notation:
+                tables.notations.setdefault(str(s), []).append(str(o))
+        return tables
+
+    def label(self, uri, lang="en"):
+        """Returns the skos:prefLabel of a subject in the requested language, see :func:`language_chain`."""
+        return resolve_label(self.labels.get(str(uri), {}), language_chain(lang))
+
+
+KIND_CONCEPT = 0
+KIND_SCHEME = 1
+KIND_COLLECTION = 2
+KIND_OTHER = 3
+"""Any other typed subject in the graph that is not one of the vocabulary concepts (e.g. filtered by Meta.rdf_type)."""
+
+
+class ConceptRecord(NamedTuple):
+    """The precomputed identity of an entry in a vocabulary index."""
+
+    entry: int
+    uri: URIRef
+    name: str
+
+
+class Hierarchy:
+    """Adjacency and transitive closure of the vocabulary concepts along skos:broader and skos:narrower, precomputed
+    once per index. Relations to resources that are not vocabulary concepts are ignored and children are kept in the
+    order of the index.
+
+    Concepts may have several parents. Cycles are collapsed into strongly connected components first, every member of
+    a cycle is an ancestor (and a descendant) of the other members but never of itself.
+
+    Attributes:
+        parents (dict): Maps each concept entry to a tuple of its parent entries.
+        children (dict): Maps each concept entry to a tuple of its child entries.
+        roots (tuple): Concept entries at the top of the hierarchy: concepts without parents, plus the first member of
+            any cycle that is not below such a concept.
+        ancestors (dict): Maps each concept entry to a frozenset of all its transitive parents.
+        descendants (dict): Maps each concept entry to a frozenset of all its transitive children.
+        depths (dict): Maps each concept entry to the smallest number of steps from one of the roots.
+    """
+
+    def __init__(self, index):
+        concepts = index.concepts
+        parents = self._parents(index)
+        children = {c: [] for c in concepts}
+        for c in concepts:
+            for p in parents[c]:
+                children[p].append(c)
+
+        self.parents = {c: tuple(p) for c, p in parents.items()}
+        self.children = {c: tuple(ch) for c, ch in children.items()}
+
+        components = self._components(concepts)
+        self.ancestors = self._closure(components)
+        descendants = {c: set() for c in concepts}
+        for c, ancestors in self.ancestors.items():
+            for a in ancestors:
+                descendants[a].add(c)
+        self.descendants = {c: frozenset(d) for c, d in descendants.items()}
+        self.roots = self._roots(concepts, components)
+        self.depths = self._depths()
+
+    @staticmethod
+    def _parents(index) -> dict:
+        """Merges skos:broader and the inverse of skos:narrower into ordered parent sets, keeping only concepts."""
+        parents = {c: {} for c in index.concepts}
+        for c in index.concepts:
+            for p in index.broader(c):
+                if p in parents and p != c:
+                    parents[c][p] = None
+            for n in index.narrower(c):
+                if n in parents and n != c:
+                    parents[n][c] = None
+        return parents
+
+    def _roots(self, concepts, components) -> tuple:
+        roots = {c for c in concepts if not self.parents[c]}
+        for component in components:
+            # a cycle that nothing else points to would otherwise be unreachable from the roots
+            if len(component) > 1 and not any(self.ancestors[c] - set(component) for c in component):
+                roots.add(next(c for c in concepts if c in component))
+        return tuple(c for c in concepts if c in roots)
+
+    def _components(self, concepts) -> list[tuple]:
+        """Tarjan's algorithm over the parent edges, without recursion. Components are returned parents first."""
+        order, low, stack, on_stack, components = {}, {}, [], set(), []
+        for start in concepts:
+            if start in order:
+                continue
+            work = [(start, iter(self.parents[start]))]
+            order[start] = low[start] = len(order)
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, parents = work[-1]
+                for p in parents:
+                    if p not in order:
+                        order[p] = low[p] = len(order)
+                        stack.append(p)
+                        on_stack.add(p)
+                        work.append((p, iter(self.parents[p])))
+                        break
+                    if p in on_stack:
+                        low[node] = min(low[node], order[p])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == order[node]:
+                        components.append(self._pop_component(stack, on_stack, node))
+        return components
+
+    @staticmethod
+    def _pop_component(stack, on_stack, root) -> tuple:
+        """Pops the members of the component of ``root`` off the Tarjan stack."""
+        component = []
+        while True:
+            member = stack.pop()
+            on_stack.discard(member)
+            component.append(member)
+            if member == root:
+                return tuple(component)
+
+    def _closure(self, components) -> dict:
+        ancestors = {}
+        for component in components:
+            # parents of a component have all been completed already
+            members = frozenset(component)
+            above = set()
+            for c in component:
+                for p in self.parents[c]:
+                    if p not in members:
+                        above.add(p)
+                        above |= ancestors[p]
+            for c in component:
+                ancestors[c] = frozenset(above | (members - {c}))
+        return ancestors
+
+    def _depths(self) -> dict:
+        depths = dict.fromkeys(self.roots, 0)
+        queue = list(self.roots)
+        for node in queue:
+            for child in self.children[node]:
+                if child not in depths:
+                    depths[child] = depths[node] + 1
+                    queue.append(child)
+        return depths
+
+    def path_to_root(self, entry: int) -> list[int]:
+        """Returns the entries from a root down to ``entry``, following the first parent of every concept."""
+        path, seen = [entry], {entry}
+        while parents := [p for p in self.parents.get(path[-1], ()) if p not in seen]:
+            path.append(parents[0])
+            seen.add(parents[0])
+        return path[::-1]
+
+    def is_descendant_of(self, entry: int, ancestor: int) -> bool:
+        return ancestor in self.ancestors.get(entry, ())
+
+
+class BaseIndex:
+    """Common interface of the concept indexes. Entries are addressed by integer ids, the vocabulary concepts occupy the
+    first ids in the order in which they are presented as choices. Subclasses implement the storage."""
+
+    namespaces: dict
+    scheme: int
+
+    def __len__(self):
+        """Number of vocabulary concepts."""
+        return len(self.concepts)
+
+    def _find(self, key: str) -> int | None:
+        raise NotImplementedError
+
+    def find(self, key) -> int | None:
+        """Returns the entry id for a local name, CURIE or URI, or None if it is not part of the index. CURIEs with a
+        prefix other than the vocabulary prefix are expanded using the namespace bindings of the graph."""
+        key = str(key)
+        if (entry := self._find(key)) is not None:
+            return entry
+        prefix, sep, name = key.partition(":")
+        if sep and (namespace := self.namespaces.get(prefix)) is not None:
+            return self._find(namespace + name)
+        return None
+
+    def get(self, key) -> ConceptRecord | None:
+        """Returns the record of a local name, CURIE or URI, or None if it is not part of the index."""
+        entry = self.find(key)
+        return None if entry is None else self.record(entry)
+
+    def record(self, entry: int) -> ConceptRecord:
+        return ConceptRecord(entry, URIRef(self.uri(entry)), self.name(entry))
+
+    def label(self, entry: int, lang="en") -> str:
+        """Returns the label of an entry in the requested language, see :func:`language_chain`."""
+        return resolve_label(self.labels(entry), language_chain(lang))
+
+    def curie(self, entry: int) -> str:
+        """Returns the CURIE of an entry using the longest matching namespace binding of the graph, or the URI in angle
+        brackets if no namespace binds it, like :meth:`rdflib.namespace.NamespaceManager.normalizeUri` but without
+        touching the graph."""
+        uri = self.uri(entry)
+        matches = [
+            (prefix, namespace)
+            for prefix, namespace in self.namespaces.items()
+            if uri.startswith(namespace) and (name := uri[len(namespace) :]) and "/" not in name and "#" not in name
+        ]
+        if not matches:
+            return f"<{uri}>"
+        prefix, namespace = max(matches, key=lambda match: len(match[1]))
+        return f"{prefix}:{uri[len(namespace) :]}"
+
+    @cached_property
+    def hierarchy(self) -> Hierarchy:
+        return Hierarchy(self)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """A digest of the concepts, their labels and their hierarchy. It changes whenever the content of the
+        vocabulary changes and is identical in every process, which makes it suitable for HTTP validators."""
+        digest = hashlib.sha1(usedforsecurity=False)
+        for entry in self.concepts:
+            labels = sorted((lang or "", label) for lang, label in self.labels(entry).items())
+            digest.update(json.dumps([self.uri(entry), labels, self.hierarchy.parents[entry]]).encode())
+        return digest.hexdigest()
+
+    def choices(self, lang="en", sort=False) -> list[tuple[str, str]]:
+        """Returns ``(name, label)`` tuples of the vocabulary concepts labelled in the requested language. The choices
+        are computed once per language chain and cached on the index.
+
+        Args:
+            lang (str): The language of the labels.
+            sort (bool): Sort the choices by label instead of keeping the order of the index.
+        """
+        chain = language_chain(lang)
+        cache = self.__dict__.setdefault("_choices", {})
+        if (choices := cache.get((chain, sort))) is None:
+            choices = [(self.name(i), self.label(i, lang)) for i in self.concepts]
+            if sort:
+                choices.sort(key=lambda choice: choice[1])
+            cache[chain, sort] = choices
+        return choices
+
+
+class VocabularyIndex(BaseIndex):
+    """In-memory index of a vocabulary, built once when the vocabulary is loaded. It maps local names, CURIEs and full
+    URIs to precomputed records so that looking up a concept is a single dict hit that never touches the graph.
+
+    Attributes:
+        keys (dict): Maps names, CURIEs and URIs to entry ids.
+        records (list): A :class:`ConceptRecord` per entry.
+        kinds (list): One of the ``KIND_*`` constants per entry.
+        concepts (tuple): Entry ids of the vocabulary concepts in choice order.
+        scheme (int): Entry id of the concept scheme.
+        namespaces (dict): Namespace bindings of the graph used to expand CURIEs.
+    """
+
+    def __init__(self, keys, records, kinds, labels, broader, narrower, members, concepts, scheme, namespaces):
+        self.keys = keys
+        self.records = records
+        self.kinds = kinds
+        self._labels = labels
+        self._broader = broader
+        self._narrower = narrower
+        self._members = members
+        self.concepts = concepts
+        self.scheme = scheme
+        self.namespaces = namespaces
+
+    @classmethod
+    def build(cls, vocabulary):
+        """Builds the index from the loaded graph and tables of a vocabulary."""
+        graph = vocabulary.graph
+        tables = vocabulary.tables
+        nm = graph.namespace_manager
+        namespace = str(vocabulary.ns)
+        prefix = vocabulary._meta.prefix
+
+        subjects = list(dict.fromkeys(vocabulary.get_subjects()))
+        if vocabulary._meta.ordered:
+            subjects.sort(key=tables.label)
+
+        # vocabulary concepts come first so that their entry ids equal their position in the choices
+        entries = dict.fromkeys(subjects, KIND_CONCEPT)
+        scheme = graph.value(predicate=RDF.type, object=SKOS.ConceptScheme)
+        entries.setdefault(scheme, KIND_SCHEME)
+        for rdf_type in (SKOS.Collection, SKOS.OrderedCollection):
+            for s in graph.subjects(RDF.type, rdf_type):
+                entries.setdefault(s, KIND_COLLECTION)
+        for s in graph.subjects(RDF.type, None, unique=True):
+            entries.setdefault(s, KIND_OTHER)
+        entries.pop(None, None)
+
+        ids = {str(s): i for i, s in enumerate(entries)}
+        keys, records, kinds, labels, broader, narrower, members = {}, [], [], [], [], [], []
+        for i, (subject, kind) in enumerate(entries.items()):
+            uri = str(subject)
+            try:
+                name = nm.compute_qname(subject)[2]
+            except (ValueError, KeyError):
+                name = uri
+            records.append(ConceptRecord(i, subject, name))
+            kinds.append(kind)
+            labels.append(tables.labels.get(uri, {}))
+            broader.append(tuple(ids[o] for o in tables.broader.get(uri, ()) if o in ids))
+            narrower.append(tuple(ids[o] for o in tables.narrower.get(uri, ()) if o in ids))
+            if kind == KIND_COLLECTION:
+                members.append(tuple(ids[str(o)] for o in graph.objects(subject, SKOS.member) if str(o) in ids))
+            else:
+                members.append(())
+            keys[uri] = i
+
+        # full URIs always win, afterwards the first entry to claim a name or CURIE keeps it
+        for record in records:
+            keys.setdefault(record.name, record.entry)
+            if prefix and str(record.uri).startswith(namespace):
+                keys.setdefault(f"{prefix}:{record.name}", record.entry)
+
+        return cls(
+            keys=keys,
+            records=records,
+            kinds=kinds,
+            labels=labels,
+            broader=broader,
+            narrower=narrower,
+            members=members,
+            concepts=tuple(range(len(subjects))),
+            scheme=ids.get(str(scheme)),
+            namespaces={p: str(ns) for p, ns in graph.namespaces()},
+        )
+
+    def _find(self, key):
+        return self.keys.get(key)
+
+    def get(self, key):
+        entry = self.keys.get(key)
+        if entry is None:
+            entry = self.find(key)
+        return None if entry is None else self.records[entry]
+
+    def record(self, entry):
+        return self.records[entry]
+
+    def name(self, entry):
+        return self.records[entry].name
+
+    def uri(self, entry):
+        return str(self.records[entry].uri)
+
+    def kind(self, entry):
+        return self.kinds[entry]
+
+    def labels(self, entry):
+        return self._labels[entry]
+
+    def broader(self, entry):
+        return list(self._broader[entry])
+
+    def narrower(self, entry):
+        return list(self._narrower[entry])
+
+    def members(self, entry):
+        return list(self._members[entry])
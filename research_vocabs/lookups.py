@@ -0,0 +1,80 @@
+import json
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Lookup
+
+from .index import KIND_COLLECTION
+
+
+class ConceptSetLookup(Lookup):
+    """Base class for lookups that expand a single concept into the set of values that match it, using the
+    precomputed hierarchy or collection index of the vocabulary of the field. The value may be a Concept or the name,
+    CURIE or URI of one.
+
+    Small sets are rendered as a plain ``IN`` list. Sets larger than ``bulk_threshold`` are passed as a single
+    parameter on databases that can unpack one (an array on PostgreSQL, a JSON array on SQLite), so that the query
+    does not hit the parameter limit of the database.
+    """
+
+    prepare_rhs = False
+    bulk_threshold = 100
+
+    def get_entries(self, index, entry) -> set[int]:
+        raise NotImplementedError
+
+    def get_values(self) -> list[str]:
+        vocabulary = self.lhs.output_field.scheme
+        index = vocabulary.index
+        key = getattr(self.rhs, "URI", self.rhs)
+        entry = index.find(key)
+        if entry is None:
+            msg = f"'{self.rhs}' not found in {vocabulary.scheme().name}."
+            raise ValueError(msg)
+        return sorted(index.name(e) for e in self.get_entries(index, entry))
+
+    def as_sql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        values = self.get_values()
+        if not values:
+            raise EmptyResultSet
+
+        if len(values) > self.bulk_threshold:
+            if connection.vendor == "postgresql":
+                return f"{lhs} = ANY(%s)", (*params, values)
+            if connection.vendor == "sqlite":
+                # lhs is the column compiled by Django, the values are passed as a parameter
+                return f"{lhs} IN (SELECT value FROM json_each(%s))", (*params, json.dumps(values))  # noqa: S608
+
+        placeholders = ", ".join(["%s"] * len(values))
+        return f"{lhs} IN ({placeholders})", (*params, *values)
+
+
+class DescendantOf(ConceptSetLookup):
+    """Matches concepts that are narrower than the given concept at any depth, e.g.
+    ``Sample.objects.filter(lithology__descendant_of="igneous_rock")``. The concept itself does not match."""
+
+    lookup_name = "descendant_of"
+
+    def get_entries(self, index, entry):
+        return index.hierarchy.descendants.get(entry, ())
+
+
+class AncestorOf(ConceptSetLookup):
+    """Matches concepts that are broader than the given concept at any depth. The concept itself does not match."""
+
+    lookup_name = "ancestor_of"
+
+    def get_entries(self, index, entry):
+        return index.hierarchy.ancestors.get(entry, ())
+
+
+class WithinCollection(ConceptSetLookup):
+    """Matches concepts that are members of the given skos:Collection."""
+
+    lookup_name = "within_collection"
+
+    def get_entries(self, index, entry):
+        if index.kind(entry) != KIND_COLLECTION:
+            msg = f"'{self.rhs}' is not a collection."
+            raise ValueError(msg)
+        return index.members(entry)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from research_vocabs.sync import sync_vocabularies
+
+
+class Command(BaseCommand):
+    help = "Synchronizes the Vocabulary and Concept tables with the registered vocabularies, writing only the changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("vocabularies", nargs="*", help="Names of the vocabularies to synchronize, all by default.")
+        parser.add_argument(
+            "--keep-removed",
+            action="store_true",
+            help="Keep the rows of concepts that are no longer part of their vocabulary.",
+        )
+        parser.add_argument("--force", action="store_true", help="Compare every row even if nothing seems to change.")
+        parser.add_argument("--batch-size", type=int, help="The number of rows written per query.")
+
+    def handle(self, *args, **options):
+        try:
+            results = sync_vocabularies(
+                options["vocabularies"] or None,
+                delete=not options["keep_removed"],
+                force=options["force"],
+                batch_size=options["batch_size"],
+            )
+        except ValueError as e:
+            raise CommandError(e) from e
+
+        for result in results:
+            if result.changed:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{result.vocabulary}: {result.inserted} inserted, {result.updated} updated, "
+                        f"{result.deleted} deleted in {result.elapsed:.2f}s"
+                    )
+                )
+            else:
+                self.stdout.write(f"{result.vocabulary}: unchanged ({result.elapsed:.2f}s)")
@@ -0,0 +1,233 @@
+"""A read-only concept index that is stored in a file and accessed through ``mmap``.
+
+Every process that opens the same index file maps the same physical pages, so pre-forked workers share a single copy
+of the index instead of each holding their own graph and Concept objects. Nothing is decoded up front: numeric
+sections are exposed as zero-copy ``memoryview`` casts over the mapping and strings are only decoded when an entry is
+accessed.
+
+File layout (all integers are native unsigned 32 bit unless stated otherwise)::
+
+    magic (4 bytes) | version | length of header | header (json) | section table (offset, length as u64 pairs)
+    strings           utf-8 arena holding every string in the index
+    string_offsets    start of every string in the arena, plus the end of the last one
+    entry_name        string id of the local name of every entry
+    entry_uri         string id of the URI of every entry
+    entry_kind        one of the KIND_* constants of research_vocabs.index
+    label_offsets     CSR offsets into labels
+    labels            (language string id, label string id) pairs, the empty string stands for untagged labels
+    broader_offsets   CSR offsets into broader
+    broader           entry ids of skos:broader concepts
+    narrower_offsets  CSR offsets into narrower
+    narrower          entry ids of skos:narrower concepts
+    member_offsets    CSR offsets into members
+    members           entry ids of skos:member resources
+    concepts          entry ids of the vocabulary concepts, in the order they are presented as choices
+    slot_keys         open addressing hash table over names, CURIEs and URIs: string id + 1, 0 marks an empty slot
+    slot_entries      entry id belonging to each slot
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+from .columnar import CSR, UINT, StringArena, key_hash, slot_table
+from .index import BaseIndex, VocabularyIndex
+from .snapshot import snapshot_dir
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RVIX"
+INDEX_VERSION = 1
+
+SECTIONS = (
+    "strings",
+    "string_offsets",
+    "entry_name",
+    "entry_uri",
+    "entry_kind",
+    "label_offsets",
+    "labels",
+    "broader_offsets",
+    "broader",
+    "narrower_offsets",
+    "narrower",
+    "member_offsets",
+    "members",
+    "concepts",
+    "slot_keys",
+    "slot_entries",
+)
+
+_PREAMBLE = struct.Struct("<4sII")
+_SECTION = struct.Struct("<QQ")
+
+
+def index_path(source: Path, options: dict) -> Path:
+    """Returns the index file of a source file. Vocabularies that share a source but differ in their Meta options get
+    separate index files."""
+    fingerprint = json.dumps([str(source), options], sort_keys=True)
+    digest = hashlib.sha1(fingerprint.encode(), usedforsecurity=False).hexdigest()[:16]
+    return snapshot_dir() / f"{source.name}-{digest}.index"
+
+
+def write_index(path: Path, index: VocabularyIndex, header: dict) -> Path:
+    """Compiles an in-memory vocabulary index into an index file at ``path``. The file is written next to its final
+    location and moved into place atomically, so processes never map a partially written index.
+
+    Args:
+        path (Path): Location of the index file.
+        index (VocabularyIndex): The index of a loaded vocabulary.
+        header (dict): Json serializable metadata stored in the file, used to validate the index when it is opened.
+    """
+    strings = StringArena()
+    names, uris, kinds = array(UINT), array(UINT), array(UINT)
+    labels, broader, narrower, members = CSR(), CSR(), CSR(), CSR()
+
+    for record in index.records:
+        names.append(strings.add(record.name))
+        uris.append(strings.add(str(record.uri)))
+        kinds.append(index.kind(record.entry))
+
+        row = []
+        for lang, label in index.labels(record.entry).items():
+            row += [strings.add(lang or ""), strings.add(label)]
+        labels.add_row(row)
+        broader.add_row(index.broader(record.entry))
+        narrower.add_row(index.narrower(record.entry))
+        members.add_row(index.members(record.entry))
+
+    slot_keys, slot_entries = slot_table(index.keys, strings)
+    concepts = array(UINT, index.concepts)
+    header = {**header, "byteorder": sys.byteorder, "scheme": index.scheme, "namespaces": index.namespaces}
+
+    sections = {
+        "strings": bytes(strings.data),
+        "string_offsets": strings.offsets,
+        "entry_name": names,
+        "entry_uri": uris,
+        "entry_kind": kinds,
+        "label_offsets": labels.offsets,
+        "labels": labels.values,
+        "broader_offsets": broader.offsets,
+        "broader": broader.values,
+        "narrower_offsets": narrower.offsets,
+        "narrower": narrower.values,
+        "member_offsets": members.offsets,
+        "members": members.values,
+        "concepts": concepts,
+        "slot_keys": slot_keys,
+        "slot_entries": slot_entries,
+    }
+
+    header_bytes = json.dumps(header).encode()
+    start = _PREAMBLE.size + len(header_bytes) + _SECTION.size * len(SECTIONS)
+    table, blobs, offset = [], [], (start + 7) & ~7
+    for name in SECTIONS:
+        blob = bytes(sections[name])
+        table.append((offset, len(blob)))
+        blobs.append((offset, blob))
+        offset = (offset + len(blob) + 7) & ~7
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, INDEX_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for section in table:
+                f.write(_SECTION.pack(*section))
+            for offset, blob in blobs:
+                f.seek(offset)
+                f.write(blob)
+        os.replace(tmp, path)
+    except OSError:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+class MappedIndex(BaseIndex):
+    """Read-only view of an index file written by :func:`write_index`."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != INDEX_VERSION:
+            msg = f"{path} is not a concept index of version {INDEX_VERSION}."
+            raise ValueError(msg)
+        self.header = json.loads(self._mmap[_PREAMBLE.size : _PREAMBLE.size + header_length])
+        if self.header["byteorder"] != sys.byteorder:
+            msg = f"{path} was written on a platform with a different byte order."
+            raise ValueError(msg)
+
+        view = memoryview(self._mmap)
+        position = _PREAMBLE.size + header_length
+        for name in SECTIONS:
+            offset, length = _SECTION.unpack_from(self._mmap, position)
+            position += _SECTION.size
+            section = view[offset : offset + length]
+            setattr(self, f"_{name}", section if name == "strings" else section.cast(UINT))
+
+        self.scheme = self.header["scheme"]
+        self.namespaces = self.header["namespaces"]
+
+    @classmethod
+    def open(cls, path: Path):
+        """Opens an index file, returning None when it is missing or unreadable."""
+        try:
+            return cls(path)
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+
+    def _string(self, sid: int) -> str:
+        return str(self._strings[self._string_offsets[sid] : self._string_offsets[sid + 1]], "utf-8")
+
+    @property
+    def concepts(self):
+        """Entry ids of the vocabulary concepts in choice order."""
+        return self._concepts
+
+    def _find(self, key: str) -> int | None:
+        mask = len(self._slot_keys) - 1
+        slot = key_hash(key) & mask
+        while sid := self._slot_keys[slot]:
+            if self._string(sid - 1) == key:
+                return self._slot_entries[slot]
+            slot = (slot + 1) & mask
+        return None
+
+    def name(self, entry: int) -> str:
+        return self._string(self._entry_name[entry])
+
+    def uri(self, entry: int) -> str:
+        return self._string(self._entry_uri[entry])
+
+    def kind(self, entry: int) -> int:
+        return self._entry_kind[entry]
+
+    def labels(self, entry: int) -> dict:
+        """Returns all skos:prefLabels of an entry as ``{language: label}``. Untagged labels are keyed by None."""
+        pairs = self._labels[self._label_offsets[entry] : self._label_offsets[entry + 1]]
+        return {(self._string(pairs[i]) or None): self._string(pairs[i + 1]) for i in range(0, len(pairs), 2)}
+
+    def _row(self, offsets, values, entry):
+        return values[offsets[entry] : offsets[entry + 1]].tolist()
+
+    def broader(self, entry: int) -> list[int]:
+        return self._row(self._broader_offsets, self._broader, entry)
+
+    def narrower(self, entry: int) -> list[int]:
+        return self._row(self._narrower_offsets, self._narrower, entry)
+
+    def members(self, entry: int) -> list[int]:
+        return self._row(self._member_offsets, self._members, entry)
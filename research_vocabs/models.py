@@ -1,8 +1,11 @@
+from functools import partial
+
 from django.contrib.contenttypes.fields import GenericForeignKey
-from django.db import models, transaction
+from django.db import connections, models, transaction
+from django.db.models.signals import class_prepared, post_delete
 from django.utils.translation import gettext as _
 
-from .registry import vocab_registry
+from .sync import concept_pks, sync_concepts, sync_vocabularies
 
 
 class Vocabulary(models.Model):
@@ -45,6 +48,36 @@ class ConceptManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset()
 
+    def get_or_create_many(self, concepts) -> dict:
+        """Returns the primary keys of the rows of core :class:`~research_vocabs.core.Concept` objects keyed by URI,
+        inserting the rows that are missing.
+
+        The number of queries does not depend on the number of concepts: primary keys resolved before are taken from
+        an in-process cache (see :class:`~research_vocabs.sync.PKCache`), the others are read in a single query and
+        the missing rows are inserted with ``bulk_create``. Keys read or written inside a transaction are only cached
+        once it is committed.
+        """
+        concepts = {str(c.URI): c for c in concepts}
+        pks = concept_pks.get_many(self.model, concepts)
+        if not (missing := [uri for uri in concepts if uri not in pks]):
+            return pks
+
+        found = dict(self.filter(uri__in=missing).values_list("uri", "pk"))
+        if new := [concepts[uri] for uri in missing if uri not in found]:
+            rows = self.bulk_create(
+                self.model.build_rows(new),
+                update_conflicts=True,
+                unique_fields=["uri"],
+                update_fields=["name", "label"],
+            )
+            found.update((row.uri, row.pk) for row in rows if row.pk is not None)
+            if len(found) < len(missing):
+                # databases that do not return the keys of upserted rows
+                found.update(self.filter(uri__in=[c for c in missing if c not in found]).values_list("uri", "pk"))
+
+        transaction.on_commit(partial(concept_pks.update, self.model, found), using=self.db)
+        return {**pks, **found}
+
 
 class AbstractConcept(models.Model):
     """Model for storing skos:Concepts"""
@@ -105,6 +138,11 @@ class AbstractConcept(models.Model):
 
         return cls.objects.update_or_create(uri=concept.URI, defaults=defaults)
 
+    @classmethod
+    def build_rows(cls, concepts) -> list:
+        """Returns unsaved rows for core concepts, see :meth:`ConceptManager.get_or_create_many`."""
+        return [cls(uri=str(concept.URI), **cls._get_defaults(concept)) for concept in concepts]
+
     @classmethod
     def _get_defaults(cls, concept):
         return {
@@ -118,9 +156,20 @@ class AbstractConcept(models.Model):
         """If a vocabulary is set, preload all concepts from the vocabulary. The alternative is to slowly populate the table as concepts are added via form fields, etc."""
         if cls._vocabulary is not None:
             # raise ValueError("No vocabulary set for this concept model.")
-            with transaction.atomic():
-                for concept in cls._vocabulary.concepts():
-                    cls.add_concept(concept)
+            sync_concepts(cls, cls._vocabulary, cls.objects.all(), delete=False)
+
+
+def discard_pk(sender, instance, using=None, **kwargs):
+    concept_pks.discard(sender, instance.uri, using=using)
+
+
+def connect_pk_cache(sender, **kwargs):
+    """Keeps deleted rows of every concept model out of the primary key cache."""
+    if issubclass(sender, AbstractConcept):
+        post_delete.connect(discard_pk, sender=sender)
+
+
+class_prepared.connect(connect_pk_cache)
 
 
 class Concept(AbstractConcept):
@@ -139,29 +188,31 @@ class Concept(AbstractConcept):
     @classmethod
     def preload(cls):
         """If a vocabulary is set, preload all concepts from the vocabulary. The alternative is to slowly populate the table as concepts are added via form fields, etc."""
-        with transaction.atomic():
-            for name, vocab in vocab_registry.items():
-                vocabulary, created = Vocabulary.objects.update_or_create(
-                    name=name,
-                    defaults={
-                        "label": vocab.scheme().label(),
-                        "uri": vocab.scheme().URI,
-                        # "meta": vocab.scheme().attrs,
-                    },
-                )
-                for concept in vocab.concepts():
-                    cls.objects.update_or_create(
-                        vocabulary=vocabulary,
-                        name=concept.name,
-                        defaults={
-                            "uri": concept.URI,
-                            "label": concept.label(),
-                            # "meta": concept.attrs,
-                        },
-                    )
-                    # cls.add_concept(concept)
-                concept_count = len(vocab.concepts())
-                print(f"Preloaded {concept_count} concepts for vocabulary: {name}")
+        for result in sync_vocabularies():
+            print(
+                f"Preloaded {result.vocabulary}: {result.inserted} inserted, {result.updated} updated, "
+                f"{result.deleted} deleted"
+            )
+
+    @classmethod
+    def build_rows(cls, concepts):
+        """Attaches the rows to the Vocabulary rows of their vocabularies, which are inserted if needed."""
+        schemes = {c.vocabulary.scheme().name: c.vocabulary.scheme() for c in concepts}
+        vocabularies = {v.name: v for v in Vocabulary.objects.filter(name__in=schemes)}
+        new = [Vocabulary(name=n, label=s.label(), uri=str(s.URI)) for n, s in schemes.items() if n not in vocabularies]
+        if new:
+            # another request may insert the same vocabulary concurrently, like in get_or_create_many
+            created = Vocabulary.objects.bulk_create(
+                new, update_conflicts=True, unique_fields=["name"], update_fields=["label"]
+            )
+            if not connections[Vocabulary.objects.db].features.can_return_rows_from_bulk_insert:
+                # e.g. MySQL, the inserted rows come back without their keys
+                created = Vocabulary.objects.filter(name__in=[v.name for v in new])
+            vocabularies.update((v.name, v) for v in created)
+        rows = super().build_rows(concepts)
+        for row, concept in zip(rows, concepts, strict=True):
+            row.vocabulary = vocabularies[concept.vocabulary.scheme().name]
+        return rows
 
     @classmethod
     def get_for_vocabulary(cls, vocabulary):
@@ -200,7 +251,8 @@ class BaseTaggedConcept(models.Model):
         scheme = kwargs.pop("scheme", None)
         super().__init__(*args, **kwargs)
         if URI and scheme:
-            self.concept, _ = self.concept_model.add_concept(URI, scheme)
+            concept = (scheme() if isinstance(scheme, type) else scheme).get_concept(URI)
+            self.concept_id = self.concept_model.objects.get_or_create_many([concept])[str(concept.URI)]
 
     def save(self, *args, **kwargs):
         if not self.pk and not self.concept.pk:
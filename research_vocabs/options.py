@@ -22,10 +22,52 @@ class VocabularyOptions:
     rdf_type = "skos:Concept"
     """The RDF type used to identify terms in the vocabulary. This is used to filter concepts in the graph."""
 
+    lazy = False
+    """Whether fields should defer loading the vocabulary until a concept, choice or label is first requested. Set
+    ``VOCABULARY_LAZY = True`` to enable this for all vocabularies."""
+
+    shared_index = False
+    """Whether to serve concept lookups and choices from a memory-mapped index file that is shared by all processes on
+    a host instead of from the graph. The graph is then only built when concept metadata is requested. Only supported
+    by LocalVocabulary, other vocabularies ignore it. Set ``VOCABULARY_SHARED_INDEX = True`` to enable this for all
+    vocabularies."""
+
+    columnar = False
+    """Whether to store the concepts, labels, hierarchy and collections of the vocabulary in a compact array-backed
+    index (see :class:`~research_vocabs.columnar.ColumnarIndex`) and release the graph once it is loaded. Lookups,
+    choices, search and the hierarchy are served from the index, the graph is rebuilt when concept metadata is first
+    requested. Ignored when ``shared_index`` is enabled. Set ``VOCABULARY_COLUMNAR = True`` to enable this for all
+    vocabularies."""
+
+    streaming = False
+    """Whether to stream the source straight into a ``columnar`` index instead of parsing it into a graph first, see
+    :mod:`research_vocabs.streaming`. Meant for very large sources: only the concepts, labels, hierarchy and
+    collections are extracted, the graph is built when concept metadata is first requested. Snapshots are not used
+    and ``get_subjects`` overrides are ignored, concepts are selected by ``rdf_type``. Set
+    ``VOCABULARY_STREAMING = True`` to enable this for all vocabularies."""
+
+    keep_graph = False
+    """Whether a vocabulary with a ``columnar`` index keeps its graph in memory after loading."""
+
+    keep_predicates = []
+    """Predicates, as CURIEs or URIs, whose triples are kept when the source is parsed. The predicates the vocabulary
+    depends on (types, labels, notations, hierarchy, collections and scheme membership) are always kept, the triples of
+    any other predicate are dropped as they are parsed. CURIEs are expanded with the vocabulary prefix and the default
+    rdflib bindings. An empty list keeps every predicate. Only supported by LocalVocabulary and RemoteVocabulary."""
+
+    languages = []
+    """Language tags of the literals that are kept when the source is parsed, e.g. ``["en", "es"]``. A tag also keeps
+    its regional variants and literals without a language are always kept. An empty list keeps every language. Only
+    supported by LocalVocabulary and RemoteVocabulary."""
+
     scheme_attrs = {}
     collections = {}
     ordered_collections = []
-    source: str | dict = ""
+    source: str | dict | list = ""
+    """The file or URL the vocabulary is parsed from, or a dict of arguments to :meth:`rdflib.Graph.parse`. Sources
+    ending in ``.gz``, ``.bz2`` or ``.xz`` are decompressed while they are parsed. A list of sources, e.g. a vocabulary
+    and its translations, is parsed and merged, in parallel if ``VOCABULARY_PARSE_WORKERS`` is set, see
+    :mod:`research_vocabs.sources`."""
 
     def __init__(self, **kwargs):
         for k, v in kwargs.items():
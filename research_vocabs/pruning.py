@@ -0,0 +1,95 @@
+"""Load-time pruning of vocabulary graphs.
+
+Vocabularies often carry predicates that are never displayed (provenance, change notes, mappings to other
+vocabularies) and labels in many more languages than a site serves. The ``keep_predicates`` and ``languages`` Meta
+options describe what a vocabulary actually needs, the source is then parsed into a :class:`PrunedGraph` which drops
+every other triple as the parser produces it, so that it is never stored.
+"""
+
+from rdflib import Graph, Literal
+from rdflib.namespace import DCTERMS, RDF, RDFS, SDO, SKOS
+
+CORE_PREDICATES = frozenset(
+    [
+        RDF.type,
+        RDF.first,
+        RDF.rest,
+        SKOS.prefLabel,
+        SKOS.altLabel,
+        SKOS.hiddenLabel,
+        SKOS.notation,
+        SKOS.broader,
+        SKOS.narrower,
+        SKOS.member,
+        SKOS.memberList,
+        SKOS.inScheme,
+        SKOS.hasTopConcept,
+        SKOS.topConceptOf,
+        RDFS.label,
+        DCTERMS.title,
+        SDO.name,
+    ]
+)
+"""Predicates that are always kept since the index, the search structures or the labels of a vocabulary depend on
+them."""
+
+
+class TripleFilter:
+    """Decides which triples of a source are kept.
+
+    Args:
+        predicates (Iterable[URIRef]): Predicates kept in addition to :data:`CORE_PREDICATES`. None keeps every
+            predicate.
+        languages (Iterable[str]): Language tags of the literals that are kept. A tag also keeps its regional variants,
+            e.g. "en" keeps "en-GB". Literals without a language are always kept. None keeps every language.
+    """
+
+    def __init__(self, predicates=None, languages=None):
+        self.predicates = None if predicates is None else CORE_PREDICATES | frozenset(predicates)
+        self.languages = None if languages is None else tuple(lang.lower() for lang in languages)
+
+    def __call__(self, triple) -> bool:
+        _, p, o = triple
+        if self.predicates is not None and p not in self.predicates:
+            return False
+        if self.languages is not None and isinstance(o, Literal) and o.language:
+            lang = o.language.lower()
+            return any(lang == keep or lang.startswith(f"{keep}-") for keep in self.languages)
+        return True
+
+    def key(self) -> dict:
+        """Returns a json serializable description of the filter, used to tell apart the snapshots and caches of
+        vocabularies that prune the same source differently."""
+        return {
+            "predicates": None if self.predicates is None else sorted(self.predicates - CORE_PREDICATES),
+            "languages": None if self.languages is None else sorted(self.languages),
+        }
+
+
+class PrunedGraph(Graph):
+    """A graph that only stores the triples accepted by a :class:`TripleFilter`. Parsers add triples one at a time, so
+    the rejected ones are dropped before they reach the store.
+
+    Attributes:
+        pruned (int): The number of triples that were dropped.
+    """
+
+    def __init__(self, triple_filter: TripleFilter, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.triple_filter = triple_filter
+        self.pruned = 0
+
+    def add(self, triple):
+        if self.triple_filter(triple):
+            return super().add(triple)
+        self.pruned += 1
+        return self
+
+    def addN(self, quads):
+        kept = []
+        for quad in quads:
+            if self.triple_filter(quad[:3]):
+                kept.append(quad)
+            else:
+                self.pruned += 1
+        return super().addN(kept)
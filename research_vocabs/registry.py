@@ -18,6 +18,10 @@
 
 vocab_registry = {}
 
+# lazy vocabularies that have not been loaded yet. They are keyed by the name of their concept scheme which is only
+# known once the graph is built, so registration is deferred until the registry is actually read.
+_pending = []
+
 
 def register(vocab):
     """
@@ -26,6 +30,19 @@ def register(vocab):
     Args:
         vocab (VocabularyBuilder): The vocabulary to register.
     """
+    if getattr(vocab, "is_loaded", True) is False:
+        _pending.append(vocab)
+        return
+
     name = vocab.scheme().name
     if name not in vocab_registry:
         vocab_registry[name] = vocab
+
+
+def load_pending():
+    """Registers all lazy vocabularies whose registration was deferred. Call this before reading vocab_registry."""
+    while _pending:
+        vocab = _pending.pop(0)
+        name = vocab.scheme().name
+        if name not in vocab_registry:
+            vocab_registry[name] = vocab
@@ -0,0 +1,295 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from heapq import nsmallest
+from typing import NamedTuple
+
+from .index import BaseIndex, ConceptTables, language_chain
+
+PREF_LABEL = 0
+ALT_LABEL = 1
+HIDDEN_LABEL = 2
+NOTATION = 3
+NAME = 4
+FIELDS = ("prefLabel", "altLabel", "hiddenLabel", "notation", "name")
+"""Names of the searched fields, indexed by the field constants. Lower constants rank higher."""
+
+_separators = re.compile(r"[\W_]+")
+
+
+def fold(text: str) -> str:
+    """Normalizes text for matching: accents are stripped, case is folded and runs of punctuation and whitespace are
+    collapsed into single spaces, e.g. ``"Pórfido-Granítico"`` -> ``"porfido granitico"``."""
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(_separators.split(text.casefold())).strip()
+
+
+def concept_terms(index: BaseIndex, tables: ConceptTables, entry: int) -> list[tuple]:
+    """Returns the ``(field, language, text)`` tuples of everything a concept can be found by: its prefLabels from the
+    index, its altLabels, hiddenLabels and notations from the tables and its local name."""
+    uri = index.uri(entry)
+    terms = [(PREF_LABEL, lang, label) for lang, label in index.labels(entry).items()]
+    terms += [(ALT_LABEL, lang, label) for lang, label in tables.alt_labels.get(uri, ())]
+    terms += [(HIDDEN_LABEL, lang, label) for lang, label in tables.hidden_labels.get(uri, ())]
+    terms += [(NOTATION, None, notation) for notation in tables.notations.get(uri, ())]
+    terms.append((NAME, None, index.name(entry)))
+    return terms
+
+
+class SearchMatch(NamedTuple):
+    """The best match of a concept for a query."""
+
+    entry: int
+    field: str
+    text: str
+    lang: str | None
+
+
+class SearchIndex:
+    """Prefix index over the labels of the vocabulary concepts in every language. Each skos:prefLabel, skos:altLabel,
+    skos:hiddenLabel and skos:notation of a concept, as well as its local name, is folded (see :func:`fold`) and stored
+    in a sorted list of keys, once for the whole text and once for every word after the first one, so that a query
+    matches the start of any word of a label. A prefix query is a binary search followed by a scan of the matching
+    keys.
+
+    Matches are ranked by:
+
+    1. exact matches of a whole label before prefix matches,
+    2. the field: prefLabel, altLabel, hiddenLabel, notation and finally the local name,
+    3. matches at the start of a label before matches of a later word,
+    4. labels in the requested language (following :func:`~research_vocabs.index.language_chain`) before others,
+    5. shorter labels before longer ones and finally the order of the vocabulary.
+
+    Attributes:
+        keys (list): The folded keys in sorted order.
+        hits (list): The ``(entry, field, word, lang, text)`` tuple behind every key, where ``word`` is the position of
+            the first matched word in the label.
+    """
+
+    def __init__(self, keys, hits):
+        self.keys = keys
+        self.hits = hits
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, index: BaseIndex, tables: ConceptTables):
+        """Builds the search index for the concepts of an index. Labels other than the prefLabel are taken from the
+        tables of the vocabulary."""
+        rows = []
+        for entry in index.concepts:
+            seen = set()
+            for field, lang, text in concept_terms(index, tables, entry):
+                words = fold(text).split(" ")
+                for position in range(len(words)):
+                    key = " ".join(words[position:])
+                    if key and (key, field, position, lang) not in seen:
+                        seen.add((key, field, position, lang))
+                        rows.append((key, entry, field, position, lang, text))
+
+        rows.sort(key=lambda row: row[:4])
+        return cls([row[0] for row in rows], [row[1:] for row in rows])
+
+    def search(self, q: str, lang=None, limit=10, entries=None) -> list[SearchMatch]:
+        """Returns the best match of every concept that has a label starting with ``q``, ranked as described above.
+
+        Args:
+            q (str): The text typed by the user. It is folded the same way as the labels.
+            lang (str): The preferred language of the matched labels.
+            limit (int): The maximum number of matches to return.
+            entries (set): Restrict the matches to these entries.
+        """
+        q = fold(q)
+        if not q:
+            return []
+        chain = language_chain(lang)
+        best = {}
+        keys, hits = self.keys, self.hits
+        for i in range(bisect_left(keys, q), len(keys)):
+            key = keys[i]
+            if not key.startswith(q):
+                break
+            entry, field, position, label_lang, text = hits[i]
+            if entries is not None and entry not in entries:
+                continue
+            rank = (
+                key != q or position != 0,
+                field,
+                position != 0,
+                chain.index(label_lang) if label_lang in chain else len(chain),
+                len(key),
+                entry,
+            )
+            if entry not in best or rank < best[entry][0]:
+                best[entry] = (rank, SearchMatch(entry, FIELDS[field], text, label_lang))
+        return [match for _, match in nsmallest(limit, best.values(), key=lambda item: item[0])]
+
+
+def default_distance(term: str) -> int:
+    """Returns the number of typos tolerated in a folded term: none up to 2 characters, one up to 5 characters and two
+    for longer terms."""
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Returns the optimal string alignment distance between two strings: the number of inserted, deleted or
+    substituted characters and of swapped adjacent characters. The computation stops early once the distance is known
+    to exceed ``limit`` and returns ``limit + 1`` in that case."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class FuzzyMatch(NamedTuple):
+    """A concept with a label close to a misspelled term."""
+
+    entry: int
+    distance: int
+    field: str
+    text: str
+
+
+class FuzzyIndex:
+    """Trigram index over the whole labels, notations and names of the vocabulary concepts, folded as in
+    :class:`SearchIndex`. It finds the texts within a small edit distance of a misspelled term without comparing the
+    term to every text of the vocabulary.
+
+    Every text is split into overlapping trigrams (padded at both ends) and each trigram points to the texts containing
+    it. One edit changes at most 4 trigrams, so a text within ``k`` edits of the term shares at least
+    ``len(trigrams) - 4 * k`` trigrams with it. Only the texts passing that count filter are compared with
+    :func:`edit_distance`. Short terms for which the filter cannot rule anything out fall back to comparing the texts of
+    a similar length.
+
+    Attributes:
+        texts (list): The distinct folded texts.
+        owners (list): The ``(field, entry, text)`` tuples behind every folded text, ordered by field.
+        postings (dict): Maps every trigram to the ids of the texts that contain it.
+        lengths (dict): Maps every text length to the ids of the texts of that length.
+    """
+
+    q = 3
+
+    def __init__(self, texts, owners, postings, lengths):
+        self.texts = texts
+        self.owners = owners
+        self.postings = postings
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.texts)
+
+    @classmethod
+    def grams(cls, text: str) -> set:
+        padded = f"{' ' * (cls.q - 1)}{text}{' ' * (cls.q - 1)}"
+        return {padded[i : i + cls.q] for i in range(len(padded) - cls.q + 1)}
+
+    @classmethod
+    def build(cls, index: BaseIndex, tables: ConceptTables):
+        """Builds the fuzzy index for the concepts of an index, see :meth:`SearchIndex.build`."""
+        ids, owners = {}, []
+        for entry in index.concepts:
+            for field, _, text in concept_terms(index, tables, entry):
+                if folded := fold(text):
+                    if folded not in ids:
+                        ids[folded] = len(owners)
+                        owners.append([])
+                    owners[ids[folded]].append((field, entry, text))
+
+        texts = list(ids)
+        postings, lengths = {}, {}
+        for i, text in enumerate(texts):
+            for gram in cls.grams(text):
+                postings.setdefault(gram, []).append(i)
+            lengths.setdefault(len(text), []).append(i)
+        return cls(texts, [tuple(sorted(o)) for o in owners], postings, lengths)
+
+    def candidates(self, term: str, k: int):
+        """Returns the ids of the texts that may be within ``k`` edits of a folded term."""
+        grams = self.grams(term)
+        threshold = len(grams) - (self.q + 1) * k
+        if threshold < 1:
+            return [i for n in range(len(term) - k, len(term) + k + 1) for i in self.lengths.get(n, ())]
+        counts = Counter()
+        for gram in grams:
+            counts.update(self.postings.get(gram, ()))
+        return [i for i, count in counts.items() if count >= threshold]
+
+    def match(self, term: str, max_distance=None, limit=5, entries=None) -> list[FuzzyMatch]:
+        """Returns the concepts with a text within ``max_distance`` edits of ``term``, closest first and then ordered
+        by field as in :class:`SearchIndex`. Every concept is returned once, with its closest text.
+
+        Args:
+            term (str): The misspelled term. It is folded the same way as the texts.
+            max_distance (int): The number of edits tolerated, see :func:`default_distance` for the default.
+            limit (int): The maximum number of matches to return.
+            entries (set): Restrict the matches to these entries.
+        """
+        term = fold(term)
+        if not term:
+            return []
+        k = default_distance(term) if max_distance is None else max_distance
+        best = {}
+        for i in self.candidates(term, k):
+            distance = edit_distance(term, self.texts[i], k)
+            if distance > k:
+                continue
+            for field, entry, text in self.owners[i]:
+                if entries is not None and entry not in entries:
+                    continue
+                rank = (distance, field, entry)
+                if entry not in best or rank < best[entry][0]:
+                    best[entry] = (rank, FuzzyMatch(entry, distance, FIELDS[field], text))
+        return [match for _, match in nsmallest(limit, best.values(), key=lambda item: item[0])]
+
+
+class LabelIndex:
+    """Reverse index from labels to concepts for resolving values by their label. Keys are case-folded with runs of
+    whitespace collapsed, accents are kept. A label that belongs to several concepts only maps to the concepts with the
+    best field, e.g. a prefLabel hides an identical altLabel of another concept.
+
+    Attributes:
+        labels (dict): Maps every key to a tuple of entries.
+    """
+
+    def __init__(self, labels):
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.labels)
+
+    @staticmethod
+    def key(text: str) -> str:
+        return " ".join(text.casefold().split())
+
+    @classmethod
+    def build(cls, index: BaseIndex, tables: ConceptTables):
+        """Builds the label index for the concepts of an index, see :meth:`SearchIndex.build`."""
+        best = {}
+        for entry in index.concepts:
+            for field, _, text in concept_terms(index, tables, entry):
+                key = cls.key(text)
+                current = best.get(key)
+                if current is None or field < current[0]:
+                    best[key] = (field, [entry])
+                elif field == current[0] and entry not in current[1]:
+                    current[1].append(entry)
+        return cls({key: tuple(entries) for key, (_, entries) in best.items()})
+
+    def get(self, text: str) -> tuple:
+        """Returns the entries labelled ``text``, which are several when the label is ambiguous."""
+        return self.labels.get(self.key(text), ())
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+import rdflib
+from django.conf import settings
+from rdflib import Graph
+
+from .index import ConceptTables
+from .utils import get_setting
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 4
+"""Bump this whenever the layout of the snapshot payload changes so that stale snapshots are ignored."""
+
+
+class Snapshot(NamedTuple):
+    """A compiled vocabulary: the parsed graph together with the tables derived from it."""
+
+    key: dict
+    graph: Graph
+    tables: ConceptTables
+
+
+def snapshot_dir() -> Path:
+    """Returns the directory where compiled snapshots are stored. Set ``VOCABULARY_SNAPSHOT_DIR`` to override."""
+    if location := get_setting("SNAPSHOT_DIR"):
+        return Path(location)
+    return Path(settings.BASE_DIR) / ".vocabularies-cache" / "snapshots"
+
+
+def source_parts(source: Path | list[Path]) -> list[Path]:
+    """Returns the parts of a source, see :mod:`research_vocabs.sources`."""
+    return list(source) if isinstance(source, list | tuple) else [source]
+
+
+def snapshot_path(source: Path | list[Path], options: dict | None = None) -> Path:
+    """Returns the snapshot file belonging to a source file. The file name is derived from the full source path so that
+    identically named sources in different apps do not collide, and from the parse ``options`` (see
+    :meth:`~research_vocabs.pruning.TripleFilter.key`) so that differently pruned graphs of a source do not either.
+    The snapshot of a multi-part source is named after its first part."""
+    source, *others = source_parts(source)
+    if others:
+        options = {**(options or {}), "parts": [str(part) for part in others]}
+    fingerprint = str(source) if options is None else json.dumps([str(source), options], sort_keys=True)
+    digest = hashlib.sha1(fingerprint.encode(), usedforsecurity=False).hexdigest()[:16]
+    return snapshot_dir() / f"{source.name}-{digest}.snapshot"
+
+
+def file_hash(source: Path) -> str:
+    """Returns the sha256 hex digest of the content of a file."""
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(source: Path | list[Path]) -> dict:
+    """Returns the key identifying a specific revision of a source file, or of every part of a multi-part source."""
+    parts = source_parts(source)
+    if len(parts) > 1:
+        return {"version": SNAPSHOT_VERSION, "rdflib": rdflib.__version__, "parts": [source_key(p) for p in parts]}
+    source = parts[0]
+    return {
+        "version": SNAPSHOT_VERSION,
+        "rdflib": rdflib.__version__,
+        "path": str(source),
+        "size": source.stat().st_size,
+        "mtime_ns": source.stat().st_mtime_ns,
+        "sha256": file_hash(source),
+    }
+
+
+def is_valid(key: dict, source: Path | list[Path]) -> bool:
+    """Checks a stored snapshot key against the current state of the source file. The content hash is only computed
+    when the modification time has changed (e.g. after a fresh checkout of an unchanged file)."""
+    if key.get("version") != SNAPSHOT_VERSION or key.get("rdflib") != rdflib.__version__:
+        return False
+    parts = source_parts(source)
+    if len(parts) > 1:
+        keys = key.get("parts", [])
+        return len(keys) == len(parts) and all(is_valid(k, p) for k, p in zip(keys, parts, strict=True))
+    source = parts[0]
+    stat = source.stat()
+    if key.get("path") != str(source) or key.get("size") != stat.st_size:
+        return False
+    if key.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    return key.get("sha256") == file_hash(source)
+
+
+def load_snapshot(source: Path | list[Path], options: dict | None = None) -> Snapshot | None:
+    """Loads the snapshot of a source file if one exists and is still valid, otherwise returns None.
+
+    The key is pickled separately in front of the payload so that stale snapshots can be rejected without
+    unpickling the graph.
+    """
+    path = snapshot_path(source, options)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            key = pickle.load(f)  # noqa: S301
+            if not is_valid(key, source):
+                return None
+            graph, tables = pickle.load(f)  # noqa: S301
+    except Exception:
+        logger.warning("Could not read vocabulary snapshot %s", path, exc_info=True)
+        return None
+    return Snapshot(key, graph, tables)
+
+
+def write_snapshot(
+    source: Path | list[Path], graph: Graph, tables: ConceptTables, options: dict | None = None
+) -> Path | None:
+    """Compiles a source file into a snapshot. The file is written to a temporary location first and then moved into
+    place so that concurrent processes never read a partially written snapshot. Failures are logged and otherwise
+    ignored, the vocabulary simply gets parsed again next time."""
+    path = snapshot_path(source, options)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        logger.warning("Could not write vocabulary snapshot %s", path, exc_info=True)
+        return None
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(source_key(source), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump((graph, tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except (OSError, pickle.PicklingError):
+        os.unlink(tmp)
+        logger.warning("Could not write vocabulary snapshot %s", path, exc_info=True)
+        return None
+    return path
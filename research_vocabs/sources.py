@@ -0,0 +1,134 @@
+"""Reading vocabulary sources: compressed files and sources that are split across several parts.
+
+A source whose name ends in ``.gz``, ``.bz2`` or ``.xz`` is decompressed while it is parsed, its format is guessed from
+the name without the compression suffix (e.g. ``isc2020.ttl.gz`` is Turtle). A vocabulary may list several sources,
+e.g. the core of a vocabulary and its translations, which are parsed and merged.
+
+Parts are parsed one after another in the loading process by default, the pool is opt-in: set
+``VOCABULARY_PARSE_WORKERS`` to parse them in a pool of that many processes instead. The pool mostly pays off for
+``streaming`` vocabularies, whose workers send back compact records: a worker that parses a graph has to pickle it back
+to the parent, which usually costs more than the parallel parse saves. Workers are spawned rather than forked, since
+forking a threaded WSGI or ASGI server on the first load of a vocabulary may deadlock, so every worker imports the
+package again before it starts.
+"""
+
+import bz2
+import gzip
+import logging
+import lzma
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import NamedTuple
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from rdflib import Graph
+from rdflib.parser import InputSource
+from rdflib.util import guess_format
+
+from .pruning import PrunedGraph
+from .utils import get_setting
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+"""Decompressors by file name suffix. Each accepts a path or a binary file object."""
+
+
+class ParsedPart(NamedTuple):
+    """The outcome of parsing one part of a source."""
+
+    source: str
+    result: object
+    triples: int
+    elapsed: float
+
+
+class PartHTTPError(HTTPError):
+    """An :class:`~urllib.error.HTTPError` raised while parsing a part in a worker process. Unlike the original it
+    can be sent back to the parent process, without the headers and body of the response."""
+
+    def __init__(self, url, code, msg):
+        super().__init__(url, code, msg, None, None)
+
+    def __reduce__(self):
+        return type(self), (self.url, self.code, self.msg)
+
+
+def call_part(func, part: dict, *args):
+    """Calls ``func(part, *args)`` in a worker process."""
+    try:
+        return func(part, *args)
+    except HTTPError as e:
+        raise PartHTTPError(e.url, e.code, e.msg) from None
+
+
+def is_url(source) -> bool:
+    return str(source).startswith(("http://", "https://"))
+
+
+@contextmanager
+def open_part(source_kwargs: dict):
+    """Yields the arguments of :meth:`rdflib.Graph.parse` for a part of a source. Compressed parts are opened
+    through their decompressor so that they are decompressed while they are parsed."""
+    source = str(source_kwargs["source"])
+    suffix = os.path.splitext(source)[1].lower()
+    if (opener := COMPRESSION.get(suffix)) is None:
+        yield source_kwargs
+        return
+
+    name = source[: -len(suffix)]
+    kwargs = {k: v for k, v in source_kwargs.items() if k != "source"}
+    kwargs.setdefault("format", guess_format(name))
+    input_source = InputSource(kwargs.pop("publicID", name if is_url(name) else Path(name).as_uri()))
+    with ExitStack() as stack:
+        # the decompressor does not close a response it reads from
+        raw = stack.enter_context(urlopen(source)) if is_url(source) else source  # noqa: S310
+        input_source.setByteStream(stack.enter_context(opener(raw, "rb")))
+        yield {**kwargs, "source": input_source}
+
+
+def parse_part(source_kwargs: dict, triple_filter=None) -> ParsedPart:
+    """Parses a part of a source into a graph, see :class:`~research_vocabs.pruning.PrunedGraph` for ``triple_filter``.
+    Runs in a worker process when a source has several parts."""
+    start = time.perf_counter()
+    graph = Graph() if triple_filter is None else PrunedGraph(triple_filter)
+    with open_part(source_kwargs) as kwargs:
+        graph.parse(**kwargs)
+    if triple_filter is not None:
+        logger.debug("Pruned %d triples of %s, kept %d", graph.pruned, source_kwargs["source"], len(graph))
+    return ParsedPart(str(source_kwargs["source"]), graph, len(graph), time.perf_counter() - start)
+
+
+def parse_parts(func, parts: list[dict], *args) -> list[ParsedPart]:
+    """Calls ``func(part, *args)`` for every part of a source and logs the load time of each part. Several parts are
+    parsed in parallel by a pool of ``VOCABULARY_PARSE_WORKERS`` spawned processes when the setting is above 1, see
+    the module documentation."""
+    workers = get_setting("PARSE_WORKERS")
+    if len(parts) == 1 or workers <= 1:
+        results = [func(part, *args) for part in parts]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(min(workers, len(parts)), mp_context=context) as pool:
+            results = list(pool.map(call_part, [func] * len(parts), parts, *([arg] * len(parts) for arg in args)))
+    for part in results:
+        logger.info("Loaded %s: %d triples in %.2fs", part.source, part.triples, part.elapsed)
+    return results
+
+
+def merge_graphs(graphs) -> Graph:
+    """Merges the graphs of the parts of a source into the graph of the first part. Namespace bindings of earlier parts
+    take precedence."""
+    merged, *others = graphs
+    for graph in others:
+        bound = dict(merged.namespaces())
+        namespaces = set(bound.values())
+        for prefix, namespace in graph.namespaces():
+            if prefix not in bound and namespace not in namespaces:
+                merged.bind(prefix, namespace)
+        merged += graph
+    return merged
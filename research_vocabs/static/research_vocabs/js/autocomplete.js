@@ -0,0 +1,30 @@
+'use strict';
+{
+    // Select2 reads the endpoint and its options from the data-ajax--* attributes rendered by ConceptSelectMixin
+    const $ = django.jQuery;
+
+    $.fn.vocabularyAutocomplete = function() {
+        $.each(this, function(i, element) {
+            $(element).select2({
+                ajax: {
+                    data: (params) => {
+                        return {
+                            q: params.term,
+                            page: params.page
+                        };
+                    }
+                }
+            });
+        });
+        return this;
+    };
+
+    $(function() {
+        // Initialize all autocomplete widgets except the one in the template form used when a new formset is added.
+        $('.vocabulary-autocomplete').not('[name*=__prefix__]').vocabularyAutocomplete();
+    });
+
+    document.addEventListener('formset:added', (event) => {
+        $(event.target).find('.vocabulary-autocomplete').vocabularyAutocomplete();
+    });
+}
@@ -0,0 +1,333 @@
+"""Streaming extraction of the SKOS core of a vocabulary source straight into a
+:class:`~research_vocabs.columnar.ColumnarIndex`, without ever holding the source in a graph.
+
+The source is read by the rdflib parsers into an :class:`ExtractingGraph`, a graph that does not store anything: every
+triple is handed to a :class:`SKOSExtractor` as soon as the parser produces it, which keeps the types, preferred,
+alternative and hidden labels, notations, hierarchy and collection membership in flat arrays over a string arena and
+drops everything else. N-Triples are read line by line and RDF/XML through a SAX parser, so memory is bounded by the
+size of the extracted records rather than the size of the source. The Turtle parser of rdflib reads the source text in
+one go, the triples are still never stored. Compressed and multi-part sources are supported, see
+:mod:`research_vocabs.sources`.
+
+Concept metadata that is not part of the index is read from a graph that is built on first use, see
+:class:`~research_vocabs.core.ClassGraph`.
+"""
+
+import logging
+import time
+from array import array
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, SKOS
+
+from .columnar import CSR, MISSING, UINT, ColumnarIndex, StringArena, slot_table
+from .index import KIND_COLLECTION, KIND_CONCEPT, KIND_OTHER, KIND_SCHEME, language_chain, resolve_label
+from .sources import ParsedPart, open_part, parse_parts
+from .utils import get_URIRef
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 100_000
+"""The number of triples between two progress reports."""
+
+
+def group(subjects: array, values: array, width: int, size: int) -> tuple[array, array]:
+    """Groups rows of ``width`` values by their subject string id into CSR arrays with ``size`` rows. Rows keep the
+    order in which they were streamed."""
+    offsets = array(UINT, bytes(4 * (size + 1)))
+    for s in subjects:
+        offsets[s + 1] += width
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    position = offsets[:-1]
+    grouped = array(UINT, bytes(4 * len(values)))
+    for i, s in enumerate(subjects):
+        start = position[s]
+        grouped[start : start + width] = values[i * width : (i + 1) * width]
+        position[s] = start + width
+    return offsets, grouped
+
+
+def unique_rows(values, width: int) -> list:
+    """Returns the rows of ``width`` values in a flat sequence, without duplicates."""
+    if width == 1:
+        return list(dict.fromkeys(values))
+    rows = dict.fromkeys(tuple(values[i : i + width]) for i in range(0, len(values), width))
+    return [value for row in rows for value in row]
+
+
+class SKOSExtractor:
+    """Accumulates the SKOS core of a stream of triples in flat arrays of string ids and compiles it into a
+    :class:`~research_vocabs.columnar.ColumnarIndex`. Each kind of record is kept as a pair of arrays: the string ids
+    of the subjects and the string ids of the values, two per record for literals (language and text)."""
+
+    def __init__(self):
+        self.strings = StringArena()
+        self.types = (array(UINT), array(UINT))
+        self.labels = (array(UINT), array(UINT))
+        self.alt_labels = (array(UINT), array(UINT))
+        self.hidden_labels = (array(UINT), array(UINT))
+        self.notations = (array(UINT), array(UINT))
+        self.broader = (array(UINT), array(UINT))
+        self.narrower = (array(UINT), array(UINT))
+        self.members = (array(UINT), array(UINT))
+
+    def term(self, value) -> int:
+        return self.strings.add(str(value))
+
+    def literal(self, o) -> tuple[int, int]:
+        lang = getattr(o, "language", None)
+        return self.strings.add(lang.lower() if lang else ""), self.strings.append(str(o))
+
+    def add(self, s, p, o):
+        if p == RDF.type:
+            rows, values = self.types
+        elif p == SKOS.prefLabel:
+            rows, values = self.labels
+        elif p == SKOS.altLabel:
+            rows, values = self.alt_labels
+        elif p == SKOS.hiddenLabel:
+            rows, values = self.hidden_labels
+        elif p == SKOS.notation:
+            rows, values = self.notations
+            rows.append(self.term(s))
+            values.append(self.strings.append(str(o)))
+            return
+        elif p == SKOS.broader:
+            rows, values = self.broader
+        elif p == SKOS.narrower:
+            rows, values = self.narrower
+        elif p == SKOS.member:
+            rows, values = self.members
+        else:
+            return
+        rows.append(self.term(s))
+        if isinstance(o, Literal):
+            values.extend(self.literal(o))
+        else:
+            values.append(self.term(o))
+
+    def merge(self, other: "SKOSExtractor"):
+        """Appends the records of the extractor of another part of the source, translating its string ids."""
+        interned = other.strings.ids
+        remap = array(UINT, [MISSING]) * (len(other.strings.offsets) - 1)
+        for value, sid in interned.items():
+            remap[sid] = self.strings.add(value)
+        for sid, target in enumerate(remap):
+            if target == MISSING:
+                remap[sid] = self.strings.append(other.strings.get(sid))
+        for attr in ("types", "labels", "alt_labels", "hidden_labels", "notations", "broader", "narrower", "members"):
+            for mine, theirs in zip(getattr(self, attr), getattr(other, attr)):
+                mine.extend(remap[sid] for sid in theirs)
+
+    def typed(self, *rdf_types) -> list[int]:
+        """Returns the string ids of the subjects of any of the given types, or of any type if none are given, in the
+        order their first type was streamed."""
+        ids = [self.strings.ids.get(str(t), MISSING) for t in rdf_types]
+        subjects, types = self.types
+        return list(dict.fromkeys(s for s, t in zip(subjects, types) if not ids or t in ids))
+
+    def layout(self, rdf_type, labels, ordered=True) -> dict:
+        """Returns the kind of every entry keyed by the string id of its subject, in the order of the entries: the
+        concepts in choice order, the scheme, the collections and any other typed subject."""
+        strings = self.strings
+        chain = language_chain("en")
+
+        def label_of(sid):
+            row = labels[1][labels[0][sid] : labels[0][sid + 1]]
+            found = {strings.get(row[i]) or None: row[i + 1] for i in range(0, len(row), 2)}
+            return strings.get(resolve_label(found, chain)) if found else ""
+
+        concepts = self.typed(rdf_type)
+        if ordered:
+            concepts.sort(key=label_of)
+        entries = dict.fromkeys(concepts, KIND_CONCEPT)
+        for sid in self.typed(SKOS.ConceptScheme)[:1]:
+            entries.setdefault(sid, KIND_SCHEME)
+        for sid in self.typed(SKOS.Collection, SKOS.OrderedCollection):
+            entries.setdefault(sid, KIND_COLLECTION)
+        for sid in self.typed():
+            entries.setdefault(sid, KIND_OTHER)
+        return entries
+
+    def compile(self, rdf_type, name, namespaces, ordered=True) -> ColumnarIndex:
+        """Compiles the accumulated records into an index. Entries are laid out like those of
+        :class:`~research_vocabs.index.VocabularyIndex`, see :meth:`layout`.
+
+        Args:
+            rdf_type (URIRef): The type of the vocabulary concepts, see ``Meta.rdf_type``.
+            name (Callable): Returns the local name of a URI.
+            namespaces (Callable): Returns the namespace bindings, called once the names are computed.
+            ordered (bool): Sort the concepts by their label, see ``Meta.ordered``.
+        """
+        strings, size = self.strings, len(self.strings.offsets) - 1
+        labels = group(*self.labels, 2, size)
+        entries = self.layout(rdf_type, labels, ordered)
+        concepts = sum(kind == KIND_CONCEPT for kind in entries.values())
+        entry_sids = list(entries)
+        entry_of = array(UINT, [MISSING]) * size
+        for entry, sid in enumerate(entry_sids):
+            entry_of[sid] = entry
+
+        count = len(entry_sids)
+        names, uris, kinds = array(UINT), array(UINT, entry_sids), array("B", entries.values())
+        columns, members = {}, {}
+        csrs = {key: CSR() for key in ("broader", "narrower", "alt_labels", "hidden_labels", "notations")}
+        grouped = {
+            "broader": group(*self.broader, 1, size),
+            "narrower": group(*self.narrower, 1, size),
+            "alt_labels": group(*self.alt_labels, 2, size),
+            "hidden_labels": group(*self.hidden_labels, 2, size),
+            "notations": group(*self.notations, 1, size),
+            "members": group(*self.members, 1, size),
+        }
+
+        def row(key, sid):
+            offsets, values = grouped[key]
+            return values[offsets[sid] : offsets[sid + 1]]
+
+        for entry, sid in enumerate(entry_sids):
+            for i in range(labels[0][sid], labels[0][sid + 1], 2):
+                lang = strings.get(labels[1][i]) or None
+                if (column := columns.get(lang)) is None:
+                    column = columns[lang] = array(UINT, [MISSING]) * count
+                column[entry] = labels[1][i + 1]
+            for key in ("broader", "narrower"):
+                targets = (entry_of[o] for o in row(key, sid))
+                csrs[key].add_row(unique_rows([o for o in targets if o != MISSING], 1))
+            csrs["alt_labels"].add_row(unique_rows(row("alt_labels", sid), 2))
+            csrs["hidden_labels"].add_row(unique_rows(row("hidden_labels", sid), 2))
+            csrs["notations"].add_row(unique_rows(row("notations", sid), 1))
+            if kinds[entry] == KIND_COLLECTION:
+                targets = (entry_of[m] for m in row("members", sid))
+                members[entry] = array(UINT, dict.fromkeys(m for m in targets if m != MISSING))
+
+        uri_strings = [strings.get(sid) for sid in entry_sids]
+        for uri in uri_strings:
+            names.append(strings.add(name(uri)))
+        # full URIs win over names, like in the python index
+        keys = {uri: entry for entry, uri in enumerate(uri_strings)}
+        for entry in range(count):
+            keys.setdefault(strings.get(names[entry]), entry)
+        slots = slot_table(keys, strings)
+
+        scheme = next((entry for entry, kind in enumerate(kinds) if kind == KIND_SCHEME), None)
+        return ColumnarIndex(
+            strings=bytes(strings.data),
+            string_offsets=strings.offsets,
+            names=names,
+            uris=uris,
+            kinds=kinds,
+            labels=columns,
+            edges=(csrs["broader"].offsets, csrs["broader"].values, csrs["narrower"].offsets, csrs["narrower"].values),
+            members=members,
+            slots=slots,
+            concepts=concepts,
+            scheme=scheme,
+            namespaces=namespaces(),
+            alt_labels=(csrs["alt_labels"].offsets, csrs["alt_labels"].values),
+            hidden_labels=(csrs["hidden_labels"].offsets, csrs["hidden_labels"].values),
+            notations=(csrs["notations"].offsets, csrs["notations"].values),
+        )
+
+
+class ExtractingGraph(Graph):
+    """A graph that passes every triple added by a parser on to a :class:`SKOSExtractor` instead of storing it. Only
+    the namespace bindings of the source are kept. Progress is logged every :data:`PROGRESS_INTERVAL` triples.
+
+    Args:
+        extractor (SKOSExtractor): Receives the triples.
+        triple_filter (Callable): Drops the triples it rejects, see :class:`~research_vocabs.pruning.TripleFilter`.
+        progress (Callable): Called with the number of triples read and the elapsed seconds at every progress report.
+
+    Attributes:
+        triples (int): The number of triples read.
+    """
+
+    def __init__(self, extractor: SKOSExtractor, triple_filter=None, progress=None, **kwargs):
+        super().__init__(**kwargs)
+        self.extractor = extractor
+        self.triple_filter = triple_filter
+        self.progress = progress
+        self.triples = 0
+        self.started = time.perf_counter()
+
+    def add(self, triple):
+        self.triples += 1
+        if self.triples % PROGRESS_INTERVAL == 0:
+            self.report()
+        if self.triple_filter is None or self.triple_filter(triple):
+            self.extractor.add(*triple)
+        return self
+
+    def addN(self, quads):
+        for quad in quads:
+            self.add(quad[:3])
+        return self
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        logger.info("Read %d triples in %.1fs (%.0f triples/s)", self.triples, elapsed, self.triples / elapsed)
+        if self.progress is not None:
+            self.progress(self.triples, elapsed)
+
+
+def extract_part(source_kwargs: dict, triple_filter=None) -> ParsedPart:
+    """Streams a part of a source into a :class:`SKOSExtractor`. The result of the part is the extractor and the
+    namespace bindings of the part. Runs in a worker process when a source has several parts."""
+    start = time.perf_counter()
+    graph = ExtractingGraph(SKOSExtractor(), triple_filter)
+    with open_part(source_kwargs) as kwargs:
+        graph.parse(**kwargs)
+    graph.report()
+    namespaces = {prefix: str(namespace) for prefix, namespace in graph.namespaces()}
+    elapsed = time.perf_counter() - start
+    return ParsedPart(str(source_kwargs["source"]), (graph.extractor, namespaces), graph.triples, elapsed)
+
+
+def stream_index(vocabulary, parts: list[dict], triple_filter=None) -> ColumnarIndex:
+    """Streams a source into a columnar index for a vocabulary. The parts of a source may be streamed in parallel, see
+    :func:`~research_vocabs.sources.parse_parts`, and their records merged in the order of the parts. The collections
+    declared in the Meta options of the vocabulary are added as well.
+
+    Args:
+        vocabulary (VocabularyBase): The vocabulary the source belongs to.
+        parts (list): The arguments of :meth:`rdflib.Graph.parse` for every part of the source.
+        triple_filter (Callable): Drops the triples it rejects.
+    """
+    results = parse_parts(extract_part, parts, triple_filter)
+    extractor = results[0].result[0]
+    for part in results[1:]:
+        extractor.merge(part.result[0])
+
+    graph = ExtractingGraph(extractor, triple_filter)
+    graph.triples = sum(part.triples for part in results)
+    # bindings of earlier parts take precedence
+    for part in reversed(results):
+        for prefix, namespace in part.result[1].items():
+            graph.bind(prefix, namespace, replace=True)
+    vocabulary.graph = graph
+    try:
+        graph.bind(vocabulary._meta.prefix, vocabulary.ns)
+        vocabulary.build_collections()
+        rdf_type = get_URIRef(vocabulary._meta.rdf_type, graph, vocabulary.ns)
+    finally:
+        del vocabulary.graph
+
+    nm = graph.namespace_manager
+
+    def name(uri):
+        try:
+            return nm.compute_qname(URIRef(uri))[2]
+        except (ValueError, KeyError):
+            return uri
+
+    def namespaces():
+        return {p: str(ns) for p, ns in graph.namespaces()}
+
+    start = time.perf_counter()
+    index = extractor.compile(rdf_type, name, namespaces, ordered=vocabulary._meta.ordered)
+    elapsed = time.perf_counter() - start
+    sources = ", ".join(part.source for part in results)
+    logger.info("Extracted %d concepts of %s in %.1fs", len(index.concepts), sources, elapsed)
+    return index
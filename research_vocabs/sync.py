@@ -0,0 +1,235 @@
+import contextlib
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.db import transaction
+
+from .registry import load_pending, vocab_registry
+from .utils import cache, get_setting
+
+SYNC_HASH = "sync_hash"
+"""Key of the digest of the last synchronized content in ``Vocabulary.meta``."""
+
+PK_GENERATION = "research_vocabs:concept_pks"
+"""Key of the generation of the primary key caches in the vocabulary cache, see :class:`PKCache`."""
+
+
+class SyncResult(NamedTuple):
+    """The outcome of synchronizing the database rows of a vocabulary."""
+
+    vocabulary: str
+    inserted: int
+    updated: int
+    deleted: int
+    elapsed: float
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+class PKCache:
+    """A bounded map from ``(model, URI)`` to the primary key of a concept row, evicting the least recently used keys.
+    It spares the lookup of rows that were already resolved by this process.
+
+    Synchronizations and deleted concept rows invalidate it, in this process right away and in every other process once
+    the transaction is committed: they bump a generation number stored in the vocabulary cache, which every process
+    compares with the generation its keys were read under. This requires a ``VOCABULARY_DEFAULT_CACHE`` that is shared
+    by the processes, e.g. the file based or redis cache, a local memory cache only invalidates its own process.
+
+    Args:
+        maxsize (int): The number of keys kept. Defaults to the ``VOCABULARY_PK_CACHE_SIZE`` setting, 0 disables the
+            cache.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = None
+
+    def __len__(self):
+        return len(self.data)
+
+    def validate(self) -> bool:
+        """Clears the cache if another process changed concept rows since the keys were read. Returns whether the keys
+        are still valid."""
+        generation = cache.get(PK_GENERATION)
+        with self.lock:
+            if generation == self.generation:
+                return True
+            self.data.clear()
+            self.generation = generation
+        return False
+
+    def get_many(self, model, uris) -> dict:
+        """Returns the cached primary keys of the given URIs."""
+        found = {}
+        self.validate()
+        with self.lock:
+            for uri in uris:
+                if (pk := self.data.get((model._meta.label, uri))) is not None:
+                    self.data.move_to_end((model._meta.label, uri))
+                    found[uri] = pk
+        return found
+
+    def update(self, model, pks: dict):
+        if not self.validate():
+            # the keys may have been read before the rows changed
+            return
+        maxsize = get_setting("PK_CACHE_SIZE") if self.maxsize is None else self.maxsize
+        with self.lock:
+            for uri, pk in pks.items():
+                self.data[(model._meta.label, uri)] = pk
+                self.data.move_to_end((model._meta.label, uri))
+            while len(self.data) > maxsize:
+                self.data.popitem(last=False)
+
+    def discard(self, model, uri, using=None):
+        with self.lock:
+            self.data.pop((model._meta.label, uri), None)
+        self.bump_on_commit(using)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def invalidate(self, using=None):
+        """Clears the cache of this process, and of the other processes once the current transaction is committed."""
+        self.clear()
+        self.bump_on_commit(using)
+
+    def bump_on_commit(self, using=None):
+        """Bumps the generation once the current transaction is committed. A transaction that deletes many rows, e.g. a
+        synchronization, bumps it only once."""
+        connection = transaction.get_connection(using)
+        if not any(func == self.bump for _, func, _ in connection.run_on_commit):
+            transaction.on_commit(self.bump, using=using)
+
+    def bump(self):
+        """Increments the generation shared through the vocabulary cache, see :meth:`validate`."""
+        cache.add(PK_GENERATION, 0, None)
+        # caches that do not store anything, e.g. the dummy cache, cannot increment
+        with contextlib.suppress(ValueError):
+            cache.incr(PK_GENERATION)
+
+
+concept_pks = PKCache()
+"""The primary keys of the concept rows resolved by :meth:`~research_vocabs.models.ConceptManager.get_or_create_many`."""
+
+
+def row_hash(uri, name, label) -> str:
+    """Returns the content hash of a concept row, computed the same way for the vocabulary and the database."""
+    return hashlib.sha1(json.dumps([str(uri), name, label]).encode(), usedforsecurity=False).hexdigest()
+
+
+def concept_rows(vocabulary, lang="en") -> dict:
+    """Returns the ``(name, label)`` of every concept of a vocabulary keyed by URI, read straight from its index."""
+    index = vocabulary.index
+    return {str(index.uri(entry)): (index.name(entry), index.label(entry, lang)) for entry in index.concepts}
+
+
+def sync_concepts(model, vocabulary, queryset, extra=None, delete=True, batch_size=None) -> tuple[int, int, int]:
+    """Makes the concept rows in ``queryset`` match the concepts of a vocabulary. The existing rows are read in a single
+    query and compared with the vocabulary through their content hash, only the differences are written: new concepts
+    are inserted with ``bulk_create``, changed ones are saved with ``bulk_update`` and, if ``delete`` is set, rows of
+    concepts that left the vocabulary are deleted in batches.
+
+    Args:
+        model: The concept model, a subclass of :class:`~research_vocabs.models.AbstractConcept`.
+        vocabulary (VocabularyBase): The vocabulary whose concepts are stored.
+        queryset (QuerySet): The rows that belong to the vocabulary.
+        extra (dict): Field values shared by every row, e.g. the ``vocabulary`` foreign key of ``Concept``.
+        delete (bool): Delete the rows of concepts that are no longer part of the vocabulary.
+        batch_size (int): The number of rows per query. Defaults to the ``VOCABULARY_SYNC_BATCH_SIZE`` setting.
+
+    Returns:
+        tuple: The number of inserted, updated and deleted rows.
+    """
+    extra = extra or {}
+    batch_size = batch_size or get_setting("SYNC_BATCH_SIZE")
+    rows = concept_rows(vocabulary)
+    existing = {uri: (pk, name, label) for pk, uri, name, label in queryset.values_list("pk", "uri", "name", "label")}
+
+    removed = [pk for uri, (pk, _, _) in existing.items() if uri not in rows] if delete else []
+    changed, added = [], []
+    for uri, (name, label) in rows.items():
+        if uri not in existing:
+            added.append(model(uri=uri, name=name, label=label, **extra))
+        elif row_hash(uri, *existing[uri][1:]) != row_hash(uri, name, label):
+            changed.append(model(pk=existing[uri][0], uri=uri, name=name, label=label, **extra))
+
+    with transaction.atomic():
+        # deletes go first so that a concept renamed to the name of a removed one does not hit a unique constraint
+        for i in range(0, len(removed), batch_size):
+            model.objects.filter(pk__in=removed[i : i + batch_size]).delete()
+        if changed:
+            model.objects.bulk_update(changed, ["name", "label"], batch_size=batch_size)
+        if added:
+            # a row may already exist outside of the queryset, e.g. with the vocabulary of a previous name
+            model.objects.bulk_create(
+                added,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["uri"],
+                update_fields=["name", "label", *extra],
+            )
+    if removed or changed or added:
+        concept_pks.invalidate(using=queryset.db)
+    return len(added), len(changed), len(removed)
+
+
+def sync_vocabulary(vocabulary, delete=True, force=False, batch_size=None) -> SyncResult:
+    """Synchronizes the :class:`~research_vocabs.models.Vocabulary` row of a vocabulary and its
+    :class:`~research_vocabs.models.Concept` rows, see :func:`sync_concepts`.
+
+    A digest of the synchronized content is kept in ``Vocabulary.meta`` so that a vocabulary that has not changed since
+    its last synchronization costs a single query.
+
+    Args:
+        vocabulary (VocabularyBase): The vocabulary to synchronize.
+        delete (bool): Delete the rows of concepts that are no longer part of the vocabulary.
+        force (bool): Compare the rows even if the digest says that nothing changed.
+        batch_size (int): The number of rows per query.
+    """
+    from .models import Concept, Vocabulary
+
+    start = time.perf_counter()
+    scheme = vocabulary.scheme()
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(json.dumps([str(scheme.URI), scheme.label()]).encode())
+    for uri, (name, label) in sorted(concept_rows(vocabulary).items()):
+        digest.update(row_hash(uri, name, label).encode())
+    digest = digest.hexdigest()
+
+    row = Vocabulary.objects.filter(name=scheme.name).first()
+    if not force and row is not None and (row.meta or {}).get(SYNC_HASH) == digest:
+        return SyncResult(scheme.name, 0, 0, 0, time.perf_counter() - start)
+
+    with transaction.atomic():
+        if row is None:
+            row = Vocabulary(name=scheme.name)
+        if row.pk is None or (row.label, row.uri) != (scheme.label(), str(scheme.URI)):
+            row.label, row.uri = scheme.label(), str(scheme.URI)
+            row.save()
+        counts = sync_concepts(Concept, vocabulary, row.concepts.all(), {"vocabulary": row}, delete, batch_size)
+        if delete and (row.meta or {}).get(SYNC_HASH) != digest:
+            # kept rows of removed concepts would be missed by the next synchronization otherwise
+            row.meta = {**(row.meta or {}), SYNC_HASH: digest}
+            row.save(update_fields=["meta"])
+    return SyncResult(scheme.name, *counts, time.perf_counter() - start)
+
+
+def sync_vocabularies(names=None, **kwargs) -> list[SyncResult]:
+    """Synchronizes the registered vocabularies, or only those named in ``names``, see :func:`sync_vocabulary`."""
+    load_pending()
+    names = list(vocab_registry) if names is None else names
+    missing = [name for name in names if name not in vocab_registry]
+    if missing:
+        msg = f"Unknown vocabularies: {', '.join(missing)}."
+        raise ValueError(msg)
+    return [sync_vocabulary(vocab_registry[name], **kwargs) for name in names]
@@ -1,5 +1,6 @@
 from django import template
 from django.template.loader import render_to_string
+from django.utils import translation
 from django.utils.safestring import mark_safe
 from rdflib import URIRef
 
@@ -17,7 +18,7 @@ def i18n_label(context, concept):
     #     concept = vocabulary.get_concept(concept)
 
     request = context.get("request", None)
-    lang = getattr(request, "LANGUAGE_CODE", "en")
+    lang = getattr(request, "LANGUAGE_CODE", None) or translation.get_language()
     return concept.label(lang)
 
 
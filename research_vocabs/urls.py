@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import views
+
+app_name = "vocabularies"
+
+urlpatterns = [
+    path("vocabularies/", views.VocabularyListView.as_view(), name="list"),
+    path("vocabularies/<str:vocabulary>/", views.VocabularyDetailView.as_view(), name="detail"),
+    # not a term url, those always end with a slash
+    path("vocabularies/<str:vocabulary>/tree.json", views.VocabularyTreeView.as_view(), name="tree"),
+    path("vocabularies/<str:vocabulary>/search.json", views.VocabularySearchView.as_view(), name="search"),
+    path("vocabularies/<str:vocabulary>/choices.json", views.VocabularyChoicesView.as_view(), name="choices"),
+    path("vocabularies/<str:vocabulary>/<str:term>/", views.VocabularyDetailView.as_view(), name="term"),
+]
@@ -54,6 +54,18 @@ def get_setting(key):
     local_setting = {
         "DEFAULT_PREFIX": "DEFAULT",
         "DEFAULT_CACHE": "vocabularies",
+        "LAZY": False,
+        "SHARED_INDEX": False,
+        "COLUMNAR": False,
+        "STREAMING": False,
+        "PARSE_WORKERS": 1,
+        "SNAPSHOTS": True,
+        "SNAPSHOT_DIR": None,
+        "LABEL_FALLBACK": ["en"],
+        "TREE_MAX_AGE": 60 * 60,
+        "AUTOCOMPLETE_THRESHOLD": 100,
+        "SYNC_BATCH_SIZE": 500,
+        "PK_CACHE_SIZE": 10_000,
     }
     return getattr(settings, f"VOCABULARY_{key}", local_setting[key])
 
@@ -1,7 +1,47 @@
-from django.http import Http404
-from django.views.generic import DetailView, ListView
+import hashlib
+from functools import lru_cache
 
-from .registry import vocab_registry
+from django.core import signing
+from django.core.exceptions import SuspiciousOperation
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views.generic import DetailView, ListView, View
+
+from .index import KIND_COLLECTION
+from .registry import load_pending, vocab_registry
+from .utils import get_setting
+from .widgets import CHOICES_SALT
+
+
+def get_vocabulary(name):
+    """Returns a registered vocabulary by the name of its concept scheme or raises Http404."""
+    load_pending()
+    try:
+        return vocab_registry[name]
+    except KeyError as e:
+        msg = "The requested vocabulary could not be found"
+        raise Http404(msg) from e
+
+
+@lru_cache(maxsize=128)
+def restrict_vocabulary(vocabulary, only=None, collection=None):
+    """Returns a vocabulary restricted to the values of a signed ``only`` token or to the members of a collection. The
+    restriction is resolved once per token and vocabulary, requests for the next pages reuse it."""
+    if only:
+        try:
+            values = signing.loads(only, salt=CHOICES_SALT)
+        except signing.BadSignature as e:
+            msg = "Invalid choices restriction."
+            raise SuspiciousOperation(msg) from e
+        return vocabulary.__class__(include_only=values)
+    index = vocabulary.index
+    if (entry := index.find(collection)) is None or index.kind(entry) != KIND_COLLECTION:
+        msg = f"'{collection}' is not a collection of {vocabulary.scheme().name}."
+        raise Http404(msg)
+    return vocabulary.from_collection(collection)
 
 
 class VocabularyListView(ListView):
@@ -9,6 +49,7 @@ class VocabularyListView(ListView):
     context_object_name = "vocabularies"
 
     def get(self, request, *args, **kwargs):
+        load_pending()
         self.object_list = vocab_registry.items()
         context = self.get_context_data()
         return self.render_to_response(context)
@@ -18,11 +59,7 @@ class VocabularyDetailView(DetailView):
     template_name = "research_vocabs/vocabulary_detail.html"
 
     def get_object(self):
-        try:
-            self.vocabulary = vocab_registry[self.kwargs["vocabulary"]]
-        except KeyError as e:
-            msg = "The requested vocabulary could not be found"
-            raise Http404(msg) from e
+        self.vocabulary = get_vocabulary(self.kwargs["vocabulary"])
         return self.vocabulary
 
     def get_context_data(self, **kwargs):
@@ -35,3 +72,126 @@ class VocabularyDetailView(DetailView):
             context["is_scheme"] = True
             context["concept"] = self.vocabulary.scheme()
         return context
+
+
+class VocabularyTreeView(View):
+    """Returns the children of a node in the hierarchy of a vocabulary as JSON, see
+    :meth:`~research_vocabs.core.VocabularyBase.tree_children`. The view serves jstree's AJAX mode: jstree passes the
+    node to expand as ``?id=`` and the top level is requested with ``?id=%23``. Add ``&selected=<concept>`` to the top
+    level request to reveal a concept.
+
+    Responses carry an ETag derived from the content of the vocabulary and may be cached for
+    ``VOCABULARY_TREE_MAX_AGE`` seconds.
+    """
+
+    def get(self, request, *args, **kwargs):
+        vocabulary = get_vocabulary(kwargs["vocabulary"])
+        node = request.GET.get("id") or "#"
+        selected = request.GET.get("selected") if node == "#" else None
+        lang = translation.get_language()
+
+        key = "\n".join([vocabulary.index.fingerprint, node, selected or "", lang or ""])
+        etag = quote_etag(hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest())
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                nodes = vocabulary.tree_children(node, selected=selected, lang=lang)
+            except ValueError as e:
+                raise Http404(str(e)) from e
+            response = JsonResponse(nodes, safe=False)
+
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=get_setting("TREE_MAX_AGE"))
+        patch_vary_headers(response, ["Accept-Language"])
+        return response
+
+
+class VocabularySearchView(View):
+    """Returns the concepts of a vocabulary matching a prefix as JSON, for autocomplete inputs, see
+    :meth:`~research_vocabs.core.VocabularyBase.search`. The query is passed as ``?q=`` and the number of results as
+    ``?limit=`` (at most ``max_limit``). Each result holds the name, URI and label of a concept in the active language
+    and, when the concept was found by another label, the text that matched.
+    """
+
+    max_limit = 50
+
+    def get(self, request, *args, **kwargs):
+        vocabulary = get_vocabulary(kwargs["vocabulary"])
+        q = request.GET.get("q", "")
+        try:
+            limit = min(int(request.GET.get("limit", 10)), self.max_limit)
+        except ValueError:
+            limit = 10
+        lang = translation.get_language()
+        name = vocabulary.scheme().name
+
+        index = vocabulary.index
+        matches = vocabulary.get_search_index().search(q, lang, limit=limit, entries=vocabulary.choice_entries())
+        results = []
+        for match in matches:
+            term = index.name(match.entry)
+            label = index.label(match.entry, lang)
+            results.append(
+                {
+                    "name": term,
+                    "uri": index.uri(match.entry),
+                    "label": label,
+                    # hidden labels are meant for matching misspellings and are never displayed
+                    "matched": None if match.field == "hiddenLabel" or match.text == label else match.text,
+                    "href": reverse("vocabularies:term", kwargs={"vocabulary": name, "term": term}),
+                }
+            )
+
+        response = JsonResponse(results, safe=False)
+        patch_vary_headers(response, ["Accept-Language"])
+        return response
+
+
+class VocabularyChoicesView(View):
+    """Returns a page of the choices of a vocabulary as JSON in the format expected by Select2, for
+    :class:`~research_vocabs.widgets.ConceptSelect`. Without a query the choices are listed in their usual order, with
+    ``?q=`` they are searched and ranked as in :meth:`~research_vocabs.core.VocabularyBase.search`. Pages are selected
+    with ``?page=`` starting at 1.
+
+    Widgets of vocabularies that are restricted to some values pass them as ``?only=``, signed with
+    :data:`~research_vocabs.widgets.CHOICES_SALT`, and those restricted to a collection pass its name as
+    ``?collection=``, see :func:`restrict_vocabulary`.
+    """
+
+    paginate_by = 20
+
+    def get_vocabulary(self):
+        vocabulary = get_vocabulary(self.kwargs["vocabulary"])
+        only, collection = self.request.GET.get("only"), self.request.GET.get("collection")
+        if only or collection:
+            vocabulary = restrict_vocabulary(vocabulary, only, collection)
+        return vocabulary
+
+    def get(self, request, *args, **kwargs):
+        vocabulary = self.get_vocabulary()
+        q = request.GET.get("q", "")
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        start, end = (page - 1) * self.paginate_by, page * self.paginate_by
+        lang = translation.get_language()
+
+        if q:
+            index = vocabulary.index
+            matches = vocabulary.get_search_index().search(
+                q, lang, limit=end + 1, entries=vocabulary.choice_entries()
+            )
+            choices = [(index.name(m.entry), index.label(m.entry, lang)) for m in matches]
+        else:
+            choices = vocabulary.choices
+
+        response = JsonResponse(
+            {
+                "results": [{"id": value, "text": label} for value, label in choices[start:end]],
+                "pagination": {"more": len(choices) > end},
+            }
+        )
+        patch_vary_headers(response, ["Accept-Language"])
+        return response
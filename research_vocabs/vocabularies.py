@@ -1,4 +1,6 @@
+import hashlib
 import importlib
+import json
 import logging
 from pathlib import Path
 from urllib.error import HTTPError
@@ -7,7 +9,12 @@ from rdflib import Graph
 from rdflib.namespace import SKOS
 
 from .core import VocabularyBase
-from .utils import LocalFilePathError, RemoteURLError, cache
+from .mapped import MappedIndex, index_path, write_index
+from .pruning import TripleFilter
+from .snapshot import is_valid, load_snapshot, source_key, write_snapshot
+from .sources import merge_graphs, parse_part, parse_parts
+from .streaming import stream_index
+from .utils import LocalFilePathError, RemoteURLError, cache, get_setting, get_URIRef
 
 logger = logging.getLogger(__name__)
 
@@ -29,19 +36,157 @@ class LocalVocabulary(VocabularyBase):
                 source = "https://vocabs.ardc.edu.au/registry/api/resource/downloads/1211/isc2020.ttl"
 
 
+    Parsed sources are compiled into a binary snapshot (see :mod:`research_vocabs.snapshot`) which is loaded instead
+    of the original file on subsequent starts, for as long as the source file remains unchanged. Set
+    ``VOCABULARY_SNAPSHOTS = False`` to always parse the source.
+
+    ``Meta.source`` may be compressed or a list of sources that are parsed and merged, see
+    :mod:`research_vocabs.sources`.
+
+    Set the ``keep_predicates`` and ``languages`` Meta options to drop the triples a site never uses while the source
+    is parsed, see :mod:`research_vocabs.pruning`.
     """
 
+    supports_shared_index = True
+
+    @classmethod
+    def get_source_paths(cls) -> list[Path]:
+        """Returns the absolute paths of every part of the source. Relative paths are resolved against the module that
+        defines the vocabulary class."""
+        calling_module = importlib.import_module(cls.__module__)
+        return [(Path(calling_module.__file__).parent / part["source"]).resolve() for part in cls._sources()]
+
+    @classmethod
+    def get_source_path(cls) -> Path:
+        """Returns the absolute path of the source file, the first part of a multi-part source."""
+        return cls.get_source_paths()[0]
+
+    @classmethod
+    def source_files(cls) -> list[Path]:
+        return [*super().source_files(), *cls.get_source_paths()]
+
+    def source_parts(self) -> list[dict]:
+        """Returns the arguments of :meth:`rdflib.Graph.parse` for every part of the source, with absolute paths.
+
+        Raises:
+            LocalFilePathError: If a part of the source does not exist.
+        """
+        parts = self._sources()
+        for part, path in zip(parts, self.get_source_paths(), strict=True):
+            if not path.exists():
+                raise LocalFilePathError(self.__class__.__name__)
+            part["source"] = path
+        return parts
+
+    def get_triple_filter(self) -> TripleFilter | None:
+        """Returns the filter described by the ``keep_predicates`` and ``languages`` Meta options, or None if every
+        triple of the source is kept."""
+        meta = self._meta
+        if not meta.keep_predicates and not meta.languages:
+            return None
+        # CURIEs are expanded with the default bindings of rdflib and the prefix of the vocabulary
+        bindings = Graph()
+        if meta.prefix:
+            bindings.bind(meta.prefix, self.ns)
+        predicates = [get_URIRef(p, bindings, self.ns) for p in meta.keep_predicates] or None
+        return TripleFilter(predicates, meta.languages or None)
+
+    def parse_options(self) -> dict | None:
+        """Returns the options that affect the graph parsed from the source, used to key snapshots and caches."""
+        triple_filter = self.get_triple_filter()
+        return None if triple_filter is None else {"pruning": triple_filter.key()}
+
+    def parse_source(self, *parts: dict) -> Graph:
+        """Parses the parts of the source into a new graph, dropping the triples rejected by
+        :meth:`get_triple_filter`. Several parts may be parsed in parallel, see
+        :func:`~research_vocabs.sources.parse_parts`."""
+        results = parse_parts(parse_part, list(parts), self.get_triple_filter())
+        return merge_graphs(part.result for part in results)
+
     def build_graph(self):
-        # get file path of class
-        calling_module = importlib.import_module(self.__class__.__module__)
-        source_kwargs = self._source()
+        parts = self.source_parts()
+
+        if get_setting("SNAPSHOTS"):
+            sources = [part["source"] for part in parts]
+            if snapshot := load_snapshot(sources, self.snapshot_options()):
+                self.__class__.tables = snapshot.tables
+                return snapshot.graph
+
+        return self.parse_source(*parts)
 
-        source_kwargs["source"] = (Path(calling_module.__file__).parent / source_kwargs["source"]).resolve()
+    def compile_graph(self, graph):
+        """Compiles the graph and its tables into a snapshot. They are compiled after the collections of the Meta
+        options were added, so a vocabulary loaded from a snapshot is identical to a freshly parsed one."""
+        if get_setting("SNAPSHOTS"):
+            sources = [part["source"] for part in self.source_parts()]
+            write_snapshot(sources, graph, self.tables, self.snapshot_options())
 
-        if not source_kwargs["source"].exists():
-            raise LocalFilePathError(self.__class__.__name__)
+    def collection_options(self) -> dict:
+        """Returns the collections declared in the Meta options with their members as full URIs."""
+        meta = self._meta
+        # build_collections expands the members in place, and sorts those of unordered collections, normalize them the
+        # same way so that the options are identical before and after the collections are built
+        bindings = Graph()
+        if meta.prefix:
+            bindings.bind(meta.prefix, self.ns)
+        options = {}
+        for name, collection in meta.collections.items():
+            members = []
+            for member in collection["skos:member"]:
+                try:
+                    members.append(get_URIRef(member, bindings, self.ns))
+                except ValueError:
+                    # the prefix is only bound by the source
+                    members.append(member)
+            if not collection.ordered:
+                members = sorted(members)
+            options[name] = {"members": [str(m) for m in members], "ordered": collection.ordered}
+        return options
 
-        return Graph().parse(**source_kwargs)
+    def snapshot_options(self) -> dict | None:
+        """Returns the options that affect a compiled snapshot: the parse options and the Meta collections, which are
+        part of its graph and tables."""
+        options = self.parse_options() or {}
+        if collections := self.collection_options():
+            options["collections"] = collections
+        return options or None
+
+    def get_index_options(self) -> dict:
+        """Returns the Meta options that affect the content of the memory-mapped index."""
+        meta = self._meta
+        options = {
+            "prefix": meta.prefix,
+            "namespace": meta.namespace,
+            "rdf_type": meta.rdf_type,
+            "ordered": meta.ordered,
+            "collections": self.collection_options(),
+            "ordered_collections": list(meta.ordered_collections),
+        }
+        if len(sources := self.get_source_paths()) > 1:
+            options["parts"] = [str(source) for source in sources[1:]]
+        return {**options, **(self.parse_options() or {})}
+
+    def load_streamed_index(self):
+        return stream_index(self, self.source_parts(), self.get_triple_filter())
+
+    def load_mapped_index(self):
+        sources = [part["source"] for part in self.source_parts()]
+
+        path = index_path(sources[0], self.get_index_options())
+        index = MappedIndex.open(path)
+        if index is not None and is_valid(index.header["source"], sources):
+            return index
+
+        # (re)build the index from the graph, other processes will map the new file on their next start
+        header = {"source": source_key(sources), "options": self.get_index_options()}
+        if self.index is None:
+            self.setup_graph()
+        try:
+            write_index(path, self.index, header)
+        except OSError:
+            logger.warning("Could not write concept index %s", path, exc_info=True)
+            return None
+        return MappedIndex.open(path)
 
 
 class RemoteVocabulary(LocalVocabulary):
@@ -56,22 +201,48 @@ class RemoteVocabulary(LocalVocabulary):
         class SimpleLithology(RemoteVocabulary):
             source = "https://vocabs.ardc.edu.au/registry/api/resource/downloads/1211/isc2020.ttl"
 
+    Remote sources cannot be checked for changes without downloading them, so they are never served from a
+    memory-mapped index.
     """
 
+    supports_shared_index = False
+
+    @classmethod
+    def source_files(cls) -> list[Path]:
+        # remote sources are cached along with their graph, only the definition of the class is a local file
+        return super(LocalVocabulary, cls).source_files()
+
     def build_graph(self):
-        source_kwargs = self._source()
+        parts = self._sources()
+        key = parts[0]["source"]
+        options = self.parse_options() or {}
+        if len(parts) > 1:
+            options["parts"] = [part["source"] for part in parts[1:]]
+        if options:
+            # differently pruned graphs and differently composed sources are cached separately
+            key += ":" + hashlib.sha1(json.dumps(options).encode(), usedforsecurity=False).hexdigest()[:16]
 
         # check if graph is in cache
-        if graph := cache.get(source_kwargs["source"]):
+        if graph := cache.get(key):
             return graph
         try:
-            graph = Graph().parse(**source_kwargs)
+            graph = self.parse_source(*parts)
         except HTTPError as e:
-            raise RemoteURLError(self.__class__.__name__, source_kwargs["source"]) from e
+            raise RemoteURLError(self.__class__.__name__, e.url) from e
         else:
-            cache.set(source_kwargs["source"], graph, None)
+            cache.set(key, graph, None)
             return graph
 
+    def compile_graph(self, graph):
+        # the parsed graph is cached by build_graph, remote sources are not compiled into snapshots
+        pass
+
+    def load_streamed_index(self):
+        try:
+            return stream_index(self, self._sources(), self.get_triple_filter())
+        except HTTPError as e:
+            raise RemoteURLError(self.__class__.__name__, e.url) from e
+
 
 class VocabularyBuilder(VocabularyBase):
     """Subclass VocabularyBuilder if you wish to explicitly develop your own concept scheme in Django."""
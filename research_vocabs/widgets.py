@@ -0,0 +1,112 @@
+from django import forms
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils import translation
+from django.utils.http import urlencode
+
+from .utils import get_setting
+
+CHOICES_SALT = "research_vocabs.choices"
+"""Salt of the signed list of allowed values passed to the choices endpoint by widgets of restricted vocabularies."""
+
+
+class VocabularyChoices:
+    """The choices of a vocabulary in the active language, evaluated each time they are iterated."""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+
+    def __iter__(self):
+        return iter(self.vocabulary.choices)
+
+
+class ConceptSelectMixin:
+    """Renders a vocabulary as a regular ``<select>`` while it is small and as an autocomplete input once it has more
+    than ``threshold`` choices. In autocomplete mode only the selected concepts are rendered, the other choices are
+    fetched page by page from :class:`~research_vocabs.views.VocabularyChoicesView` as the user types.
+
+    The autocomplete input uses the copy of Select2 that ships with ``django.contrib.admin``.
+
+    Args:
+        vocabulary (VocabularyBase): The vocabulary instance whose concepts are the choices.
+        choices: The choices rendered by the ``<select>``, form fields set them. Defaults to the vocabulary choices.
+        threshold (int): The number of choices above which the autocomplete input is used. Defaults to the
+            ``VOCABULARY_AUTOCOMPLETE_THRESHOLD`` setting, 0 always uses the autocomplete input.
+    """
+
+    autocomplete_class = "vocabulary-autocomplete"
+
+    def __init__(self, vocabulary, attrs=None, choices=(), threshold=None):
+        self.vocabulary = vocabulary
+        self.threshold = get_setting("AUTOCOMPLETE_THRESHOLD") if threshold is None else threshold
+        super().__init__(attrs, choices or VocabularyChoices(vocabulary))
+
+    @property
+    def is_autocomplete(self) -> bool:
+        return len(self.vocabulary.choices) > self.threshold
+
+    @property
+    def media(self):
+        extra = "" if settings.DEBUG else ".min"
+        return forms.Media(
+            js=(
+                f"admin/js/vendor/jquery/jquery{extra}.js",
+                f"admin/js/vendor/select2/select2.full{extra}.js",
+                "admin/js/jquery.init.js",
+                "research_vocabs/js/autocomplete.js",
+            ),
+            css={"screen": (f"admin/css/vendor/select2/select2{extra}.css",)},
+        )
+
+    def get_url(self) -> str:
+        """Returns the URL of the choices endpoint. Vocabularies that are restricted by ``include_only`` pass their
+        values along, signed so that they cannot be tampered with, those restricted by ``Meta.from_collection`` only
+        pass the name of the collection so that the URL does not grow with the collection."""
+        vocabulary = self.vocabulary
+        url = reverse("vocabularies:choices", kwargs={"vocabulary": vocabulary.scheme().name})
+        if vocabulary.include_only:
+            url += "?" + urlencode({"only": signing.dumps(vocabulary.values, salt=CHOICES_SALT, compress=True)})
+        elif collection := vocabulary._meta.from_collection:
+            url += "?" + urlencode({"collection": collection})
+        return url
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        if self.is_autocomplete:
+            attrs.setdefault("lang", translation.get_language())
+            attrs.update(
+                {
+                    "data-ajax--url": self.get_url(),
+                    "data-ajax--cache": "true",
+                    "data-ajax--delay": 250,
+                    "data-ajax--type": "GET",
+                    "data-allow-clear": "false" if self.is_required else "true",
+                    "data-placeholder": "",
+                    "class": f"{attrs.get('class', '')} {self.autocomplete_class}".strip(),
+                }
+            )
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        if not self.is_autocomplete:
+            return super().optgroups(name, value, attrs)
+
+        index = self.vocabulary.index
+        lang = translation.get_language()
+        options = []
+        if not self.allow_multiple_selected and not self.is_required:
+            # an empty option lets Select2 show the placeholder and clear the selection
+            options.append(self.create_option(name, "", "", False, 0, attrs=attrs))
+        for v in value:
+            if v and (entry := index.find(v)) is not None:
+                options.append(self.create_option(name, v, index.label(entry, lang), True, len(options), attrs=attrs))
+        return [(None, options, 0)]
+
+
+class ConceptSelect(ConceptSelectMixin, forms.Select):
+    """A select input for a single concept, see :class:`ConceptSelectMixin`."""
+
+
+class ConceptSelectMultiple(ConceptSelectMixin, forms.SelectMultiple):
+    """A select input for several concepts, see :class:`ConceptSelectMixin`."""
@@ -0,0 +1,37 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+
+from research_vocabs import LocalVocabulary
+
+VOCAB_DATA = Path(__file__).resolve().parent.parent / "example" / "vocab_data"
+
+
+def variant(vocabulary, **options):
+    """Returns a fresh, unloaded copy of an example vocabulary that is parsed from the same source, with the given Meta
+    options added or overridden."""
+
+    class Meta:
+        source = str(VOCAB_DATA / Path(vocabulary._meta.source).name)
+        prefix = vocabulary._meta.prefix
+        namespace = vocabulary._meta.namespace
+        collections = vocabulary._meta.collections
+
+    for k, v in options.items():
+        setattr(Meta, k, v)
+
+    return type(vocabulary.__name__, (LocalVocabulary,), {"Meta": Meta, "__module__": __name__})
+
+
+class SnapshotDirMixin:
+    """Writes the snapshots and index files of each test to a temporary directory, available as ``self.tmp``."""
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        settings = override_settings(VOCABULARY_SNAPSHOT_DIR=self.tmp)
+        settings.enable()
+        self.addCleanup(settings.disable)
@@ -0,0 +1,103 @@
+from functools import partial
+
+from django.test import TestCase, override_settings
+
+from example.vocabularies import ISC2020, SimpleLithology
+from research_vocabs.columnar import ColumnarIndex
+
+from .helpers import SnapshotDirMixin, variant
+
+GRANITE = "http://resource.geosciml.org/classifier/cgi/lithology/granite"
+
+
+columnar = partial(variant, columnar=True)
+"""Returns a fresh copy of an example vocabulary that is served from a columnar index."""
+
+
+class TestColumnarIndex(SnapshotDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.vocabulary = columnar(SimpleLithology)()
+        self.reference = SimpleLithology()
+
+    def test_graph_released(self):
+        self.assertIsInstance(self.vocabulary.index, ColumnarIndex)
+        self.assertIsNone(self.vocabulary._graph)
+
+    def test_render_without_graph(self):
+        concept = self.vocabulary.get_concept("granite")
+        self.assertIn(">lith:granite</a>", concept.__html__())
+        self.assertIsNone(self.vocabulary._graph)
+        self.assertEqual(concept.__html__(), self.reference.get_concept("granite").__html__())
+
+    def test_keep_graph(self):
+        vocabulary = columnar(SimpleLithology, keep_graph=True)()
+        self.assertIsInstance(vocabulary.index, ColumnarIndex)
+        self.assertIsNotNone(vocabulary._graph)
+
+    def test_choices(self):
+        self.assertEqual(self.vocabulary.choices, self.reference.choices)
+        self.assertEqual(self.vocabulary.get_choices("es"), self.reference.get_choices("es"))
+
+    def test_label(self):
+        index, reference = self.vocabulary.index, self.reference.index
+        for entry in range(index.size):
+            for lang in ["en", "es", "de-at", None]:
+                self.assertEqual(index.label(entry, lang), reference.label(entry, lang))
+
+    def test_get_concept(self):
+        for key in ["granite", "lith:granite", GRANITE]:
+            concept = self.vocabulary.get_concept(key)
+            self.assertEqual(concept.name, "granite")
+            self.assertEqual(concept.label("es"), "granito")
+
+        with self.assertRaises(ValueError):
+            self.vocabulary.get_concept("nonexistant")
+
+    def test_labels(self):
+        index, reference = self.vocabulary.index, self.reference.index
+        for entry in range(len(reference.records)):
+            self.assertEqual(index.labels(entry), reference.labels(entry))
+
+    def test_hierarchy(self):
+        index = self.vocabulary.index
+        granite = index.find("granite")
+        self.assertIn("granitoid", [index.name(i) for i in index.broader(granite)])
+        self.assertIn(granite, index.narrower(index.find("granitoid")))
+        self.assertEqual(
+            [c.name for c in self.vocabulary.ancestors("granite")],
+            [c.name for c in self.reference.ancestors("granite")],
+        )
+        self.assertIsNone(self.vocabulary._graph)
+
+    def test_collection_members(self):
+        vocabulary = columnar(ISC2020, from_collection="isc:test")()
+        # the declared order of the collection is kept
+        self.assertEqual(vocabulary.choices, ISC2020.from_collection("isc:test").choices)
+        self.assertEqual([value for value, _ in vocabulary.choices], ["Albian", "Aeronian"])
+        index = vocabulary.index
+        collection = index.find("isc:test")
+        self.assertTrue(index.is_member(index.find("Albian"), collection))
+        self.assertFalse(index.is_member(index.find("Hettangian"), collection))
+
+    def test_search_without_graph(self):
+        self.assertEqual(
+            [c.name for c in self.vocabulary.search("gran")],
+            [c.name for c in self.reference.search("gran")],
+        )
+        self.assertEqual(self.vocabulary.suggest("granit")[0].name, "granite")
+        self.assertEqual(self.vocabulary.resolve_many(["granite"]).concepts[0].name, "granite")
+        self.assertIsNone(self.vocabulary._graph)
+
+    def test_attrs_build_graph(self):
+        concept = self.vocabulary.get_concept("granite")
+        self.assertEqual(concept.attrs, self.reference.get_concept("granite").attrs)
+        self.assertIsNotNone(self.vocabulary._graph)
+        # the rebuilt graph does not replace the columnar tables
+        self.assertIsInstance(self.vocabulary.index, ColumnarIndex)
+        self.assertIs(self.vocabulary.tables, self.vocabulary.index.tables)
+
+    def test_setting(self):
+        with override_settings(VOCABULARY_COLUMNAR=True):
+            vocabulary = columnar(SimpleLithology, columnar=False)()
+        self.assertIsInstance(vocabulary.index, ColumnarIndex)
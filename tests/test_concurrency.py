@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import TestCase
+
+from example.vocabularies import ISC2020, SimpleLithology
+
+THREADS = 16
+
+
+def cold(vocabulary):
+    """Returns an unloaded copy of a vocabulary class."""
+    return type(vocabulary.__name__, (vocabulary,), {"__module__": vocabulary.__module__})
+
+
+class TestConcurrentLoading(TestCase):
+    def hammer(self, vocabulary, func):
+        """Calls func with a new instance of the vocabulary from many threads at once and returns the results."""
+        barrier = threading.Barrier(THREADS)
+
+        def run(_):
+            barrier.wait()
+            return func(vocabulary())
+
+        with ThreadPoolExecutor(THREADS) as executor:
+            return list(executor.map(run, range(THREADS)))
+
+    def test_single_flight_build(self):
+        for vocabulary in [cold(SimpleLithology), cold(ISC2020)]:
+            with self.subTest(vocabulary=vocabulary.__name__):
+                build_graph = vocabulary.build_graph
+                with mock.patch.object(vocabulary, "build_graph", autospec=True, side_effect=build_graph) as build:
+                    results = self.hammer(vocabulary, lambda v: (v.index, v.graph, v.choices))
+                build.assert_called_once()
+
+                index, graph, choices = results[0]
+                for result in results:
+                    self.assertIs(result[0], index)
+                    self.assertIs(result[1], graph)
+                    self.assertEqual(result[2], choices)
+
+    def test_concurrent_reads(self):
+        vocabulary = cold(SimpleLithology)
+
+        def read(instance):
+            concepts = [instance.get_concept(value) for value, _ in instance.choices]
+            return [(c, c.attrs.get("skos:broader"), c.label("es")) for c in concepts]
+
+        results = self.hammer(vocabulary, read)
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+        # every thread resolved the same interned concepts and shared attributes
+        for (a, attrs_a, _), (b, attrs_b, _) in zip(results[0], results[-1]):
+            self.assertIs(a, b)
+            self.assertIs(attrs_a, attrs_b)
+
+    def test_graph_is_published_complete(self):
+        vocabulary = cold(ISC2020)
+        sizes = self.hammer(vocabulary, lambda v: len(v.graph))
+        self.assertEqual(set(sizes), {len(vocabulary().graph)})
+
+    def test_shared_instance_waits_for_graph(self):
+        instance = cold(ISC2020)()
+        complete = len(instance.graph)
+        type(instance)._graph = None
+        building, resume = threading.Event(), threading.Event()
+        build_collections = instance.build_collections
+
+        def pause():
+            building.set()
+            resume.wait(5)
+            build_collections()
+
+        def read():
+            sizes.append(len(instance.graph))
+
+        sizes = []
+        with mock.patch.object(instance, "build_collections", side_effect=pause):
+            builder = threading.Thread(target=read)
+            builder.start()
+            building.wait(5)
+            # the graph is assigned to the instance but its collections are still missing
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(0.2)
+            self.assertTrue(reader.is_alive())
+            resume.set()
+            builder.join()
+            reader.join()
+        self.assertEqual(sizes, [complete, complete])
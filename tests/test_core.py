@@ -1,8 +1,14 @@
+import copy
+import pickle
+from unittest import mock
+
 from django.test import TestCase
+from example.models import TestModel
 from example.vocabularies import ISC2020, SimpleLithology
-from rdflib import URIRef
+from rdflib import Graph, URIRef
 
-from research_vocabs.core import Concept, VocabMeta, VocabularyBase
+from research_vocabs.core import Concept, LazyConcept, LazyVocabulary, VocabMeta, VocabularyBase, restore_vocabulary
+from research_vocabs.registry import register
 
 
 class TestConcept(TestCase):
@@ -144,11 +150,136 @@ class TestVocabularyBase(TestCase):
             concept.URI, URIRef("http://resource.geosciml.org/classifier/cgi/lithology/alkali-olivine_basalt")
         )
 
+    def test_get_concept_is_interned(self):
+        concept = self.vocabulary.get_concept("lith:granite")
+        for key in ["granite", "http://resource.geosciml.org/classifier/cgi/lithology/granite"]:
+            self.assertIs(self.vocabulary.get_concept(key), concept)
+        self.assertIs(SimpleLithology().get_concept("granite"), concept)
+
+        with self.assertRaises(ValueError):
+            self.vocabulary.get_concept("lith:nonexistant")
+
+    def test_concept_equality(self):
+        concept = Concept("lith:granite", self.vocabulary)
+        other = Concept("granite", self.vocabulary)
+        self.assertIsNot(concept, other)
+        self.assertEqual(concept, other)
+        self.assertEqual(len({concept, other, self.vocabulary.get_concept("granite")}), 1)
+        self.assertNotEqual(concept, self.vocabulary.get_concept("granitoid"))
+        self.assertNotEqual(concept, "granite")
+
+    def test_instantiation_reuses_class_state(self):
+        triples = len(self.vocabulary.graph)
+        with (
+            mock.patch.object(SimpleLithology, "setup_graph", side_effect=AssertionError),
+            mock.patch.object(SimpleLithology, "build_collections", side_effect=AssertionError),
+        ):
+            instances = [SimpleLithology() for _ in range(100)]
+        self.assertEqual(len(self.vocabulary.graph), triples)
+        self.assertIs(instances[0].choices, self.vocabulary.choices)
+
+    def test_include_only_choices_are_shared(self):
+        include = ["granite", "basalt"]
+        choices = SimpleLithology(include_only=include).choices
+        self.assertEqual([value for value, _ in choices], include)
+        self.assertIs(SimpleLithology(include_only=list(include)).choices, choices)
+        self.assertNotEqual(self.vocabulary.choices, choices)
+
+    def test_from_collection_has_own_concepts(self):
+        vocabulary = ISC2020()
+        albian = vocabulary.get_concept("Albian")
+        scheme = vocabulary.scheme()
+        vocabulary.concepts()
+        vocabulary.materialize()
+
+        view = ISC2020.from_collection("isc:test")
+        self.assertIsNot(view.get_concept("Albian"), albian)
+        self.assertIs(view.get_concept("Albian").vocabulary, view)
+        self.assertIs(view.scheme().vocabulary, view)
+        self.assertTrue(all(concept.vocabulary is view for concept in view.concepts()))
+        self.assertIs(view.get_attrs(albian.URI)["skos:broader"].vocabulary, view)
+        self.assertIs(vocabulary.get_concept("Albian"), albian)
+        self.assertIs(vocabulary.scheme(), scheme)
+
+    def test_contains(self):
+        granite = self.vocabulary.get_concept("granite")
+        for value in [granite, "granite", "lith:granite", str(granite.URI)]:
+            self.assertIn(value, self.vocabulary)
+        self.assertNotIn("nonexistant", self.vocabulary)
+        self.assertNotIn(self.vocabulary.scheme().name, self.vocabulary)
+
+        restricted = SimpleLithology(include_only=["granite", "basalt"])
+        self.assertIn(granite, restricted)
+        self.assertNotIn("granitoid", restricted)
+
+    def test_materialize(self):
+        attributes = self.vocabulary.materialize()
+        granite = self.vocabulary.get_concept("granite")
+        self.assertIs(attributes[granite.URI], self.vocabulary.get_attrs(granite.URI))
+
+        # nested concepts are resolved to the interned instances
+        broader = granite.attrs["skos:broader"]
+        self.assertIsInstance(broader, Concept)
+        self.assertIs(broader, self.vocabulary.get_concept("granitoid"))
+
+    def test_attrs_do_not_walk_graph(self):
+        self.vocabulary.materialize()
+        with mock.patch.object(Graph, "predicate_objects", side_effect=AssertionError):
+            for concept in self.vocabulary.concepts():
+                concept.attrs.get("skos:broader")
+
     def test_get_absolute_url(self):
         url = self.vocabulary.get_absolute_url()
         self.assertEqual(url, "/vocabularies/simplelithology/")
 
 
+class TestPickle(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        self.granite = self.vocabulary.get_concept("granite")
+
+    def test_concept(self):
+        data = pickle.dumps(self.granite)
+        self.assertLess(len(data), 300)
+        self.assertIs(pickle.loads(data), self.granite)  # noqa: S301
+        scheme = pickle.loads(pickle.dumps(self.vocabulary.scheme()))  # noqa: S301
+        self.assertEqual(scheme, self.vocabulary.scheme())
+        self.assertEqual(scheme.rdf_type, self.vocabulary.scheme().rdf_type)
+
+    def test_copies_are_the_concept(self):
+        self.assertIs(copy.copy(self.granite), self.granite)
+        self.assertIs(copy.deepcopy({"value": self.granite})["value"], self.granite)
+
+    def test_lazy_concept_stays_unresolved(self):
+        lazy = pickle.loads(pickle.dumps(LazyConcept("granite", self.vocabulary)))  # noqa: S301
+        self.assertFalse(lazy.is_resolved)
+        self.assertEqual(lazy, self.granite)
+
+    def test_vocabulary(self):
+        restricted = SimpleLithology(include_only=["granite", "basalt"])
+        with mock.patch.object(SimpleLithology, "setup_graph", side_effect=AssertionError):
+            for vocabulary in [pickle.loads(pickle.dumps(restricted)), copy.deepcopy(restricted)]:  # noqa: S301
+                self.assertIsInstance(vocabulary, SimpleLithology)
+                self.assertEqual(vocabulary.include_only, restricted.include_only)
+                self.assertIs(vocabulary.index, restricted.index)
+
+        lazy = pickle.loads(pickle.dumps(LazyVocabulary(ISC2020, include_only=["Albian"])))  # noqa: S301
+        self.assertFalse(lazy.is_loaded)
+        self.assertEqual(lazy.values, ["Albian"])
+
+    def test_unimportable_vocabulary(self):
+        register(self.vocabulary)
+        vocabulary = restore_vocabulary(self.vocabulary.scheme().name, ["granite"])
+        self.assertIsInstance(vocabulary, SimpleLithology)
+        self.assertEqual(vocabulary.values, ["granite"])
+        with self.assertRaises(ValueError):
+            restore_vocabulary("nonexistant")
+
+    def test_model_instance(self):
+        instance = pickle.loads(pickle.dumps(TestModel(name="test", concept_label=self.granite)))  # noqa: S301
+        self.assertIs(instance.concept_label, self.granite)
+
+
 class TestMetaClass(TestCase):
     def setUp(self):
         self.vocabulary = ISC2020
@@ -1,7 +1,19 @@
-from django.test import TestCase
-from example.vocabularies import SimpleLithology
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-from research_vocabs.fields import ConceptField
+from django.core.exceptions import ValidationError
+from django.db.models import Value
+from django.test import TestCase, override_settings
+from example.models import TestModel
+from example.vocabularies import ISC2020, SimpleLithology
+
+from research_vocabs import LocalVocabulary, registry
+from research_vocabs.core import LazyConcept
+from research_vocabs.fields import BaseConceptField, ConceptField
+from research_vocabs.forms import TypedConceptChoiceField
+from research_vocabs.lookups import ConceptSetLookup, WithinCollection
 
 
 class ConceptFieldTest2(TestCase):
@@ -21,9 +33,185 @@ class ConceptFieldTest2(TestCase):
         self.assertEqual(kwargs["vocabulary"], self.vocabulary)
 
 
+class ConceptValidationTest(TestCase):
+    def test_validate_uses_index(self):
+        field = ConceptField(vocabulary=SimpleLithology, include_only=["granite", "basalt"], max_length=255)
+        with mock.patch.object(BaseConceptField, "_get_scheme_choices", side_effect=AssertionError):
+            field.validate(field.scheme.get_concept("granite"), None)
+            with self.assertRaises(ValidationError):
+                field.validate(field.scheme.get_concept("granitoid"), None)
+
+    def test_formfield(self):
+        formfield = TestModel._meta.get_field("concept_label").formfield()
+        self.assertIsInstance(formfield, TypedConceptChoiceField)
+        self.assertEqual(formfield.clean("granite"), SimpleLithology().get_concept("granite"))
+        with self.assertRaises(ValidationError):
+            formfield.clean("nonexistant")
+
+
+class LazyConceptsTest(TestCase):
+    def setUp(self):
+        self.field = ConceptField(vocabulary=SimpleLithology, lazy_concepts=True)
+        self.granite = SimpleLithology().get_concept("granite")
+
+    def test_from_db_value_is_lazy(self):
+        value = self.field.from_db_value("granite", None, None)
+        self.assertIsInstance(value, LazyConcept)
+        with mock.patch.object(SimpleLithology, "get_concept", side_effect=AssertionError):
+            self.assertEqual(str(value), "granite")
+            self.assertEqual(self.field.get_prep_value(value), "granite")
+        self.assertFalse(value.is_resolved)
+
+    def test_resolved_on_use(self):
+        value = self.field.from_db_value("granite", None, None)
+        self.assertEqual(value.label("es"), "granito")
+        self.assertTrue(value.is_resolved)
+        self.assertEqual(value, self.granite)
+        self.assertEqual(hash(value), hash(self.granite))
+        self.assertIs(value.attrs, SimpleLithology().get_attrs(self.granite.URI))
+        self.field.validate(value, None)
+
+    def test_unknown_value(self):
+        value = self.field.from_db_value("nonexistant", None, None)
+        self.assertEqual(str(value), "nonexistant")
+        with self.assertRaises(ValueError):
+            value.label()
+
+    def test_deconstruct(self):
+        self.assertTrue(self.field.deconstruct()[3]["lazy_concepts"])
+        self.assertNotIn("lazy_concepts", ConceptField(vocabulary=SimpleLithology).deconstruct()[3])
+
+
 # class TaggableConceptsTest(TestCase):
 #     def setUp(self):
 #         self.manager = TaggableConcepts()
 
 #     def test_keywords_manager_initialization(self):
 #         self.assertIsNotNone(self.manager)
+
+
+class LazyLithology(SimpleLithology):
+    class Meta:
+        source = "../example/vocab_data/simple_lithology.ttl"
+        prefix = "lith"
+        namespace = "http://resource.geosciml.org/classifier/cgi/lithology/"
+        lazy = True
+
+
+class LazyConceptFieldTest(TestCase):
+    def setUp(self):
+        LazyLithology._graph = None
+        LazyLithology.tables = None
+        LazyLithology.index = None
+        self.field = ConceptField(vocabulary=LazyLithology, max_length=64)
+
+    def test_field_does_not_load_vocabulary(self):
+        self.assertFalse(self.field.scheme.is_loaded)
+        self.assertIsNone(LazyLithology.graph)
+        self.assertEqual(self.field.max_length, 64)
+        self.assertEqual(self.field.check(), [])
+        self.assertFalse(self.field.scheme.is_loaded)
+
+    def test_choices_load_vocabulary(self):
+        choices = list(self.field.choices)
+        self.assertTrue(self.field.scheme.is_loaded)
+        self.assertIn(("clastic_mudstone", "mudstone"), choices)
+
+    def test_to_python_loads_vocabulary(self):
+        concept = self.field.to_python("granite")
+        self.assertEqual(concept.name, "granite")
+        self.assertTrue(self.field.scheme.is_loaded)
+
+    def test_verbose_name(self):
+        self.assertEqual(str(self.field.verbose_name), "Simple Lithology")
+
+
+CONCEPT = """<http://example.com/rocks/{name}> a <http://www.w3.org/2004/02/skos/core#Concept> .
+"""
+
+
+class LazyMaxLengthTest(TestCase):
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        settings = override_settings(VOCABULARY_SNAPSHOT_DIR=tmp / "snapshots")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.source = tmp / "rocks.ttl"
+        self.source.write_text(CONCEPT.format(name="granite"))
+        # the fields register their vocabulary, keep it out of the registry once its source is deleted
+        pending = mock.patch.object(registry, "_pending", [])
+        pending.start()
+        self.addCleanup(pending.stop)
+
+        class Rocks(LocalVocabulary):
+            class Meta:
+                source = str(self.source)
+                prefix = "rocks"
+                namespace = "http://example.com/rocks/"
+                lazy = True
+
+        self.vocabulary = Rocks
+
+    def field(self):
+        for attr in ["_graph", "tables", "index"]:
+            setattr(self.vocabulary, attr, None)
+        return ConceptField(vocabulary=self.vocabulary)
+
+    def test_cached(self):
+        self.assertEqual(self.field().max_length, len("granite"))
+        field = self.field()
+        self.assertEqual(field.max_length, len("granite"))
+        self.assertFalse(field.scheme.is_loaded)
+        self.assertIsNone(self.vocabulary.index)
+
+    def test_source_change(self):
+        self.assertEqual(self.field().max_length, len("granite"))
+        with self.source.open("a") as f:
+            f.write(CONCEPT.format(name="granodiorite"))
+        self.assertEqual(self.field().max_length, len("granodiorite"))
+
+    def test_include_only(self):
+        with self.source.open("a") as f:
+            f.write(CONCEPT.format(name="granodiorite"))
+        self.assertEqual(self.field().max_length, len("granodiorite"))
+        self.vocabulary.index = None
+        field = ConceptField(vocabulary=self.vocabulary, include_only=["granite"])
+        self.assertEqual(field.max_length, len("granite"))
+
+
+ROCKS = {"granite", "basalt", "igneous_rock", "generic_sandstone"}
+
+
+class ConceptLookupTest(TestCase):
+    def setUp(self):
+        for name in ROCKS:
+            TestModel.objects.create(name=name, concept_label=name)
+
+    def names(self, **lookup):
+        return set(TestModel.objects.filter(**lookup).values_list("name", flat=True))
+
+    def test_descendant_of(self):
+        self.assertEqual(self.names(concept_label__descendant_of="igneous_rock"), {"granite", "basalt"})
+        vocabulary = SimpleLithology()
+        self.assertEqual(self.names(concept_label__descendant_of=vocabulary.get_concept("lith:rock")), ROCKS)
+        self.assertEqual(self.names(concept_label__descendant_of="granite"), set())
+
+    def test_ancestor_of(self):
+        self.assertEqual(self.names(concept_label__ancestor_of="granite"), {"igneous_rock"})
+        self.assertEqual(TestModel.objects.exclude(concept_label__ancestor_of="granite").count(), 3)
+
+    def test_large_sets_use_single_parameter(self):
+        queryset = TestModel.objects.filter(concept_label__descendant_of="compound_material")
+        _, params = queryset.query.sql_with_params()
+        self.assertGreater(len(SimpleLithology().descendants("compound_material")), ConceptSetLookup.bulk_threshold)
+        self.assertEqual(len(params), 1)
+        self.assertEqual(set(queryset.values_list("name", flat=True)), ROCKS)
+
+    def test_within_collection(self):
+        lookup = WithinCollection(Value("", output_field=ConceptField(vocabulary=ISC2020)), "isc:test")
+        self.assertEqual(lookup.get_values(), ["Aeronian", "Albian"])
+
+    def test_unknown_concept(self):
+        with self.assertRaises(ValueError):
+            list(TestModel.objects.filter(concept_label__descendant_of="nonexistant"))
@@ -0,0 +1,149 @@
+from django.test import TestCase, override_settings
+from django.utils import translation
+from rdflib import URIRef
+
+from example.vocabularies import ISC2020, SimpleLithology
+from research_vocabs.index import (
+    KIND_COLLECTION,
+    KIND_CONCEPT,
+    KIND_SCHEME,
+    Hierarchy,
+    VocabularyIndex,
+    language_chain,
+)
+
+GRANITE = "http://resource.geosciml.org/classifier/cgi/lithology/granite"
+
+
+class TestVocabularyIndex(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        self.index = self.vocabulary.index
+
+    def test_index_is_built(self):
+        self.assertIsInstance(self.index, VocabularyIndex)
+        self.assertEqual(len(self.index), len(self.vocabulary.choices))
+
+    def test_get(self):
+        for key in ["granite", "lith:granite", GRANITE, URIRef(GRANITE)]:
+            record = self.index.get(key)
+            self.assertEqual(record.name, "granite")
+            self.assertEqual(record.uri, URIRef(GRANITE))
+            self.assertEqual(self.index.kind(record.entry), KIND_CONCEPT)
+        self.assertIsNone(self.index.get("nonexistant"))
+
+    def test_concepts_come_first(self):
+        self.assertEqual(list(self.index.concepts), list(range(len(self.index))))
+        self.assertEqual(self.index.kind(self.index.scheme), KIND_SCHEME)
+
+    def test_choices_are_ordered(self):
+        labels = [label for _, label in self.index.choices()]
+        self.assertEqual(labels, sorted(labels))
+
+    def test_label(self):
+        entry = self.index.find("granite")
+        self.assertEqual(self.index.label(entry, "es"), "granito")
+        self.assertEqual(self.index.label(entry, "en"), "granite")
+        self.assertEqual(self.index.label(self.index.find("lith:granite"), "es"), "granito")
+
+    def test_concept_uses_index(self):
+        concept = self.vocabulary.get_concept("lith:granite")
+        self.assertEqual(concept.entry, self.index.find(GRANITE))
+        self.assertEqual(concept.URI, URIRef(GRANITE))
+
+    def test_collection_members(self):
+        index = ISC2020().index
+        entry = index.find("isc:test")
+        self.assertEqual(index.kind(entry), KIND_COLLECTION)
+        self.assertCountEqual([index.name(m) for m in index.members(entry)], ["Aeronian", "Albian"])
+
+
+class TestLabels(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        self.index = self.vocabulary.index
+        self.granite = self.index.find("granite")
+
+    def test_language_chain(self):
+        self.assertEqual(language_chain("es-MX"), ("es-mx", "es", "en", None))
+        self.assertEqual(language_chain(None), ("en", None))
+        with override_settings(VOCABULARY_LABEL_FALLBACK=["es", "en"]):
+            self.assertEqual(language_chain("pt"), ("pt", "es", "en", None))
+            self.assertEqual(self.index.label(self.granite, "pt"), "granito")
+
+    def test_label_fallback(self):
+        self.assertEqual(self.index.label(self.granite, "es-mx"), "granito")
+        self.assertEqual(self.index.label(self.granite, "pt"), "granite")
+        with override_settings(VOCABULARY_LABEL_FALLBACK=[]):
+            # any label is better than none
+            self.assertIn(self.index.label(self.granite, "pt"), self.index.labels(self.granite).values())
+
+    def test_choices_per_language(self):
+        spanish = self.index.choices("es", sort=True)
+        self.assertIs(self.index.choices("es", sort=True), spanish)
+        self.assertIn(("granite", "granito"), spanish)
+        self.assertEqual([label for _, label in spanish], sorted(label for _, label in spanish))
+
+    def test_choices_follow_active_language(self):
+        with translation.override("es"):
+            self.assertIn(("granite", "granito"), self.vocabulary.choices)
+        with translation.override("en"):
+            self.assertIn(("granite", "granite"), self.vocabulary.choices)
+
+
+class StubIndex:
+    """Just enough of an index to build a hierarchy from a dict of ``{concept: [broader concepts]}``."""
+
+    def __init__(self, broader):
+        self.concepts = tuple(range(len(broader)))
+        self._broader = [tuple(parents) for parents in broader.values()]
+
+    def broader(self, entry):
+        return self._broader[entry]
+
+    def narrower(self, entry):
+        return ()
+
+
+class TestHierarchy(TestCase):
+    def test_polyhierarchy(self):
+        # 0 -> 1 -> 3, 0 -> 2 -> 3 -> 4
+        hierarchy = Hierarchy(StubIndex({0: [], 1: [0], 2: [0], 3: [1, 2], 4: [3]}))
+        self.assertEqual(hierarchy.roots, (0,))
+        self.assertEqual(hierarchy.ancestors[4], {0, 1, 2, 3})
+        self.assertEqual(hierarchy.descendants[0], {1, 2, 3, 4})
+        self.assertEqual(hierarchy.descendants[1], {3, 4})
+        self.assertEqual(hierarchy.depths, {0: 0, 1: 1, 2: 1, 3: 2, 4: 3})
+        self.assertTrue(hierarchy.is_descendant_of(4, 2))
+        self.assertFalse(hierarchy.is_descendant_of(2, 1))
+
+    def test_cycles(self):
+        # 0 -> 1 <-> 2 -> 3, and a detached cycle 4 <-> 5
+        hierarchy = Hierarchy(StubIndex({0: [], 1: [0, 2], 2: [1], 3: [2], 4: [5], 5: [4]}))
+        self.assertEqual(hierarchy.ancestors[1], {0, 2})
+        self.assertEqual(hierarchy.ancestors[2], {0, 1})
+        self.assertEqual(hierarchy.ancestors[3], {0, 1, 2})
+        self.assertNotIn(1, hierarchy.ancestors[1])
+        self.assertEqual(hierarchy.roots, (0, 4))
+        self.assertEqual(hierarchy.depths[5], 1)
+        self.assertEqual(hierarchy.path_to_root(5), [4, 5])
+
+    def test_vocabulary_api(self):
+        vocabulary = SimpleLithology()
+        granite = vocabulary.get_concept("granite")
+        ancestors = vocabulary.ancestors(granite)
+        self.assertIn(vocabulary.get_concept("igneous_rock"), ancestors)
+        self.assertIn(granite, vocabulary.descendants("lith:igneous_rock"))
+        self.assertTrue(vocabulary.is_descendant_of("granite", "igneous_rock"))
+        self.assertFalse(vocabulary.is_descendant_of("igneous_rock", "granite"))
+        self.assertEqual(vocabulary.depth("granite"), len(vocabulary.index.hierarchy.path_to_root(granite.entry)) - 1)
+        self.assertEqual(vocabulary.depth(vocabulary.index.name(vocabulary.index.hierarchy.roots[0])), 0)
+        with self.assertRaises(ValueError):
+            vocabulary.ancestors("nonexistant")
+
+    def test_built_once(self):
+        vocabulary = ISC2020()
+        self.assertIs(vocabulary.index.hierarchy, ISC2020().index.hierarchy)
+        self.assertEqual(
+            [c.name for c in vocabulary.ancestors("Albian")], ["Cretaceous", "LowerCretaceous", "Mesozoic", "Phanerozoic"]
+        )
@@ -0,0 +1,81 @@
+from functools import partial
+
+from django.test import TestCase, override_settings
+
+from example.vocabularies import ISC2020, SimpleLithology
+from research_vocabs import RemoteVocabulary
+from research_vocabs.mapped import MappedIndex
+
+from .helpers import VOCAB_DATA, SnapshotDirMixin, variant
+
+shared = partial(variant, shared_index=True)
+"""Returns a fresh copy of an example vocabulary that is served from the memory-mapped index."""
+
+
+class TestMappedIndex(SnapshotDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # the first instance builds the graph and writes the index file
+        self.built = shared(SimpleLithology)()
+        self.vocabulary = shared(SimpleLithology)()
+
+    def test_index_is_mapped(self):
+        self.assertIsInstance(self.built.index, MappedIndex)
+        self.assertIsInstance(self.vocabulary.index, MappedIndex)
+        self.assertIsNotNone(self.built._graph)
+
+    def test_graph_not_built(self):
+        self.assertTrue(self.vocabulary.choices)
+        self.vocabulary.get_concept("granite").label("es")
+        str(self.vocabulary)
+        self.assertIsNone(self.vocabulary._graph)
+
+    def test_choices(self):
+        self.assertEqual(self.vocabulary.choices, SimpleLithology().choices)
+
+    def test_get_concept(self):
+        for key in ["granite", "lith:granite", "http://resource.geosciml.org/classifier/cgi/lithology/granite"]:
+            concept = self.vocabulary.get_concept(key)
+            self.assertEqual(concept.name, "granite")
+            self.assertEqual(concept.label("es"), "granito")
+
+        with self.assertRaises(ValueError):
+            self.vocabulary.get_concept("nonexistant")
+
+    def test_hierarchy(self):
+        index = self.vocabulary.index
+        granite = index.find("granite")
+        self.assertIn("granitoid", [index.name(i) for i in index.broader(granite)])
+        self.assertIn(granite, index.narrower(index.find("granitoid")))
+
+    def test_attrs_build_graph(self):
+        concept = self.vocabulary.get_concept("granite")
+        self.assertTrue(concept.attrs)
+        self.assertIsNotNone(self.vocabulary._graph)
+
+    def test_from_collection(self):
+        vocabulary = shared(ISC2020, from_collection="isc:test")()
+        self.assertCountEqual([value for value, _ in vocabulary.choices], ["Aeronian", "Albian"])
+
+    def test_hierarchy_api(self):
+        self.assertTrue(self.vocabulary.is_descendant_of("granite", "igneous_rock"))
+        self.assertEqual(
+            [c.name for c in self.vocabulary.ancestors("granite")],
+            [c.name for c in SimpleLithology().ancestors("granite")],
+        )
+        self.assertIsNone(self.vocabulary._graph)
+
+
+class TestRemoteVocabulary(TestCase):
+    @override_settings(VOCABULARY_SHARED_INDEX=True)
+    def test_shared_index_ignored(self):
+        class Remote(RemoteVocabulary):
+            class Meta:
+                source = (VOCAB_DATA / "status.rdf").as_uri()
+                prefix = "odm2"
+                namespace = "http://vocabulary.odm2.org/status/"
+
+        vocabulary = Remote()
+        self.assertFalse(Remote.uses_shared_index())
+        self.assertNotIsInstance(vocabulary.index, MappedIndex)
+        self.assertEqual(vocabulary.get_concept("ongoing").label(), "Ongoing")
@@ -7,11 +7,18 @@ test_django-research-vocabs
 Tests for `django-research-vocabs` models module.
 """
 
+from unittest import mock
+
+from django import forms
+from django.db import connection
 from django.test import TestCase
-from example.models import Lithology, TestModel
-from example.vocabularies import SimpleLithology
+from django.test.utils import CaptureQueriesContext
 
-from research_vocabs.models import Concept
+from example.models import Lithology, TestModel
+from example.vocabularies import ISC2020, SimpleLithology
+from research_vocabs.forms import MultiConceptField, TaggableConceptFormMixin
+from research_vocabs.models import Concept, Vocabulary
+from research_vocabs.sync import PKCache, concept_pks, sync_vocabulary
 
 
 class ConceptModelTest(TestCase):
@@ -101,3 +108,102 @@ class LithologyModelTest(TestCase):
         self.assertEqual(Lithology.objects.count(), len(self.scheme.choices))
         for obj in Lithology.objects.all():
             self.assertIn(obj.name, self.scheme.values)
+
+
+class TaggableForm(TaggableConceptFormMixin, forms.ModelForm):
+    lithology = MultiConceptField(vocabulary=SimpleLithology, required=False)
+    period = MultiConceptField(vocabulary=ISC2020, required=False)
+
+    class Meta:
+        model = TestModel
+        fields = ["name", "lithology", "period"]
+        taggable_field_name = "taggable_concepts"
+        taggable_fields = ["lithology", "period"]
+
+
+class GetOrCreateManyTest(TestCase):
+    def setUp(self):
+        concept_pks.clear()
+        self.concepts = SimpleLithology().concepts()[:20] + ISC2020().concepts()[:5]
+
+    def test_rows_are_created_in_bulk(self):
+        with self.assertNumQueries(4):
+            # concepts select, vocabularies select and insert, concepts insert
+            pks = Concept.objects.get_or_create_many(self.concepts)
+        self.assertEqual(set(pks), {str(c.URI) for c in self.concepts})
+        self.assertEqual(Concept.objects.count(), len(self.concepts))
+        granite = Concept.objects.get(pk=pks[str(self.concepts[0].URI)])
+        self.assertEqual((granite.name, granite.vocabulary.name), (self.concepts[0].name, "simplelithology"))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(Concept.objects.get_or_create_many(self.concepts), pks)
+
+    def test_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pks = Concept.objects.get_or_create_many(self.concepts)
+        self.assertEqual(len(concept_pks), len(self.concepts))
+        with self.assertNumQueries(0):
+            self.assertEqual(Concept.objects.get_or_create_many(self.concepts), pks)
+
+        sync_vocabulary(ISC2020(), force=True)
+        self.assertEqual(len(concept_pks), 0)
+
+    def test_other_processes_invalidate_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pks = Concept.objects.get_or_create_many(self.concepts)
+        # a synchronization in another process, e.g. the sync_vocabularies command
+        with self.captureOnCommitCallbacks(execute=True):
+            PKCache().invalidate()
+        with self.assertNumQueries(1):
+            self.assertEqual(Concept.objects.get_or_create_many(self.concepts), pks)
+        self.assertEqual(len(concept_pks), 0)
+
+    def test_keys_are_not_returned_by_bulk_insert(self):
+        # databases such as MySQL do not return the keys of inserted rows
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False):
+            pks = Concept.objects.get_or_create_many(self.concepts)
+        self.assertEqual(pks, dict(Concept.objects.values_list("uri", "pk")))
+        self.assertEqual(Concept.objects.get(uri=str(self.concepts[-1].URI)).vocabulary.name, "gts2020")
+
+    def test_vocabulary_inserted_concurrently(self):
+        other = Vocabulary.objects.create(name="gts2020", label="ISC2020", uri="http://example.com/gts2020")
+        # another request inserted the row after this one looked for it
+        found = [Vocabulary.objects.none(), Vocabulary.objects.filter(name__in=["gts2020"])]
+        with mock.patch.object(Vocabulary.objects, "filter", side_effect=found):
+            rows = Concept.build_rows(ISC2020().concepts()[:5])
+        self.assertEqual({row.vocabulary.pk for row in rows}, {other.pk})
+
+    def test_deleted_rows_leave_the_cache(self):
+        concepts = SimpleLithology().concepts()[:5]
+        with self.captureOnCommitCallbacks(execute=True):
+            pks = Lithology.objects.get_or_create_many(concepts)
+        self.assertEqual(Lithology.objects.count(), len(concepts))
+        Lithology.objects.get(pk=pks[str(concepts[0].URI)]).delete()
+        self.assertEqual(len(concept_pks), len(concepts) - 1)
+
+    def test_bulk_delete_bumps_once(self):
+        concepts = SimpleLithology().concepts()[:5]
+        Lithology.objects.get_or_create_many(concepts)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Lithology.objects.all().delete()
+            concept_pks.invalidate()
+        self.assertEqual(len(concept_pks), 0)
+        self.assertEqual(callbacks, [concept_pks.bump])
+
+    def test_form_save_is_constant(self):
+        lithology = [c.name for c in SimpleLithology().concepts()[:20]]
+        periods = [c.name for c in ISC2020().concepts()[:5]]
+
+        def save(data):
+            form = TaggableForm(data={"name": "test", **data})
+            self.assertTrue(form.is_valid(), form.errors)
+            with CaptureQueriesContext(connection) as queries:
+                instance = form.save()
+            return instance, len(queries)
+
+        # the first save also inserts the Vocabulary rows
+        save({"lithology": lithology[:1], "period": periods[:1]})
+        _, few = save({"lithology": lithology[1:2], "period": periods[1:2]})
+        instance, many = save({"lithology": lithology[2:], "period": periods[2:]})
+        self.assertEqual(few, many)
+        self.assertEqual(instance.taggable_concepts.count(), len(lithology) + len(periods) - 4)
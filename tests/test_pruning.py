@@ -0,0 +1,74 @@
+from functools import partial
+
+from django.test import TestCase
+from rdflib import Literal, URIRef
+from rdflib.namespace import DCTERMS, SKOS
+
+from example.vocabularies import SimpleLithology
+from research_vocabs.pruning import PrunedGraph, TripleFilter
+from research_vocabs.snapshot import load_snapshot, snapshot_path
+
+from .helpers import SnapshotDirMixin, variant
+
+GRANITE = URIRef("http://resource.geosciml.org/classifier/cgi/lithology/granite")
+
+
+pruned = partial(variant, SimpleLithology)
+"""Returns a fresh copy of the SimpleLithology vocabulary with pruning options."""
+
+
+class TestTripleFilter(TestCase):
+    def test_languages(self):
+        accepts = TripleFilter(languages=["en", "ES"])
+        self.assertTrue(accepts((GRANITE, SKOS.prefLabel, Literal("granite", lang="en-GB"))))
+        self.assertTrue(accepts((GRANITE, SKOS.prefLabel, Literal("granito", lang="es"))))
+        self.assertTrue(accepts((GRANITE, SKOS.notation, Literal("1"))))
+        self.assertFalse(accepts((GRANITE, SKOS.prefLabel, Literal("Granit", lang="de"))))
+        self.assertFalse(accepts((GRANITE, SKOS.prefLabel, Literal("x", lang="eng"))))
+
+    def test_predicates(self):
+        accepts = TripleFilter(predicates=[SKOS.definition])
+        self.assertTrue(accepts((GRANITE, SKOS.definition, Literal("rock"))))
+        self.assertTrue(accepts((GRANITE, SKOS.broader, GRANITE)))
+        self.assertFalse(accepts((GRANITE, SKOS.exactMatch, GRANITE)))
+
+    def test_graph_counts_pruned_triples(self):
+        graph = PrunedGraph(TripleFilter(predicates=[]))
+        graph.add((GRANITE, SKOS.exactMatch, GRANITE))
+        graph.add((GRANITE, SKOS.broader, GRANITE))
+        self.assertEqual((len(graph), graph.pruned), (1, 1))
+
+
+class TestPrunedVocabulary(SnapshotDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.reference = SimpleLithology()
+        self.options = {"keep_predicates": ["skos:definition"], "languages": ["en", "es"]}
+        self.vocabulary = pruned(**self.options)()
+
+    def test_triples_are_dropped(self):
+        graph = self.vocabulary.graph
+        self.assertLess(len(graph), len(self.reference.graph))
+        self.assertFalse(list(graph.triples((None, SKOS.exactMatch, None))))
+        self.assertFalse(list(graph.triples((None, DCTERMS.provenance, None))))
+        self.assertTrue(list(graph.triples((GRANITE, SKOS.definition, None))))
+        languages = {o.language for o in graph.objects() if isinstance(o, Literal) and o.language}
+        self.assertEqual(languages, {"en", "es"})
+
+    def test_choices(self):
+        self.assertEqual(self.vocabulary.get_choices("en"), self.reference.get_choices("en"))
+        self.assertEqual(self.vocabulary.get_choices("es"), self.reference.get_choices("es"))
+        self.assertEqual(self.vocabulary.get_concept("granite").label("de"), "granite")
+
+    def test_keep_every_predicate(self):
+        graph = pruned(languages=["en"])().graph
+        self.assertTrue(list(graph.triples((None, SKOS.exactMatch, None))))
+
+    def test_snapshots_are_kept_apart(self):
+        source = self.vocabulary.get_source_path()
+        self.assertIsNotNone(load_snapshot(source, self.vocabulary.parse_options()))
+        self.assertNotEqual(snapshot_path(source), snapshot_path(source, self.vocabulary.parse_options()))
+        # a vocabulary without pruning parses the full source instead of reading the pruned snapshot
+        self.assertEqual(len(pruned()().graph), len(self.reference.graph))
+        # the pruned snapshot is read back as an ordinary graph
+        self.assertEqual(len(pruned(**self.options)().graph), len(self.vocabulary.graph))
@@ -0,0 +1,197 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from example.vocabularies import ISC2020, SimpleLithology
+from research_vocabs import fields, forms
+from research_vocabs.search import FuzzyIndex, SearchIndex, edit_distance, fold
+
+
+class TestFold(TestCase):
+    def test_fold(self):
+        self.assertEqual(fold("Pórfido-Granítico"), "porfido granitico")
+        self.assertEqual(fold("  Straße_ "), "strasse")
+        self.assertEqual(fold("斜长角闪岩"), "斜长角闪岩")
+
+
+class TestSearchIndex(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+
+    def names(self, q, lang="en", limit=10):
+        return [c.name for c in self.vocabulary.search(q, lang, limit)]
+
+    def test_prefix(self):
+        names = self.names("gran")
+        self.assertEqual(names[0], "granite")
+        self.assertIn("granodiorite", names)
+        self.assertTrue(all("gran" in n for n in names))
+
+    def test_exact_match_first(self):
+        self.assertEqual(self.names("granite")[0], "granite")
+        self.assertEqual(self.names("granito", "es")[0], "granite")
+
+    def test_pref_label_before_alt_label(self):
+        index = self.vocabulary.get_search_index()
+        matches = index.search("felsfar", "en")
+        self.assertTrue(matches)
+        self.assertEqual({m.field for m in matches}, {"altLabel"})
+        self.assertEqual(index.search("granite", "en")[0].field, "prefLabel")
+
+    def test_case_and_accents(self):
+        self.assertEqual(self.names("GRÂNITE")[0], "granite")
+
+    def test_any_word_and_language(self):
+        self.assertIn("alkali_feldspar_granite", self.names("feldspar"))
+        self.assertIn("amphibolite", self.names("斜长角闪岩"))
+
+    def test_name_and_notation(self):
+        self.assertIn("alkali_feldspar_granite", self.names("alkali_feldspar_gr"))
+        isc = ISC2020()
+        notation = isc.tables.notations[str(isc.get_concept("Cretaceous").URI)][0]
+        self.assertEqual(isc.search(notation, "en")[0].name, "Cretaceous")
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(len(self.names("a", limit=3)), 3)
+        self.assertEqual(self.names(""), [])
+        self.assertEqual(self.names(" - "), [])
+        self.assertEqual(self.names("nonexistant"), [])
+
+    def test_restricted_choices(self):
+        vocabulary = SimpleLithology(include_only=["granite", "granodiorite"])
+        self.assertEqual([c.name for c in vocabulary.search("gran")], ["granite", "granodiorite"])
+
+    def test_built_once(self):
+        index = self.vocabulary.get_search_index()
+        self.assertIsInstance(index, SearchIndex)
+        self.assertIs(SimpleLithology().get_search_index(), index)
+
+
+class TestVocabularySearchView(TestCase):
+    def setUp(self):
+        self.url = reverse("vocabularies:search", kwargs={"vocabulary": SimpleLithology().scheme().name})
+
+    def test_search(self):
+        response = self.client.get(self.url, {"q": "granito", "limit": 2}, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["name"], "granite")
+        self.assertEqual(results[0]["label"], "granite")
+        self.assertEqual(results[0]["matched"], "granito")
+        self.assertEqual(
+            results[0]["href"],
+            reverse("vocabularies:term", kwargs={"vocabulary": "simplelithology", "term": "granite"}),
+        )
+
+    def test_invalid_limit(self):
+        response = self.client.get(self.url, {"q": "a", "limit": "many"})
+        self.assertEqual(len(response.json()), 10)
+
+    def test_unknown_vocabulary(self):
+        response = self.client.get(reverse("vocabularies:search", kwargs={"vocabulary": "nonexistant"}), {"q": "a"})
+        self.assertEqual(response.status_code, 404)
+
+
+class TestFuzzyIndex(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("albain", "albian", 2), 1)
+        self.assertEqual(edit_distance("sandstne", "sandstone", 2), 1)
+        self.assertEqual(edit_distance("granite", "granite", 2), 0)
+        self.assertEqual(edit_distance("granite", "basalt", 2), 3)
+
+    def test_candidates_are_complete(self):
+        # the trigram filter never drops a text that is within the distance
+        index = self.vocabulary.get_fuzzy_index()
+        for term in ["grnaite", "sandstne", "mudstone", "foid bearing syenit"]:
+            expected = {i for i, text in enumerate(index.texts) if edit_distance(term, text, 2) <= 2}
+            self.assertLessEqual(expected, set(index.candidates(term, 2)))
+
+    def test_suggest(self):
+        self.assertEqual([c.name for c in self.vocabulary.suggest("grnaite")], ["granite"])
+        self.assertEqual(self.vocabulary.suggest("Granito")[0].name, "granite")
+        self.assertEqual([c.name for c in ISC2020().suggest("Albain")], ["Albian"])
+        self.assertEqual(self.vocabulary.suggest("xyzzy"), [])
+        self.assertEqual(self.vocabulary.suggest("granite"), [self.vocabulary.get_concept("granite")])
+
+    def test_suggest_collection(self):
+        # a collection is in the index but is not a choice, it is never suggested for itself
+        vocabulary = ISC2020()
+        self.assertNotIn("test", [c.name for c in vocabulary.suggest("test")])
+        self.assertNotIn("'test'", vocabulary.did_you_mean("isc:test"))
+        field = fields.ConceptField(vocabulary=ISC2020)
+        with self.assertRaises(ValidationError) as error:
+            field.clean("isc:test", None)
+        self.assertNotIn("Did you mean 'test'", str(error.exception))
+
+    def test_suggest_restricted_choices(self):
+        vocabulary = SimpleLithology(include_only=["granodiorite"])
+        self.assertEqual(vocabulary.suggest("granite"), [])
+        self.assertEqual([c.name for c in vocabulary.suggest("granodoirite")], ["granodiorite"])
+
+    def test_suggest_many(self):
+        suggestions = self.vocabulary.suggest_many(["grnaite", "xyzzy", "grnaite", "basalt"])
+        self.assertEqual(list(suggestions), ["grnaite", "xyzzy", "basalt"])
+        self.assertEqual(suggestions["xyzzy"], [])
+        self.assertEqual(suggestions["basalt"][0].name, "basalt")
+
+    def test_built_once(self):
+        index = self.vocabulary.get_fuzzy_index()
+        self.assertIsInstance(index, FuzzyIndex)
+        self.assertIs(SimpleLithology().get_fuzzy_index(), index)
+
+    def test_model_field_did_you_mean(self):
+        field = fields.ConceptField(vocabulary=SimpleLithology)
+        with self.assertRaisesMessage(ValidationError, "Did you mean 'granite'?"):
+            field.clean("grnaite", None)
+        field = fields.ConceptField(vocabulary=SimpleLithology, include_only=["granodiorite"])
+        with self.assertRaisesMessage(ValidationError, "Did you mean 'granodiorite'?"):
+            field.clean("granodiorit", None)
+
+    def test_form_field_did_you_mean(self):
+        field = forms.ConceptField(vocabulary=SimpleLithology)
+        with self.assertRaisesMessage(ValidationError, "Did you mean 'granite'?"):
+            field.clean("grnaite")
+        field = forms.MultiConceptField(vocabulary=SimpleLithology)
+        with self.assertRaisesMessage(ValidationError, "Did you mean 'basalt'?"):
+            field.clean(["granite", "basalr"])
+
+
+class TestResolveMany(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        self.granite = self.vocabulary.get_concept("granite")
+
+    def test_identifiers_and_labels(self):
+        values = ["granite", "lith:granite", str(self.granite.URI), self.granite, "Granito", "  GRANITE "]
+        result = self.vocabulary.resolve_many(values)
+        self.assertEqual(result.concepts, [self.granite] * len(values))
+        self.assertEqual(result.unresolved, {})
+        self.assertEqual(result.ambiguous, {})
+
+    def test_alt_label(self):
+        result = self.vocabulary.resolve_many(["Granit Felsfar Basa"])
+        self.assertEqual([c.name for c in result.concepts], ["alkali_feldspar_granite"])
+
+    def test_aligned_report(self):
+        result = self.vocabulary.resolve_many(iter(["nope", None, "granite", "", "nope"]))
+        self.assertEqual(result.concepts, [None, None, self.granite, None, None])
+        self.assertEqual(result.unresolved, {"nope": [0, 4]})
+
+    def test_ambiguous_label(self):
+        entries = self.vocabulary.get_label_index().get("marl")
+        self.assertGreater(len(entries), 1)
+        result = self.vocabulary.resolve_many(["marl"])
+        self.assertEqual(result.concepts, [None])
+        self.assertEqual(result.unresolved, {"marl": [0]})
+        self.assertEqual(len(result.ambiguous["marl"]), len(entries))
+
+    def test_restricted_choices(self):
+        marl = self.vocabulary.get_label_index().get("marl")[0]
+        vocabulary = SimpleLithology(include_only=["granite", self.vocabulary.index.name(marl)])
+        result = vocabulary.resolve_many(["marl", "basalt", "granite"])
+        self.assertEqual(result.concepts[0].entry, marl)
+        self.assertEqual(result.unresolved, {"basalt": [1]})
@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from research_vocabs import LocalVocabulary
+from research_vocabs.builder.skos import Collection
+from research_vocabs.index import KIND_COLLECTION, ConceptTables
+from research_vocabs.snapshot import load_snapshot, snapshot_path
+
+VOCAB_DATA = Path(__file__).resolve().parent.parent / "example" / "vocab_data"
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.source = self.tmp / "status.rdf"
+        shutil.copy(VOCAB_DATA / "status.rdf", self.source)
+        settings = override_settings(VOCABULARY_SNAPSHOT_DIR=self.tmp / "snapshots")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def vocabulary(self):
+        class Status(LocalVocabulary):
+            class Meta:
+                source = str(self.source)
+                prefix = "odm2"
+                namespace = "http://vocabulary.odm2.org/status/"
+
+        return Status()
+
+    def test_snapshot_written_on_first_parse(self):
+        self.assertFalse(snapshot_path(self.source).exists())
+        self.vocabulary()
+        self.assertTrue(snapshot_path(self.source).exists())
+
+    def test_snapshot_loaded(self):
+        parsed = self.vocabulary()
+        snapshot = load_snapshot(self.source)
+        self.assertIsNotNone(snapshot)
+        self.assertIsInstance(snapshot.tables, ConceptTables)
+        self.assertEqual(len(snapshot.graph), len(parsed.graph))
+        self.assertEqual(self.vocabulary().choices, parsed.choices)
+
+    def test_snapshot_invalidated_by_content_change(self):
+        self.vocabulary()
+        with open(self.source, "a") as f:
+            f.write("\n")
+        self.assertIsNone(load_snapshot(self.source))
+
+    def test_snapshot_survives_touch(self):
+        self.vocabulary()
+        self.source.touch()
+        self.assertIsNotNone(load_snapshot(self.source))
+
+    @override_settings(VOCABULARY_SNAPSHOTS=False)
+    def test_snapshots_disabled(self):
+        self.vocabulary()
+        self.assertFalse(snapshot_path(self.source).exists())
+
+    def collection_vocabulary(self):
+        class Status(LocalVocabulary):
+            class Meta:
+                source = str(self.source)
+                prefix = "odm2"
+                namespace = "http://vocabulary.odm2.org/status/"
+                collections = {"active": Collection(prefLabel="Active", members=["ongoing", "planned"])}
+
+        return Status()
+
+    def test_collections_in_snapshot(self):
+        def describe(vocabulary):
+            entry = vocabulary.index.find("active")
+            return vocabulary.index.kind(entry), vocabulary.index.label(entry), vocabulary.tables.types.get(
+                "http://vocabulary.odm2.org/status/active"
+            )
+
+        with override_settings(VOCABULARY_SNAPSHOTS=False):
+            parsed = describe(self.collection_vocabulary())
+        self.assertEqual(parsed[:2], (KIND_COLLECTION, "Active"))
+        # the first load compiles the snapshot, the second one is loaded from it
+        self.assertEqual(describe(self.collection_vocabulary()), parsed)
+        self.assertEqual(describe(self.collection_vocabulary()), parsed)
+
+    def test_curie_members_hit_snapshot(self):
+        def vocabulary():
+            class Status(LocalVocabulary):
+                class Meta:
+                    source = str(self.source)
+                    prefix = "odm2"
+                    namespace = "http://vocabulary.odm2.org/status/"
+                    collections = {"active": Collection(members=["odm2:planned", "odm2:ongoing"])}
+
+            return Status()
+
+        vocabulary()
+        parse_source = LocalVocabulary.parse_source
+        with mock.patch.object(LocalVocabulary, "parse_source", autospec=True, side_effect=parse_source) as parse:
+            reloaded = vocabulary()
+        parse.assert_not_called()
+        index = reloaded.index
+        self.assertEqual([index.name(e) for e in index.members(index.find("active"))], ["ongoing", "planned"])
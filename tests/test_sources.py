@@ -0,0 +1,108 @@
+import bz2
+import gzip
+import io
+import lzma
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rdflib import Graph, Literal
+from rdflib.namespace import SKOS
+
+from example.vocabularies import SimpleLithology
+from research_vocabs.snapshot import snapshot_path
+from research_vocabs.sources import parse_part
+
+from .helpers import VOCAB_DATA, SnapshotDirMixin, variant
+
+
+def lithology(source, **options):
+    """Returns a fresh copy of SimpleLithology that is parsed from the given source."""
+    return variant(SimpleLithology, source=source, **options)
+
+
+class TestSources(SnapshotDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.reference = SimpleLithology()
+
+        # split the vocabulary into its core and its spanish labels
+        graph = Graph().parse(VOCAB_DATA / "simple_lithology.ttl")
+        core, spanish = Graph(), Graph()
+        for s, p, o in graph:
+            is_spanish = p == SKOS.prefLabel and isinstance(o, Literal) and o.language == "es"
+            (spanish if is_spanish else core).add((s, p, o))
+        self.parts = [self.tmp / "core.nt.gz", self.tmp / "es.nt"]
+        with gzip.open(self.parts[0], "wb") as f:
+            core.serialize(f, format="nt")
+        spanish.serialize(self.parts[1], format="nt")
+
+    def assertMatchesReference(self, vocabulary):
+        self.assertEqual(vocabulary.choices, self.reference.choices)
+        self.assertEqual(vocabulary.get_choices("es"), self.reference.get_choices("es"))
+
+    def test_compressed(self):
+        data = (VOCAB_DATA / "simple_lithology.ttl").read_bytes()
+        for suffix, compress in [(".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)]:
+            with self.subTest(suffix):
+                source = self.tmp / f"simple_lithology.ttl{suffix}"
+                source.write_bytes(compress(data))
+                self.assertMatchesReference(lithology(str(source))())
+                self.assertMatchesReference(lithology(str(source), streaming=True)())
+
+    def test_remote_compressed(self):
+        response = io.BytesIO(gzip.compress((VOCAB_DATA / "simple_lithology.ttl").read_bytes()))
+        with mock.patch("research_vocabs.sources.urlopen", return_value=response):
+            part = parse_part({"source": "https://example.com/simple_lithology.ttl.gz"})
+        self.assertEqual(part.triples, len(Graph().parse(VOCAB_DATA / "simple_lithology.ttl")))
+        self.assertTrue(response.closed)
+
+    def test_parts(self):
+        vocabulary = lithology([str(p) for p in self.parts])()
+        self.assertMatchesReference(vocabulary)
+        self.assertEqual(len(vocabulary.graph), len(self.reference.graph))
+
+    def test_streamed_parts(self):
+        self.assertMatchesReference(lithology([str(p) for p in self.parts], streaming=True)())
+
+    def test_pruned_parts(self):
+        vocabulary = lithology([str(p) for p in self.parts], languages=["en"])()
+        self.assertEqual(vocabulary.get_choices("es"), vocabulary.choices)
+
+    def test_load_time_per_part(self):
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming), self.assertLogs("research_vocabs.sources", "INFO") as logs:
+                lithology([str(p) for p in self.parts], streaming=streaming)()
+            loaded = [line for line in logs.output if "Loaded" in line]
+            self.assertEqual(len(loaded), 2)
+            for line, part in zip(loaded, self.parts, strict=True):
+                self.assertIn(f"Loaded {part}: ", line)
+
+    def test_sequential(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers), override_settings(VOCABULARY_PARSE_WORKERS=workers):
+                self.assertMatchesReference(lithology([str(p) for p in self.parts], streaming=True)())
+
+    def test_pool(self):
+        sources = [str(p) for p in self.parts]
+        with mock.patch("research_vocabs.sources.ProcessPoolExecutor") as pool:
+            lithology(sources)()
+        pool.assert_not_called()
+
+        with (
+            override_settings(VOCABULARY_PARSE_WORKERS=2),
+            mock.patch("research_vocabs.sources.ProcessPoolExecutor") as pool,
+        ):
+            pool.return_value.__enter__.return_value.map.side_effect = map
+            lithology(sources, streaming=True)()
+        self.assertEqual(pool.call_args.kwargs["mp_context"].get_start_method(), "spawn")
+
+    def test_snapshot(self):
+        sources = [str(p) for p in self.parts]
+        lithology(sources)()
+        self.assertTrue(snapshot_path(self.parts).exists())
+        self.assertNotEqual(snapshot_path(self.parts), snapshot_path(self.parts[0]))
+
+        # a change to any part invalidates the snapshot
+        self.parts[1].write_text("")
+        vocabulary = lithology(sources)()
+        self.assertEqual(vocabulary.get_choices("es"), vocabulary.choices)
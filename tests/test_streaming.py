@@ -0,0 +1,74 @@
+from functools import partial
+from unittest import mock
+
+from django.test import TestCase
+from rdflib import Graph
+
+from example.vocabularies import ISC2020, SampleStatus, SimpleLithology
+from research_vocabs.columnar import ColumnarIndex
+
+from .helpers import VOCAB_DATA, SnapshotDirMixin, variant
+
+streamed = partial(variant, streaming=True)
+"""Returns a fresh copy of an example vocabulary that is streamed into a columnar index."""
+
+
+class TestStreaming(SnapshotDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.vocabulary = streamed(SimpleLithology)()
+        self.reference = SimpleLithology()
+
+    def test_no_graph(self):
+        self.assertIsInstance(self.vocabulary.index, ColumnarIndex)
+        self.assertIsNone(self.vocabulary._graph)
+        self.vocabulary.search("gran")
+        self.vocabulary.ancestors("granite")
+        self.assertIsNone(self.vocabulary._graph)
+
+    def test_matches_graph(self):
+        self.assertEqual(self.vocabulary.choices, self.reference.choices)
+        self.assertEqual(self.vocabulary.get_choices("es"), self.reference.get_choices("es"))
+        index, reference = self.vocabulary.index, self.reference.index
+        for entry in range(len(reference.records)):
+            streamed_entry = index.find(reference.uri(entry))
+            self.assertEqual(index.name(streamed_entry), reference.name(entry))
+            self.assertEqual(index.kind(streamed_entry), reference.kind(entry))
+            self.assertEqual(index.labels(streamed_entry), reference.labels(entry))
+            self.assertCountEqual(
+                [index.uri(i) for i in index.broader(streamed_entry)],
+                [reference.uri(i) for i in reference.broader(entry)],
+            )
+        self.assertEqual(
+            [c.name for c in self.vocabulary.search("gran")], [c.name for c in self.reference.search("gran")]
+        )
+
+    def test_attrs_build_graph(self):
+        concept = self.vocabulary.get_concept("granite")
+        self.assertEqual(concept.attrs, self.reference.get_concept("granite").attrs)
+        self.assertIsNotNone(self.vocabulary._graph)
+
+    def test_meta_collections(self):
+        vocabulary = streamed(ISC2020, from_collection="isc:test")()
+        self.assertCountEqual([value for value, _ in vocabulary.choices], ["Aeronian", "Albian"])
+
+    def test_rdfxml(self):
+        self.assertEqual(streamed(SampleStatus)().choices, SampleStatus().choices)
+
+    def test_pruning(self):
+        vocabulary = streamed(SimpleLithology, languages=["en"])()
+        self.assertEqual(vocabulary.index.labels(vocabulary.index.find("granite")), {"en": "granite"})
+
+    def test_ntriples_progress(self):
+        source = self.tmp / "simple_lithology.nt"
+        graph = Graph().parse(VOCAB_DATA / "simple_lithology.ttl")
+        graph.serialize(source, format="nt")
+        with (
+            mock.patch("research_vocabs.streaming.PROGRESS_INTERVAL", 1000),
+            self.assertLogs("research_vocabs.streaming", "INFO") as logs,
+        ):
+            vocabulary = streamed(SimpleLithology, source=str(source))()
+        reports = [line for line in logs.output if "triples/s" in line]
+        self.assertEqual(len(reports), len(graph) // 1000 + 1)
+        self.assertIn(f"Read {len(graph)} triples", reports[-1])
+        self.assertEqual(vocabulary.choices, self.reference.choices)
@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from example.models import Lithology
+from example.vocabularies import SimpleLithology
+from research_vocabs.models import Concept, Vocabulary
+from research_vocabs.registry import register
+from research_vocabs.sync import SYNC_HASH, sync_concepts, sync_vocabulary
+
+GRANITE = "http://resource.geosciml.org/classifier/cgi/lithology/granite"
+
+
+class TestSyncVocabulary(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        self.size = len(self.vocabulary.index)
+
+    def test_first_sync(self):
+        result = sync_vocabulary(self.vocabulary)
+        self.assertEqual((result.inserted, result.updated, result.deleted), (self.size, 0, 0))
+        self.assertTrue(result.changed)
+        row = Vocabulary.objects.get(name=self.vocabulary.scheme().name)
+        self.assertEqual(row.uri, str(self.vocabulary.scheme().URI))
+        self.assertIn(SYNC_HASH, row.meta)
+        self.assertEqual(row.concepts.count(), self.size)
+        self.assertEqual(row.concepts.get(uri=GRANITE).label, "granite")
+
+    def test_unchanged_sync_is_a_single_query(self):
+        sync_vocabulary(self.vocabulary)
+        with self.assertNumQueries(1):
+            result = sync_vocabulary(self.vocabulary)
+        self.assertFalse(result.changed)
+
+    def test_queries_do_not_depend_on_size(self):
+        with self.assertNumQueries(10):
+            # vocabulary lookup, vocabulary insert, concepts select, 2 concept insert batches, meta update and savepoints
+            sync_vocabulary(self.vocabulary, batch_size=self.size // 2 + 1)
+
+    def test_only_differences_are_written(self):
+        sync_vocabulary(self.vocabulary)
+        Concept.objects.filter(uri=GRANITE).update(label="changed")
+        Concept.objects.filter(name="basalt").update(uri="http://example.com/basalt", name="stale")
+
+        # the content of the vocabulary did not change since the last synchronization
+        self.assertFalse(sync_vocabulary(self.vocabulary).changed)
+
+        with self.assertNumQueries(8):
+            # vocabulary lookup, concepts select, concept update, concept insert and savepoints
+            result = sync_vocabulary(self.vocabulary, force=True, delete=False)
+        self.assertEqual((result.inserted, result.updated, result.deleted), (1, 1, 0))
+        self.assertEqual(Concept.objects.get(uri=GRANITE).label, "granite")
+        self.assertEqual(Concept.objects.count(), self.size + 1)
+
+    def test_sync_concepts_deletes_removed_rows(self):
+        sync_concepts(Lithology, self.vocabulary, Lithology.objects.all())
+        Lithology.objects.create(uri="http://example.com/stale", name="stale")
+        Lithology.objects.filter(uri=GRANITE).delete()
+        self.assertEqual(sync_concepts(Lithology, self.vocabulary, Lithology.objects.all(), batch_size=1), (1, 0, 1))
+        self.assertFalse(Lithology.objects.filter(name="stale").exists())
+        self.assertEqual(Lithology.objects.count(), self.size)
+
+    def test_keep_removed(self):
+        sync_vocabulary(self.vocabulary)
+        Vocabulary.objects.update(meta=None)
+        Concept.objects.create(vocabulary=Vocabulary.objects.get(), uri="http://example.com/stale", name="stale")
+        result = sync_vocabulary(self.vocabulary, delete=False)
+        self.assertEqual(result.deleted, 0)
+        self.assertTrue(Concept.objects.filter(name="stale").exists())
+        self.assertIsNone(Vocabulary.objects.get().meta)
+
+    def test_preload(self):
+        Lithology.preload()
+        Lithology.preload()
+        self.assertEqual(Lithology.objects.count(), self.size)
+
+
+class TestSyncCommand(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        register(self.vocabulary)
+        self.name = self.vocabulary.scheme().name
+
+    def test_command(self):
+        out = StringIO()
+        call_command("sync_vocabularies", self.name, stdout=out)
+        self.assertIn(f"{self.name}: {len(self.vocabulary.index)} inserted, 0 updated, 0 deleted", out.getvalue())
+
+        out = StringIO()
+        call_command("sync_vocabularies", self.name, stdout=out)
+        self.assertIn(f"{self.name}: unchanged", out.getvalue())
+
+    def test_unknown_vocabulary(self):
+        with self.assertRaises(CommandError):
+            call_command("sync_vocabularies", "nonexistant", stdout=StringIO())
@@ -1,11 +1,19 @@
+from unittest import mock
+
+from django.core import signing
 from django.test import TestCase
 from django.urls import reverse
 
+from example.vocabularies import ISC2020, SimpleLithology
+from research_vocabs import registry
 from research_vocabs.registry import vocab_registry
 from research_vocabs.views import (
+    VocabularyChoicesView,
     VocabularyDetailView,
     VocabularyListView,
+    restrict_vocabulary,
 )
+from research_vocabs.widgets import ConceptSelect
 
 
 class TestVocabularyListView(TestCase):
@@ -37,3 +45,108 @@ class TestVocabularyDetailView(TestCase):
     def test_template_name(self):
         view = VocabularyDetailView()
         self.assertEqual(view.template_name, "research_vocabs/vocabulary_detail.html")
+
+
+class TestVocabularyTreeView(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        registry.register(self.vocabulary)
+        self.url = reverse("vocabularies:tree", args=[self.vocabulary.scheme().name])
+
+    def test_top_level(self):
+        response = self.client.get(self.url, {"id": "#"})
+        self.assertEqual(response.status_code, 200)
+        roots = response.json()
+        hierarchy = self.vocabulary.index.hierarchy
+        self.assertEqual(len(roots), len(hierarchy.roots))
+        for node in roots:
+            self.assertNotIn("/", node["id"])
+            self.assertIsInstance(node["children"], bool)
+            self.assertIn("href", node["a_attr"])
+
+    def test_children(self):
+        response = self.client.get(self.url, {"id": "compound_material"})
+        children = response.json()
+        self.assertTrue(children)
+        for node in children:
+            self.assertTrue(node["id"].startswith("compound_material/"))
+            self.assertEqual(node["id"].rsplit("/", 1)[-1], node["data"]["name"])
+
+    def test_selected_path(self):
+        response = self.client.get(self.url, {"id": "#", "selected": "granite"})
+        entry = self.vocabulary.index.find("granite")
+        path = [self.vocabulary.index.name(e) for e in self.vocabulary.index.hierarchy.path_to_root(entry)]
+
+        nodes, node = response.json(), None
+        for depth, name in enumerate(path):
+            node = next(n for n in nodes if n["data"]["name"] == name)
+            self.assertEqual(node["id"], "/".join(path[: depth + 1]))
+            nodes = node["children"] if depth < len(path) - 1 else []
+        self.assertEqual(node["state"], {"selected": True})
+
+    def test_unknown_node(self):
+        response = self.client.get(self.url, {"id": "compound_material/nonexistant"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag(self):
+        response = self.client.get(self.url, {"id": "#"})
+        self.assertTrue(response.has_header("ETag"))
+        self.assertIn("max-age", response["Cache-Control"])
+
+        cached = self.client.get(self.url, {"id": "#"}, headers={"if-none-match": response["ETag"]})
+        self.assertEqual(cached.status_code, 304)
+
+        other = self.client.get(self.url, {"id": "compound_material"})
+        self.assertNotEqual(other["ETag"], response["ETag"])
+
+
+class TestVocabularyChoicesView(TestCase):
+    def setUp(self):
+        self.vocabulary = SimpleLithology()
+        registry.register(self.vocabulary)
+        self.url = reverse("vocabularies:choices", args=[self.vocabulary.scheme().name])
+
+    def test_pages(self):
+        page_size = VocabularyChoicesView.paginate_by
+        first = self.client.get(self.url).json()
+        self.assertEqual([r["id"] for r in first["results"]], self.vocabulary.values[:page_size])
+        self.assertTrue(first["pagination"]["more"])
+
+        last_page = -(-len(self.vocabulary.choices) // page_size)
+        last = self.client.get(self.url, {"page": last_page}).json()
+        self.assertFalse(last["pagination"]["more"])
+        self.assertEqual(last["results"][-1]["id"], self.vocabulary.values[-1])
+
+    def test_query(self):
+        data = self.client.get(self.url, {"q": "gran"}).json()
+        self.assertEqual(data["results"][0], {"id": "granite", "text": "granite"})
+        self.assertFalse(data["pagination"]["more"])
+
+    def test_signed_restriction(self):
+        widget = ConceptSelect(SimpleLithology(include_only=["granite", "basalt"]))
+        data = self.client.get(widget.get_url()).json()
+        self.assertEqual([r["id"] for r in data["results"]], ["granite", "basalt"])
+
+        response = self.client.get(self.url, {"only": "granite"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_restriction_resolved_once(self):
+        restrict_vocabulary.cache_clear()
+        url = ConceptSelect(SimpleLithology(include_only=["granite", "basalt"])).get_url()
+        with mock.patch("research_vocabs.views.signing.loads", wraps=signing.loads) as loads:
+            self.client.get(url)
+            self.client.get(url, {"page": 2})
+        loads.assert_called_once()
+
+    @mock.patch.dict(vocab_registry)
+    def test_collection_restriction(self):
+        vocabulary = ISC2020.from_collection("isc:test")
+        registry.register(vocabulary)
+        url = ConceptSelect(vocabulary).get_url()
+        # the URL names the collection instead of listing its members
+        self.assertTrue(url.endswith("?collection=isc%3Atest"))
+        data = self.client.get(url).json()
+        self.assertEqual([r["id"] for r in data["results"]], ["Albian", "Aeronian"])
+
+        response = self.client.get(url.replace("isc%3Atest", "Albian"))
+        self.assertEqual(response.status_code, 404)
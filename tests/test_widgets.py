@@ -0,0 +1,89 @@
+import re
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from example.models import TestModel
+from example.vocabularies import ISC2020, SimpleLithology
+from research_vocabs import fields, forms, registry
+from research_vocabs.widgets import ConceptSelect, ConceptSelectMultiple
+
+
+class TestConceptSelect(TestCase):
+    def test_small_vocabulary_renders_select(self):
+        widget = ConceptSelect(SimpleLithology(include_only=["granite", "basalt"]))
+        self.assertFalse(widget.is_autocomplete)
+        html = widget.render("lithology", "granite")
+        self.assertNotIn("data-ajax--url", html)
+        self.assertIn('value="basalt"', html)
+
+    def test_large_vocabulary_renders_selected_only(self):
+        vocabulary = ISC2020()
+        widget = ConceptSelect(vocabulary)
+        widget.is_required = True
+        self.assertTrue(widget.is_autocomplete)
+        html = widget.render("age", "Albian")
+        self.assertIn('data-ajax--url="/vocabularies/gts2020/choices.json"', html)
+        self.assertIn("vocabulary-autocomplete", html)
+        self.assertIn('<option value="Albian" selected>Albian</option>', html)
+        self.assertEqual(html.count("<option"), 1)
+
+    def test_threshold(self):
+        widget = ConceptSelect(SimpleLithology(include_only=["granite", "basalt"]), threshold=0)
+        self.assertTrue(widget.is_autocomplete)
+        self.assertIn("?only=", widget.get_url())
+        with override_settings(VOCABULARY_AUTOCOMPLETE_THRESHOLD=10000):
+            self.assertFalse(ConceptSelect(ISC2020()).is_autocomplete)
+
+    def test_multiple(self):
+        widget = ConceptSelectMultiple(SimpleLithology(), threshold=0)
+        widget.is_required = True
+        html = widget.render("lithology", ["granite", "basalt", "nonexistant"])
+        self.assertEqual(html.count("<option"), 2)
+        self.assertIn('data-allow-clear="false"', html)
+
+    def test_media(self):
+        self.assertIn("research_vocabs/js/autocomplete.js", str(ConceptSelect(ISC2020()).media))
+
+
+class TestFormFields(TestCase):
+    def test_autocomplete_option(self):
+        self.assertIsInstance(forms.ConceptField(vocabulary=ISC2020).widget, ConceptSelect)
+        self.assertIsInstance(forms.MultiConceptField(vocabulary=ISC2020).widget, ConceptSelectMultiple)
+        self.assertNotIsInstance(forms.ConceptField(vocabulary=ISC2020, autocomplete=False).widget, ConceptSelect)
+        self.assertTrue(forms.ConceptField(vocabulary=SimpleLithology, autocomplete=True).widget.is_autocomplete)
+
+    def test_indexed_validation(self):
+        field = forms.MultiConceptField(vocabulary=ISC2020)
+        self.assertEqual([c.name for c in field.clean(["Albian", "isc:Aptian"])], ["Albian", "Aptian"])
+        # collections resolve to a record in the index but are not choices
+        self.assertFalse(field.valid_value(ISC2020().get_concept("isc:test")))
+
+    def test_model_formfield(self):
+        formfield = TestModel._meta.get_field("concept_label").formfield()
+        self.assertIsInstance(formfield.widget, ConceptSelect)
+
+    def assert_endpoint_serves(self, formfield):
+        html = formfield.widget.render("age", "Albian")
+        url = re.search(r'data-ajax--url="([^"]+)"', html).group(1)
+        response = self.client.get(url, {"q": "Alb"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn({"id": "Albian", "text": "Albian"}, response.json()["results"])
+
+    def test_endpoint_without_registration(self):
+        # no vocabulary is registered by hand, the fields register their own
+        for lazy in [False, True]:
+            with (
+                self.subTest(lazy=lazy),
+                override_settings(VOCABULARY_LAZY=lazy),
+                mock.patch.dict(registry.vocab_registry, clear=True),
+                mock.patch.object(registry, "_pending", []),
+            ):
+                self.assert_endpoint_serves(fields.ConceptField(vocabulary=ISC2020).formfield())
+            with (
+                self.subTest(lazy=lazy, form_field=True),
+                override_settings(VOCABULARY_LAZY=lazy),
+                mock.patch.dict(registry.vocab_registry, clear=True),
+                mock.patch.object(registry, "_pending", []),
+            ):
+                self.assert_endpoint_serves(forms.ConceptField(vocabulary=ISC2020))